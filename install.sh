@@ -12,7 +12,8 @@ mkdir -p "$INSTALL_DIR"
 curl -L https://raw.githubusercontent.com/LauritsTh/AL-assist/main/assets/AL_Assist_icon.png \
   -o "$INSTALL_DIR/icon.png"
 
-cp -r src scripts "$INSTALL_DIR"
+# config/ holds the shipped defaults; al_config reads it next to src/
+cp -r src scripts config "$INSTALL_DIR"
 chmod +x "$INSTALL_DIR"/src/*.py
 chmod +x "$INSTALL_DIR"/scripts/*.sh
 
@@ -1,121 +1,200 @@
 import time
-import platform
-import subprocess
-import re
 import urllib.parse
 import difflib
 import os
-
-import al_media
-import al_device
-from al_apps import open_app, open_url, close_app, open_url_in_app
+import sys
+
+import al_config
+from al_executor import ActionExecutor
+from al_intents import IntentRegistry
+from al_tokens import parse
+import al_plan
+import al_trace
+from al_backend import SystemBackend
+from al_platform import SYSTEM, lazy
+
+# backends are imported on first use, after the prompt is up
+al_appindex = lazy("al_appindex")
+al_stt = lazy("al_stt")
+al_tts = lazy("al_tts")
+al_llm = lazy("al_llm")
+al_context = lazy("al_context")   # sqlite3
+al_predict = lazy("al_predict")
 
 IDLE_TIMEOUT = 120
-
-ALIASES = {
-    "chrome": "Google Chrome",
-    "google chrome": "Google Chrome",
-    "brave": "Brave Browser",
-    "spotify": "Spotify",
-    "browser": "Google Chrome",
-    "system settings": "System Settings",
-    "settings": "System Settings",
-}
-
-COMMON_CORRECTIONS = {
-    "adn": "and",
-    "searf": "search",
-    "serch": "search",
-    "apotify": "spotify",
-    "sertings": "settings",
-}
-
-NUMBER_WORDS = {
-    "once": 1,
-    "twice": 2,
-    "three": 3,
-    "four": 4,
-    "five": 5,
-}
+BARGE_IN_WORDS = 3   # words a partial needs to cut AL off mid-sentence
+
+# Registration order is precedence: the first matching intent wins.
+INTENT_TABLE = [
+    ("exit", "cmd_exit", {"exact": ("exit", "quit", "bye")}),
+    ("clear", "cmd_clear", {"exact": ("clear",)}),
+    ("location_services", "cmd_location_services", {"contains": ("location services",)}),
+    ("turn_off", "cmd_turn_off", {"exact": ("turn off", "disable")}),
+    ("open_settings", "cmd_open_settings", {"exact": ("open settings", "settings")}),
+    ("check_updates", "cmd_check_updates",
+     {"exact": ("check for updates", "software update", "system update")}),
+    ("open_update_settings", "cmd_open_update_settings",
+     {"exact": ("open software update", "open update settings")}),
+    ("search", "cmd_search", {"prefixes": ("search for",)}),
+    ("search_again", "cmd_search_again", {"exact": ("search again", "again")}),
+    ("close", "cmd_close", {"prefixes": ("close",)}),
+    ("open", "cmd_open", {"prefixes": ("open", "go to")}),
+    ("play", "cmd_play", {"prefixes": ("play",)}),
+    ("pause", "cmd_pause", {"exact": ("pause", "stop")}),
+    ("next", "cmd_next", {"exact": ("next", "skip")}),
+    ("previous", "cmd_previous", {"exact": ("previous", "back")}),
+]
+
+INTENTS = IntentRegistry()
+for _name, _handler, _phrases in INTENT_TABLE:
+    INTENTS.add(_name, _handler, **_phrases)
+
+def search_url(query):
+    return f"https://www.google.com/search?q={urllib.parse.quote_plus(query)}"
+
+
+def describe_updates(pending):
+    if pending is None:
+        return "I couldn't check for updates."
+    if not pending:
+        return "Your system is up to date."
+    if len(pending) == 1:
+        return "There is one update available."
+    return f"There are {len(pending)} updates available."
+
+
+def start_music(backend):
+    backend.open_app("Spotify")
+    if not backend.wait_until_ready("spotify"):
+        raise RuntimeError("Spotify did not start")
+    backend.play()
 
 
 class ALAssistant:
-    def __init__(self):
-        self.system = platform.system().lower()
+    def __init__(self, backend=None, context=None, pool=None, prewarmer=None, config=None,
+                 apps=None):
+        self.system = SYSTEM
+        # all side effects (apps, settings, media, speech, LLM)
+        self.backend = backend or SystemBackend()
+        # aliases and the trace switch (the process-wide service by default)
+        self.config = config or al_config.get_service()
+        # installed apps to resolve names against (the .desktop index on Linux)
+        self.apps = apps
         self.running = True
         self.last_active = time.time()
 
         # --- CONTEXT MEMORY ---
-        self.last_app = None
-        self.last_search = None
+        # last app/search, settings and intent state, recent turns;
+        # persistent when the context was loaded from disk
+        self.context = context or al_context.ALContext()
         self.last_media_action = None
 
-        # --- SETTINGS CONTEXT ---
-        self.settings_state = {
-            "open": False,
-            "section": None,
-            "subsection": None,
-        }
-
-        # --- INTENT CONTEXT ---
-        self.intent = {
-            "domain": None,
-            "target": None,
-            "action": None,
-        }
-
         # --- CONFIRMATION ---
         self.pending_confirmation = None
 
+        # --- LLM ANSWER IN PROGRESS ---
+        self.generation = None
+
+        # --- EVENT LOOP / IDLE ---
+        self.loop = None
+        self.speech = None
+        self.idle = False
+        self.release_speech = False  # only when a wake source can restart it (--wake)
+        self.interactive = False
+        self._idle_timer = None
+
+        # --- COMPOUND COMMANDS ---
+        # actions of the plan steps the current step waits for, and the
+        # actions the current step has submitted
+        self.step_after = ()
+        self.step_actions = None
+
+        # --- SIDE EFFECTS (run in the background) ---
+        # (on a shared thread pool when the daemon hosts many sessions)
+        self.actions = ActionExecutor(on_done=self.on_action_done, pool=pool)
+
+        # --- PREDICTIVE PRE-WARMING ---
+        # daemon sessions share one prewarmer: they drive the same desktop
+        self.prewarmer = prewarmer or al_predict.Prewarmer(self.backend.prewarm_app,
+                                                           history=self.context.history)
+        al_trace.follow_config(self.config)
+
     # -------------------------
     # Utilities
     # -------------------------
 
+    @property
+    def last_app(self):
+        return self.context.last_app
+
+    @last_app.setter
+    def last_app(self, app):
+        self.context.last_app = app
+
+    @property
+    def last_search(self):
+        return self.context.last_search
+
     def touch(self):
         self.last_active = time.time()
+        if self.idle:
+            self.idle = False
+            if self.loop is not None:
+                self._arm_idle(IDLE_TIMEOUT)
 
     def speak(self, text):
         print(f"[AL] {text}")
-        try:
-            if self.system == "darwin":
-                subprocess.run(["say", text], check=False)
-            elif self.system == "linux":
-                subprocess.run(["espeak", text], check=False)
-        except Exception:
-            pass
-
-    def normalize(self, text):
-        text = text.lower().strip()
-        text = re.sub(r"[^\w\s.:/]", "", text)
-        text = re.sub(r"\s+", " ", text)
-        return text
-
-    def correct_typos(self, text):
-        return " ".join(COMMON_CORRECTIONS.get(w, w) for w in text.split())
-
-    def resolve_app(self, name):
+        self.backend.say(text)
+
+    def run_action(self, name, fn, *args, key=None, stage="action"):
+        action = self.actions.submit(name, fn, *args, key=key, after=self.step_after,
+                                     stage=stage)
+        if self.step_actions is not None:
+            self.step_actions.append(action)
+        return action
+
+    def barge_in(self):
+        """The user spoke over an LLM answer: stop generating and talking."""
+        generation, self.generation = self.generation, None
+        if generation is not None and not generation.cancelled:
+            generation.cancel()
+            al_tts.interrupt()
+
+    def answer(self, text):
+        generation = al_llm.Generation()
+        self.generation = generation
+
+        def say(sentence):
+            if not generation.cancelled:
+                self.speak(sentence)
+
+        self.backend.respond(text, say, generation)
+        if self.generation is generation:
+            self.generation = None
+
+    def on_action_done(self, action):
+        if action.error is not None:
+            print(f"[AL] {action.name} failed: {action.error}")
+            self.speak(f"Sorry, {action.name} failed.")
+
+    def resolve_app(self, name, known=False):
+        """App name for `name`; a title-cased guess unless `known` is set."""
         if not name:
             return None
-        if name in ALIASES:
-            return ALIASES[name]
-        match = difflib.get_close_matches(name, ALIASES.keys(), n=1, cutoff=0.75)
+        aliases = self.config.snapshot.aliases
+        if name in aliases:
+            return aliases[name]
+        apps = self.apps
+        if apps is None and self.system == "linux":
+            apps = al_appindex.get_index()
+        if apps is not None:
+            entry = apps.resolve(name)
+            if entry is not None:
+                return entry.name
+        match = difflib.get_close_matches(name, aliases.keys(), n=1, cutoff=0.75)
         if match:
-            return ALIASES[match[0]]
-        return name.title()
-
-    def extract_count(self, text):
-        words = text.split()
-        count = 1
-        for w in words[:]:
-            if w.isdigit():
-                count = int(w)
-                words.remove(w)
-                break
-            if w in NUMBER_WORDS:
-                count = NUMBER_WORDS[w]
-                words.remove(w)
-                break
-        return " ".join(words), max(1, min(count, 10))
+            return aliases[match[0]]
+        return None if known else name.title()
 
     # -------------------------
     # Confirmation handling
@@ -132,7 +211,7 @@ class ALAssistant:
             if self.pending_confirmation:
                 action = self.pending_confirmation
                 self.pending_confirmation = None
-                action()
+                self.run_action(getattr(action, "__name__", "action"), action)
             return True
 
         if text in ("no", "cancel"):
@@ -147,235 +226,443 @@ class ALAssistant:
     # -------------------------
 
     def handle(self, raw_text):
-        text = self.correct_typos(self.normalize(raw_text))
-        text, count = self.extract_count(text)
+        with al_trace.span("normalize"):
+            utt = parse(raw_text)
+        text = utt.text
 
-        print(f"[DEBUG] parsed command = '{text}', count={count}")
+        self.touch()
 
-        # --- CONFIRMATION FIRST ---
-        if self.pending_confirmation:
-            if self.handle_confirmation(text):
-                return
+        self.barge_in()
 
-        # --- EXIT ---
-        if text in ("exit", "quit", "bye"):
-            self.touch()
-            self.running = False
-            self.speak("Goodbye.")
-            return
+        with al_trace.span("dispatch", command=text, count=utt.count):
+            # --- CONFIRMATION FIRST ---
+            if self.pending_confirmation:
+                if self.handle_confirmation(text):
+                    self.note_turn(raw_text.strip(), "confirmation")
+                    return
 
-        # --- CLEAR ---
-        if text == "clear":
-            self.touch()
-            os.system("clear" if self.system != "windows" else "cls")
-            return
+            plan = al_plan.build(utt, INTENTS, self.resolve_app, self.last_app)
+            if plan.answer:
+                self.ask(utt)
+                return
+            if len(plan) <= 1:
+                self.dispatch(utt)
+                return
 
-        # --- LOCATION SERVICES ---
-        if "location services" in text:
-            self.intent.update({
-                "domain": "settings",
-                "target": "location services",
-                "action": "open",
-            })
-
-            self.settings_state.update({
-                "open": True,
-                "section": "privacy",
-                "subsection": "location services",
-            })
-
-            self.ask_confirmation(
-                "This affects all apps. Should I open Location Services settings now?",
-                al_device.open_location_settings
-            )
-            return
+            print(f"[AL] {plan.describe()}")
+            self.run_plan(plan)
 
-        # --- FOLLOW-UP TURN OFF ---
-        if text in ("turn off", "disable"):
-            if self.intent["target"] == "location services":
-                self.ask_confirmation(
-                    "Apple requires manual confirmation. Open Location Services settings now?",
-                    al_device.open_location_settings
-                )
+    def dispatch(self, utt):
+        # Handlers return False when their follow-up context is missing,
+        # which passes the command on to the next matching intent.
+        for intent in INTENTS.lookup(utt.text):
+            if getattr(self, intent.handler)(utt) is not False:
+                self.note_turn(utt.raw.strip(), intent.name)
                 return
 
-        # --- OPEN SETTINGS ---
-        if text in ("open settings", "settings"):
-            self.touch()
-            self.intent.update({
-                "domain": "settings",
-                "target": "system settings",
-                "action": "open",
-            })
-            self.settings_state.update({
-                "open": True,
-                "section": None,
-                "subsection": None,
-            })
-            self.speak("Opening system settings")
-            al_device.open_settings()
-            return
+        self.ask(utt)
+
+    def ask(self, utt):
+        # anything else is a question for the LLM, answered sentence by
+        # sentence while it is still being generated
+        self.run_action("answer", self.answer, utt.raw.strip(), key="llm", stage="llm")
+        self.note_turn(utt.raw.strip(), "llm")
+
+    def note_turn(self, text, intent):
+        turn = self.context.add_turn(text, intent)
+        # learn from it and warm the app the next command probably needs,
+        # e.g. while a confirmation prompt is pending
+        self.prewarmer.observe(turn, self.context)
+
+    def run_plan(self, plan):
+        """
+        Dispatch every step now; each step's actions wait only for the
+        actions of the steps it depends on.
+        """
+        submitted = []
+        try:
+            for step in plan.steps:
+                self.step_after = [a for i in step.after for a in submitted[i]]
+                self.step_actions = []
+                self.dispatch(step.utt)
+                submitted.append(self.step_actions)
+        finally:
+            self.step_after = ()
+            self.step_actions = None
 
-        # --- CHECK UPDATES ---
-        if text in ("check for updates", "software update", "system update"):
-            self.touch()
-            self.intent.update({
-                "domain": "settings",
-                "target": "software update",
-                "action": "check",
-            })
-            self.speak("Checking for system updates")
-            al_device.check_for_updates()
+    # -------------------------
+    # Intent handlers
+    # -------------------------
+
+    def cmd_exit(self, utt):
+        self.touch()
+        self.running = False
+        self.speak("Goodbye.")
+
+    def cmd_clear(self, utt):
+        self.touch()
+        self.backend.clear_screen()
+
+    def cmd_location_services(self, utt):
+        state = self.backend.location_state()
+        if state != "unknown":
+            self.speak(f"Location services are {state}.")
+
+        self.context.intent.update(
+            domain="settings",
+            target="location services",
+            action="open",
+        )
+
+        self.context.settings.update(
+            open=True,
+            section="privacy",
+            subsection="location services",
+        )
+
+        self.ask_confirmation(
+            "This affects all apps. Should I open Location Services settings now?",
+            self.backend.open_location_settings
+        )
+
+    def cmd_turn_off(self, utt):
+        if self.context.intent.target != "location services":
+            return False
+        self.ask_confirmation(
+            "Apple requires manual confirmation. Open Location Services settings now?",
+            self.backend.open_location_settings
+        )
+
+    def cmd_open_settings(self, utt):
+        self.touch()
+        self.context.intent.update(
+            domain="settings",
+            target="system settings",
+            action="open",
+        )
+        self.context.settings.update(
+            open=True,
+            section=None,
+            subsection=None,
+        )
+        self.speak("Opening system settings")
+        self.run_action("open settings", self.backend.open_settings, key="settings")
+
+    def cmd_check_updates(self, utt):
+        self.touch()
+        self.context.intent.update(
+            domain="settings",
+            target="software update",
+            action="check",
+        )
+        # answered from the prober's cache when it is fresh
+        pending = self.backend.update_status()
+        if pending is not None:
+            self.speak(describe_updates(pending))
             return
+        self.speak("Checking for system updates")
+        self.run_action("update check", self.report_updates, key="updates")
 
-        # --- OPEN SOFTWARE UPDATE UI ---
-        if text in ("open software update", "open update settings"):
-            self.touch()
-            self.speak("Opening software update settings")
-            al_device.open_update_settings()
+    def report_updates(self):
+        self.speak(describe_updates(self.backend.check_for_updates()))
+
+    def cmd_open_update_settings(self, utt):
+        self.touch()
+        self.speak("Opening software update settings")
+        self.run_action("open update settings", self.backend.open_update_settings, key="settings")
+
+    def cmd_search(self, utt):
+        query = utt.after("search for")
+        if not self.last_app:
+            self.speak("Which app should I search in?")
             return
 
-        # --- SEARCH ---
-        if text.startswith("search for"):
-            query = text.replace("search for", "", 1).strip()
-            if not self.last_app:
-                self.speak("Which app should I search in?")
-                return
+        self.context.searched(self.last_app, search_url(query))
+        self.touch()
+        self.speak(f"Searching for {query}")
+        self.run_action("search", self.backend.open_url_in_app, self.last_app, self.last_search,
+                        key=self.last_app)
+
+    def cmd_search_again(self, utt):
+        if not (self.last_search and self.last_app):
+            return False
+        self.context.searched(self.last_app, self.last_search)
+        self.touch()
+        self.speak("Searching again")
+        self.run_action("search", self.backend.open_url_in_app, self.last_app,
+                        self.last_search, utt.count, key=self.last_app)
 
-            self.last_search = (
-                f"https://www.google.com/search?q="
-                f"{urllib.parse.quote_plus(query)}"
-            )
-            self.touch()
-            self.speak(f"Searching for {query}")
-            open_url_in_app(self.last_app, self.last_search)
+    def cmd_close(self, utt):
+        target = utt.after("close")
+
+        if not target:
+            if self.context.settings.open:
+                target = "system settings"
+            else:
+                target = self.last_app or self.context.intent.target
+
+        if not target:
+            self.speak("Close what?")
             return
 
-        if text in ("search again", "again"):
-            if self.last_search and self.last_app:
-                self.touch()
-                self.speak("Searching again")
-                for _ in range(count):
-                    open_url_in_app(self.last_app, self.last_search)
-                return
+        app = self.resolve_app(target)
+        self.touch()
+        self.speak(f"Closing {app}")
+        self.run_action(f"closing {app}", self.backend.close_app, app, key=app)
 
-        # --- CLOSE ---
-        if text.startswith("close"):
-            target = text.replace("close", "", 1).strip()
+        if app == "System Settings":
+            self.context.settings.update(open=False, section=None, subsection=None)
 
-            if not target:
-                if self.settings_state["open"]:
-                    target = "system settings"
-                else:
-                    target = self.last_app or self.intent.get("target")
+        self.context.closed(app)
 
-            if not target:
-                self.speak("Close what?")
-                return
+    def cmd_open(self, utt):
+        prefix = "open" if utt.text.startswith("open") else "go to"
+        target = utt.after(prefix)
 
-            app = self.resolve_app(target)
-            self.touch()
-            self.speak(f"Closing {app}")
-            close_app(app)
-
-            if app == "System Settings":
-                self.settings_state = {
-                    "open": False,
-                    "section": None,
-                    "subsection": None,
-                }
-
-            self.last_app = None
-            self.intent["target"] = None
-            return
+        # "open brave and search for x" is split into two steps by the
+        # planner; this handles the spoken form without "and"
+        at = utt.find("search", "for")
+        if at != -1:
+            skip = len(prefix.split())
+            app = self.resolve_app(" ".join(utt.tokens[skip:at]))
+            query = " ".join(utt.tokens[at + 2:])
 
-        # --- OPEN / OPEN + SEARCH ---
-        if text.startswith(("open", "go to")):
-            target = (
-                text.replace("open", "", 1)
-                .replace("go to", "", 1)
-                .strip()
-            )
-
-            if "search for" in target:
-                app_part, query = target.split("search for", 1)
-                app = self.resolve_app(app_part.replace("and", "").strip())
-                query = query.strip()
-
-                self.last_app = app
-                self.last_search = (
-                    f"https://www.google.com/search?q="
-                    f"{urllib.parse.quote_plus(query)}"
-                )
-
-                self.touch()
-                self.speak(f"Opening {app}")
-                open_app(app)
-                self.speak(f"Searching for {query}")
-                open_url_in_app(app, self.last_search)
-                return
+            self.context.opened(app)
+            self.context.searched(app, search_url(query))
 
-            app = self.resolve_app(target)
             self.touch()
-            self.last_app = app
             self.speak(f"Opening {app}")
-            open_app(app)
+            self.run_action(f"opening {app}", self.backend.open_app, app, key=app)
+            self.speak(f"Searching for {query}")
+            self.run_action("search", self.backend.open_url_in_app, app, self.last_search, key=app)
             return
 
-        # --- MEDIA ---
-        if text.startswith("play"):
-            self.touch()
-            self.speak("Playing music")
-            open_app("Spotify")
-            time.sleep(1.2)
-            al_media.play()
-            self.last_media_action = al_media.play
-            return
+        app = self.resolve_app(target)
+        self.touch()
+        self.context.opened(app)
+        self.speak(f"Opening {app}")
+        self.run_action(f"opening {app}", self.backend.open_app, app, key=app)
 
-        if text in ("pause", "stop"):
-            self.touch()
-            for _ in range(count):
-                al_media.pause()
-            self.last_media_action = al_media.pause
-            return
+    def cmd_play(self, utt):
+        self.touch()
+        self.speak("Playing music")
+        self.run_action("playing music", start_music, self.backend, key="media")
+        self.last_media_action = self.backend.play
 
-        if text in ("next", "skip"):
-            self.touch()
-            for _ in range(count):
-                al_media.next_track()
-            self.last_media_action = al_media.next_track
-            return
+    def cmd_pause(self, utt):
+        self.touch()
+        self.run_action("pausing", self.backend.pause, utt.count, key="media")
+        self.last_media_action = self.backend.pause
 
-        if text in ("previous", "back"):
-            self.touch()
-            for _ in range(count):
-                al_media.previous_track()
-            self.last_media_action = al_media.previous_track
-            return
+    def cmd_next(self, utt):
+        self.touch()
+        self.run_action("skipping", self.backend.next_track, utt.count, key="media")
+        self.last_media_action = self.backend.next_track
 
-        self.speak(
-            "I can open and close apps, search, control media, "
-            "and guide you through system settings."
-        )
+    def cmd_previous(self, utt):
+        self.touch()
+        self.run_action("going back", self.backend.previous_track, utt.count, key="media")
+        self.last_media_action = self.backend.previous_track
 
     # -------------------------
     # Main loop
     # -------------------------
 
-    def run(self):
-        self.speak("AL is ready.")
-        while self.running:
-            if time.time() - self.last_active > IDLE_TIMEOUT:
-                self.speak("Going idle.")
-                break
-            try:
-                cmd = input("AL > ").strip()
-                if cmd:
-                    self.handle(cmd)
-            except (EOFError, KeyboardInterrupt):
-                break
-        self.speak("Goodbye.")
+    def hear_partial(self, text):
+        # called on the recognizer thread
+        self.loop.call_soon_threadsafe(self._partial, text)
+
+    def _partial(self, text):
+        # warm the intent lookup while the user is still talking
+        print(f"[AL] (hearing) {text}")
+        if self.talked_over(text):
+            self.barge_in()
+        INTENTS.lookup(parse(text).text)
+
+    def talked_over(self, text):
+        """
+        Is this partial the user speaking? While AL talks the microphone
+        also picks up AL itself: only a few words long, or mostly words
+        of what AL is saying, it is taken for the echo.
+        """
+        saying = al_tts.saying()
+        if saying is None:
+            return True
+        words = text.lower().split()
+        if len(words) < BARGE_IN_WORDS:
+            return False
+        said = {w.strip(".,;:!?\"'") for w in saying.lower().split()}
+        return sum(w in said for w in words) < len(words) / 2
+
+    def attach(self, loop, speech=None):
+        """
+        Run on an event loop: arm the idle timer and, optionally, take
+        spoken commands from an al_stt.SpeechInput.
+        """
+        self.loop = loop
+        self.speech = speech
+        self._arm_idle(IDLE_TIMEOUT)
+
+    def _arm_idle(self, delay):
+        self._idle_timer = self.loop.call_later(delay, self._idle_check)
+
+    def _idle_check(self):
+        remaining = IDLE_TIMEOUT - (time.time() - self.last_active)
+        if remaining > 0:
+            self._arm_idle(remaining)
+            return
+        self._idle_timer = None
+        self.go_idle()
+
+    def go_idle(self):
+        """Release heavy resources; each is reloaded on first use."""
+        self.speak("Going idle.")
+        self.idle = True
+        self.barge_in()
+        al_tts.release()
+        al_llm.release()
+        if self.speech is not None and self.release_speech:
+            self.speech.stop()
+
+    def wake(self):
+        self.running = True
+        self.touch()
+        if self.speech is not None:
+            self.speech.start()
+
+    def hear_final(self, text):
+        # called on the recognizer thread
+        self.loop.call_soon_threadsafe(self.command, text)
+
+    def command(self, text):
+        self.handle(text)
+        if not self.running:
+            self.loop.stop()
+
+    def _on_stdin(self):
+        line = sys.stdin.readline()
+        if not line:
+            self.loop.stop()  # EOF
+            return
+        if line.strip():
+            self.command(line.strip())
+        if self.running:
+            self._prompt()
+
+    def _prompt(self):
+        if self.interactive:
+            print("AL > ", end="", flush=True)
+
+    def run(self, speech=None, stdin=True, on_ready=None):
+        """
+        Event loop over stdin, spoken commands and timers. The assistant
+        goes idle on its own after IDLE_TIMEOUT and keeps running.
+        on_ready runs once the first prompt is up.
+        """
+        from al_loop import EventLoop
+
+        loop = EventLoop()
+        self.attach(loop, speech)
+        if speech is not None:
+            speech.start()
+            self.speak("AL is listening.")
+        else:
+            self.speak("AL is ready.")
+        if stdin:
+            self.interactive = sys.stdin.isatty()
+            loop.add_reader(sys.stdin, self._on_stdin)
+            self._prompt()
+        if on_ready is not None:
+            loop.call_soon(on_ready)
+
+        try:
+            loop.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if speech is not None:
+                speech.stop()
+            loop.close()
+
+        if self.running:
+            self.speak("Goodbye.")
+        self.actions.shutdown()
+        al_tts.wait()
+        self.context.close()
+        if al_trace.ENABLED:
+            al_trace.export()
+
+
+def wake_service(assistant, speech):
+    """WakeService whose hotkey or wake word wakes the assistant on its loop."""
+    from al_wake import WakeService
+    # on_wake is called with its source ("hotkey", "keyword") on a listener thread
+    wake = WakeService(lambda source: assistant.loop.call_soon_threadsafe(assistant.wake))
+    # something can now reopen the microphone after go_idle() closes it
+    assistant.release_speech = speech is not None and bool(wake.hotkey or wake.spotter)
+    return wake
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AL assistant")
+    parser.add_argument("--listen", action="store_true", help="take commands from the microphone")
+    parser.add_argument("--wav", help="take spoken commands from a 16 kHz mono WAV file")
+    parser.add_argument("--stt-model", help="Vosk model directory")
+    parser.add_argument("--wake", action="store_true",
+                        help="listen for Super+Space (and an enrolled wake word); "
+                             "the microphone is then closed while idle")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import times and time to the first prompt")
+    parser.add_argument("--startup-probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.profile_startup:
+        import al_startup
+        al_startup.report(*al_startup.probe())
+        return
+
+    assistant = ALAssistant(context=al_context.ALContext.load())
+    if args.startup_probe:
+        import al_startup
+
+        def ready():
+            al_startup.mark_ready()
+            assistant.running = False
+            assistant.loop.stop()
+
+        assistant.run(stdin=False, on_ready=ready)
+        return
+
+    # answer system state questions ahead of time, off the request path
+    import al_probe
+    al_probe.get_prober()
+
+    speech = None
+    if args.listen or args.wav:
+        model = args.stt_model or al_stt.DEFAULT_MODEL
+        recognizer = al_stt.VoskRecognizer(os.path.expanduser(model))
+        if args.wav:
+            open_source = lambda: al_stt.WavSource(args.wav, realtime=True)
+        else:
+            open_source = al_stt.MicrophoneSource
+        speech = al_stt.SpeechInput(
+            open_source,
+            recognizer,
+            on_final=assistant.hear_final,
+            on_partial=assistant.hear_partial,
+            # a finished WAV file ends the session
+            on_end=(lambda: assistant.loop.stop()) if args.wav else None,
+        )
+
+    wake = wake_service(assistant, speech) if args.wake else None
+    try:
+        assistant.run(speech, stdin=not args.wav, on_ready=wake.start if wake else None)
+    finally:
+        if wake:
+            wake.stop()
 
 
 if __name__ == "__main__":
-    ALAssistant().run()
+    main()
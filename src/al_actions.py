@@ -1,8 +1,8 @@
 import subprocess
-import platform
 import shutil
 
-SYSTEM = platform.system().lower()
+import al_tts
+from al_platform import SYSTEM
 
 
 def open_app(app_name: str):
@@ -20,9 +20,7 @@ def open_app(app_name: str):
 
 
 def speak(text: str):
-    if SYSTEM == "darwin":
-        subprocess.Popen(["say", text])
-    elif SYSTEM == "linux":
-        subprocess.Popen(["espeak", text])
+    if SYSTEM in ("darwin", "linux"):
+        al_tts.speak(text)
     else:
         print("[AL]", text)
@@ -0,0 +1,320 @@
+# al_appindex.py
+#
+# Index of installed applications built once from XDG .desktop entries
+# (Name, GenericName, Keywords, Exec). Exact names are a dict lookup;
+# fuzzy names go through a trigram index. inotify keeps the index
+# current when apps are installed or removed.
+
+import os
+import shlex
+import threading
+from pathlib import Path
+
+import al_inotify
+
+FUZZY_CUTOFF = 0.45
+
+# weight of a match by the field it came from
+W_NAME = 1.0
+W_EXEC = 0.95
+W_GENERIC = 0.9
+W_KEYWORD = 0.85
+W_NAME_WORD = 0.8
+
+
+def application_dirs():
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    dirs = [data_home] + [d for d in data_dirs.split(":") if d]
+    dirs.append("/var/lib/flatpak/exports/share")
+    dirs.append(os.path.expanduser("~/.local/share/flatpak/exports/share"))
+    return [os.path.join(d, "applications") for d in dirs]
+
+
+def normalize(text):
+    return " ".join("".join(c if c.isalnum() else " " for c in text.lower()).split())
+
+
+def trigrams(term):
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# -------------------------
+# .desktop entries
+# -------------------------
+
+class DesktopEntry:
+    __slots__ = ("id", "path", "name", "generic_name", "keywords", "exec_line", "wm_class")
+
+    def __init__(self, id, path, name, generic_name, keywords, exec_line, wm_class):
+        self.id = id
+        self.path = path
+        self.name = name
+        self.generic_name = generic_name
+        self.keywords = keywords
+        self.exec_line = exec_line
+        self.wm_class = wm_class
+
+    @property
+    def binary(self):
+        argv = self.argv()
+        return os.path.basename(argv[0]) if argv else None
+
+    def argv(self, url=None):
+        """
+        Exec line as an argument list with field codes expanded
+        (%u/%U/%f/%F receive the URL, the rest are dropped).
+        """
+        try:
+            words = shlex.split(self.exec_line)
+        except ValueError:
+            words = self.exec_line.split()
+
+        argv = []
+        for word in words:
+            if word in ("%u", "%U", "%f", "%F"):
+                if url:
+                    argv.append(url)
+                    url = None
+                continue
+            if len(word) == 2 and word[0] == "%":
+                continue
+            argv.append(word.replace("%%", "%"))
+
+        if url:
+            argv.append(url)
+        return argv
+
+    def __repr__(self):
+        return f"DesktopEntry({self.id!r}, {self.name!r})"
+
+
+def parse_desktop_file(path, desktop_id=None):
+    """Return a DesktopEntry for a launchable application, else None."""
+    fields = {}
+    in_entry = False
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("["):
+                    if in_entry:
+                        break
+                    in_entry = line == "[Desktop Entry]"
+                    continue
+                if in_entry and "=" in line:
+                    key, _, value = line.partition("=")
+                    key = key.strip()
+                    if "[" not in key:  # skip localized keys
+                        fields[key] = value.strip()
+    except OSError:
+        return None
+
+    if fields.get("Type", "Application") != "Application":
+        return None
+    if fields.get("NoDisplay") == "true" or fields.get("Hidden") == "true":
+        return None
+    if not fields.get("Name") or not fields.get("Exec"):
+        return None
+
+    return DesktopEntry(
+        id=desktop_id or os.path.basename(path),
+        path=str(path),
+        name=fields["Name"],
+        generic_name=fields.get("GenericName"),
+        keywords=[k for k in fields.get("Keywords", "").split(";") if k],
+        exec_line=fields["Exec"],
+        wm_class=fields.get("StartupWMClass"),
+    )
+
+
+# -------------------------
+# Index
+# -------------------------
+
+class AppIndex:
+    def __init__(self, dirs=None):
+        self.dirs = list(dirs) if dirs is not None else application_dirs()
+        self.entries = {}  # desktop id -> DesktopEntry
+
+        self._lock = threading.RLock()
+        self._sources = {}   # desktop id -> (dir index, relpath) it was loaded from
+        self._terms = {}     # term -> {desktop id: weight}
+        self._grams = {}     # term -> trigram count
+        self._postings = {}  # trigram -> set of terms
+        self._watcher = None
+
+    # -------------------------
+    # Building
+    # -------------------------
+
+    def build(self):
+        with self._lock:
+            # earlier dirs win (XDG_DATA_HOME overrides system entries)
+            for rank, directory in reversed(list(enumerate(self.dirs))):
+                for path in Path(directory).rglob("*.desktop"):
+                    self._load(rank, directory, path)
+        return self
+
+    def _desktop_id(self, relpath):
+        # the id of applications/vendor/app.desktop is vendor-app.desktop
+        return relpath.replace(os.sep, "-")
+
+    def _load(self, rank, directory, path):
+        relpath = os.path.relpath(path, directory)
+        desktop_id = self._desktop_id(relpath)
+        if self._sources.get(desktop_id, (rank,))[0] < rank:
+            return  # shadowed by a higher-priority directory
+        self._remove(desktop_id)
+        entry = parse_desktop_file(path, desktop_id)
+        if entry is None:
+            return
+        self.entries[desktop_id] = entry
+        self._sources[desktop_id] = (rank, relpath)
+        for term, weight in self._entry_terms(entry):
+            self._add_term(term, desktop_id, weight)
+
+    def _entry_terms(self, entry):
+        name = normalize(entry.name)
+        yield name, W_NAME
+        for word in name.split():
+            yield word, W_NAME_WORD
+        if entry.generic_name:
+            yield normalize(entry.generic_name), W_GENERIC
+        for keyword in entry.keywords:
+            yield normalize(keyword), W_KEYWORD
+        if entry.binary:
+            yield normalize(entry.binary), W_EXEC
+        yield normalize(entry.id[:-len(".desktop")]), W_EXEC
+
+    def _add_term(self, term, desktop_id, weight):
+        if not term:
+            return
+        owners = self._terms.get(term)
+        if owners is None:
+            owners = self._terms[term] = {}
+            grams = trigrams(term)
+            self._grams[term] = len(grams)
+            for g in grams:
+                self._postings.setdefault(g, set()).add(term)
+        owners[desktop_id] = max(weight, owners.get(desktop_id, 0))
+
+    def _remove(self, desktop_id):
+        entry = self.entries.pop(desktop_id, None)
+        self._sources.pop(desktop_id, None)
+        if entry is None:
+            return
+        for term, _ in self._entry_terms(entry):
+            owners = self._terms.get(term)
+            if owners is None:
+                continue
+            owners.pop(desktop_id, None)
+            if not owners:
+                del self._terms[term]
+                del self._grams[term]
+                for g in trigrams(term):
+                    self._postings[g].discard(term)
+
+    # -------------------------
+    # Incremental refresh
+    # -------------------------
+
+    def watch(self):
+        """Follow installs/removals through inotify (Linux only)."""
+        if self._watcher is not None or not al_inotify.available():
+            return False
+        self._watcher = al_inotify.DirectoryWatcher(self._on_change)
+        for directory in self.dirs:
+            for path in [Path(directory)] + [p for p in Path(directory).rglob("*") if p.is_dir()]:
+                if path.is_dir():
+                    self._watcher.watch(str(path))
+        return True
+
+    def _on_change(self, path, mask):
+        if mask & al_inotify.IN_ISDIR:
+            if mask & (al_inotify.IN_CREATE | al_inotify.IN_MOVED_TO):
+                self._watcher.watch(path)
+            return
+        if not path.endswith(".desktop"):
+            return
+
+        with self._lock:
+            for rank, directory in enumerate(self.dirs):
+                if path.startswith(directory.rstrip(os.sep) + os.sep):
+                    break
+            else:
+                return
+
+            relpath = os.path.relpath(path, directory)
+            desktop_id = self._desktop_id(relpath)
+            if os.path.exists(path):
+                self._load(rank, directory, path)
+            elif self._sources.get(desktop_id) == (rank, relpath):
+                self._remove(desktop_id)
+                # a lower-priority copy may now be visible
+                for lower in range(rank + 1, len(self.dirs)):
+                    candidate = os.path.join(self.dirs[lower], relpath)
+                    if os.path.exists(candidate):
+                        self._load(lower, self.dirs[lower], candidate)
+                        break
+
+    def close(self):
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+
+    def _best(self, owners):
+        return max(
+            owners.items(),
+            key=lambda item: (item[1], -len(self.entries[item[0]].name)),
+        )
+
+    def resolve(self, name):
+        """Best DesktopEntry for a spoken/typed app name, or None."""
+        query = normalize(name)
+        if not query:
+            return None
+
+        with self._lock:
+            owners = self._terms.get(query)
+            if owners:
+                return self.entries[self._best(owners)[0]]
+
+            grams = trigrams(query)
+            shared = {}
+            for g in grams:
+                for term in self._postings.get(g, ()):
+                    shared[term] = shared.get(term, 0) + 1
+
+            best_id, best_score = None, FUZZY_CUTOFF
+            for term, n in shared.items():
+                dice = 2.0 * n / (len(grams) + self._grams[term])
+                if dice < best_score:
+                    continue  # weights are <= 1, this term cannot win
+                desktop_id, weight = self._best(self._terms[term])
+                score = dice * weight
+                if score > best_score:
+                    best_id, best_score = desktop_id, score
+
+            return self.entries.get(best_id)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Shared index, built on first use and kept current via inotify."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = AppIndex().build()
+            _index.watch()
+        return _index
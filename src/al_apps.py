@@ -1,7 +1,29 @@
-import platform
+import os
+import shutil
 import subprocess
 
-SYSTEM = platform.system().lower()
+from al_platform import SYSTEM
+
+
+def _desktop_entry(name):
+    """Installed .desktop entry for name (Linux only), else None."""
+    if SYSTEM != "linux":
+        return None
+    try:
+        from al_appindex import get_index
+        return get_index().resolve(name)
+    except Exception:
+        return None
+
+
+def _launch(argv):
+    subprocess.Popen(
+        argv,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
 
 def open_app(name):
     if SYSTEM == "darwin":
@@ -11,7 +33,11 @@ def open_app(name):
             f'tell application "{name}" to activate'
         ], check=False)
     elif SYSTEM == "linux":
-        subprocess.run(["xdg-open", name], check=False)
+        entry = _desktop_entry(name)
+        if entry is not None:
+            _launch(entry.argv())
+        else:
+            subprocess.run(["xdg-open", name], check=False)
 
 def open_url(url):
     if not url.startswith("http"):
@@ -25,16 +51,109 @@ def open_url(url):
 
 
 def close_app(app_name):
+    """Close an app; raises RuntimeError when no process of it was found."""
     if SYSTEM == "darwin":
         subprocess.run(["osascript", "-e", f'quit app "{app_name}"'], check=False)
     elif SYSTEM == "linux":
-        subprocess.run(["pkill", "-f", app_name], check=False)
-def open_url_in_app(app, url):
-    import platform, subprocess
+        # no `pkill -f` fallback: it signals anything whose arguments
+        # merely contain the word ("code" in an editor's file path)
+        from al_procs import app_dir, app_keys, get_table
+        entry = _desktop_entry(app_name)
+        if not get_table().terminate(app_keys(entry), app_dir(entry)):
+            raise RuntimeError(f"{app_name} is not running")
+
+
+def open_url_in_app(app, url, count=1):
+    # a running Chromium-family browser takes all tabs over one connection
+    try:
+        import al_browser
+        count -= al_browser.open_urls(app, [url] * count)
+    except ImportError:
+        pass
 
-    system = platform.system().lower()
+    for _ in range(count):
+        if SYSTEM == "darwin":
+            subprocess.run(["open", "-a", app, url], check=False)
+        elif SYSTEM == "linux":
+            entry = _desktop_entry(app)
+            if entry is not None:
+                _launch(entry.argv(url))
+            else:
+                subprocess.run([app, url], check=False)
+
+
+# -------------------------
+# Pre-warming
+# -------------------------
+
+def _readahead(paths, max_bytes):
+    """Ask the kernel to page in these files, up to max_bytes in total."""
+    advised = 0
+    for path in paths:
+        try:
+            if not os.path.isfile(path):
+                continue
+            size = os.path.getsize(path)
+            if advised + size > max_bytes:
+                continue
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            advised += size
+        except (AttributeError, OSError):
+            pass
+        finally:
+            os.close(fd)
+    return advised
+
+
+def is_running(name):
+    if SYSTEM != "linux":
+        return False
+    try:
+        from al_procs import app_dir, app_keys, get_table
+    except ImportError:
+        return False
+    entry = _desktop_entry(name)
+    return bool(get_table().find(app_keys(entry), app_dir(entry)))
+
+
+def prewarm_app(name, launch=False, max_bytes=256 << 20):
+    """
+    Make the next open of `name` fast: resolve it and read its files
+    ahead into the page cache, or (launch=True) start it in the
+    background. Returns the bytes read ahead.
+    """
+    if SYSTEM == "darwin":
+        if launch:
+            # -g: do not bring to the foreground, -j: launch hidden
+            subprocess.run(["open", "-g", "-j", "-a", name], check=False)
+        return 0
+    if SYSTEM != "linux":
+        return 0
 
-    if system == "darwin":
-        subprocess.run(["open", "-a", app, url], check=False)
-    elif system == "linux":
-        subprocess.run([app, url], check=False)
\ No newline at end of file
+    entry = _desktop_entry(name)
+    if entry is None:
+        return 0
+    argv = entry.argv()
+    binary = shutil.which(argv[0]) if argv else None
+    if binary is None:
+        return 0
+    binary = os.path.realpath(binary)
+    directory = os.path.dirname(binary)
+    if directory in map(os.path.realpath, os.get_exec_path()):
+        paths = [binary]    # a shared bin directory: just the executable
+    else:
+        # an app bundle such as /opt/google/chrome: its libraries and resources
+        try:
+            names = sorted(os.listdir(directory))
+            paths = [binary] + [os.path.join(directory, n) for n in names
+                                if os.path.join(directory, n) != binary]
+        except OSError:
+            paths = [binary]
+    advised = _readahead(paths, max_bytes)
+    if launch and not is_running(name):
+        _launch(argv)
+    return advised
@@ -0,0 +1,196 @@
+# al_backend.py
+#
+# Everything ALAssistant does to the outside world goes through one
+# backend object:
+#
+#   SystemBackend     - the real thing (al_apps, al_device, al_media,
+#                       al_tts, al_llm); system state questions are
+#                       answered from the al_probe cache
+#   RecordingBackend  - a fake that records each call, optionally sleeping
+#                       a fixed time per operation; used by benchmarks and
+#                       replays so nothing is launched
+#   SessionBackend    - one daemon session's view of a shared backend
+#
+# OPERATIONS is the interface; a backend implements every name in it.
+
+import os
+import threading
+import time
+from collections import deque
+
+from al_platform import SYSTEM, lazy
+
+al_apps = lazy("al_apps")
+al_device = lazy("al_device")
+al_llm = lazy("al_llm")
+al_media = lazy("al_media")
+al_tts = lazy("al_tts")
+
+UPDATE_CHECK_TIMEOUT = 60
+
+OPERATIONS = (
+    # apps
+    "open_app", "close_app", "open_url", "open_url_in_app", "prewarm_app",
+    # system settings
+    "open_settings", "open_location_settings", "check_for_updates",
+    "open_update_settings", "update_status", "location_state",
+    # media
+    "play", "pause", "next_track", "previous_track", "wait_until_ready",
+    # terminal, speech, LLM
+    "clear_screen", "say", "respond",
+)
+
+
+class SystemBackend:
+    def __init__(self, prober=None):
+        self._prober = prober
+
+    @property
+    def prober(self):
+        if self._prober is None:
+            import al_probe
+
+            self._prober = al_probe.get_prober()
+        return self._prober
+
+    def open_app(self, name):
+        al_apps.open_app(name)
+
+    def close_app(self, name):
+        al_apps.close_app(name)
+
+    def open_url(self, url):
+        al_apps.open_url(url)
+
+    def open_url_in_app(self, app, url, count=1):
+        al_apps.open_url_in_app(app, url, count)
+
+    def prewarm_app(self, name, launch=False, max_bytes=256 << 20):
+        return al_apps.prewarm_app(name, launch, max_bytes)
+
+    def open_settings(self):
+        al_device.open_settings()
+
+    def open_location_settings(self):
+        al_device.open_location_settings()
+        self.prober.invalidate("location")
+
+    def check_for_updates(self):
+        """
+        Probe now; the pending updates, or None if the check failed. After
+        UPDATE_CHECK_TIMEOUT the last good reading answers; the probe
+        finishes in the background.
+        """
+        reading = self.prober.refresh_now("updates", timeout=UPDATE_CHECK_TIMEOUT)
+        if reading is None:
+            reading = self.prober.get("updates")
+        return reading.value if reading is not None and reading.error is None else None
+
+    def update_status(self):
+        """Cached pending updates, or None when not fresh."""
+        return self.prober.fresh("updates")
+
+    def location_state(self):
+        state = self.prober.fresh("location")
+        return state or "unknown"
+
+    def open_update_settings(self):
+        al_device.open_update_settings()
+
+    def play(self, count=1):
+        al_media.play(count)
+
+    def pause(self, count=1):
+        al_media.pause(count)
+
+    def next_track(self, count=1):
+        al_media.next_track(count)
+
+    def previous_track(self, count=1):
+        al_media.previous_track(count)
+
+    def wait_until_ready(self, player):
+        return al_media.wait_until_ready(player)
+
+    def clear_screen(self):
+        os.system("cls" if SYSTEM == "windows" else "clear")
+
+    def say(self, text):
+        al_tts.speak(text)
+
+    def respond(self, text, on_sentence, generation=None, history=None):
+        return al_llm.respond(text, on_sentence=on_sentence, generation=generation,
+                              history=history)
+
+
+class RecordingBackend:
+    """
+    Fake backend. Every call is appended to `calls` as (operation, args),
+    keeping the last `limit` when given; `delays` maps operations to
+    seconds to sleep (a stand-in for the real cost), `results` to return
+    values.
+    """
+
+    def __init__(self, delays=None, results=None, limit=None):
+        self.delays = dict(delays or {})
+        self.limit = limit
+        self.results = {
+            "wait_until_ready": True, "respond": "",
+            "check_for_updates": [], "location_state": "unknown",
+        }
+        self.results.update(results or {})
+        self.calls = deque(maxlen=limit)
+        self._lock = threading.Lock()
+
+    def __getattr__(self, operation):
+        if operation not in OPERATIONS:
+            raise AttributeError(operation)
+
+        def call(*args, **kwargs):
+            # keep plain values only (not callbacks), so replays compare equal
+            plain = tuple(a for a in args if isinstance(a, (str, int, float, bool)))
+            with self._lock:
+                self.calls.append((operation, plain))
+            delay = self.delays.get(operation)
+            if delay:
+                time.sleep(delay)
+            return self.results.get(operation)
+
+        call.__name__ = operation
+        return call
+
+    def take(self):
+        """Return the calls recorded so far and start a new list."""
+        with self._lock:
+            calls, self.calls = self.calls, deque(maxlen=self.limit)
+        return list(calls)
+
+
+class SessionBackend:
+    """
+    One daemon session's view of the shared backend. What AL says goes to
+    the session's client through `output` (and aloud unless the session
+    is silent); LLM answers continue the session's own conversation.
+    Every other operation is the shared backend's.
+    """
+
+    def __init__(self, shared, output, aloud=True):
+        self.shared = shared
+        self.output = output
+        self.aloud = aloud
+        self.history = None
+
+    def say(self, text):
+        self.output(text)
+        if self.aloud:
+            self.shared.say(text)
+
+    def respond(self, text, on_sentence, generation=None):
+        if self.history is None:
+            self.history = al_llm.conversation()
+        return self.shared.respond(text, on_sentence, generation, self.history)
+
+    def __getattr__(self, operation):
+        if operation not in OPERATIONS:
+            raise AttributeError(operation)
+        return getattr(self.shared, operation)
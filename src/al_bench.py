@@ -0,0 +1,2582 @@
+#!/usr/bin/env python3
+# al_bench.py
+#
+# Offline benchmarks for the AL command pipeline. They measure; whether
+# the code behaves is checked by the tests (python -m pytest tests).
+#
+#   python3 al_bench.py dispatch [-n 100000] [--extra 300]
+#   python3 al_bench.py wake [-n 20]
+#   python3 al_bench.py tts [-n 5] [--play]
+#   python3 al_bench.py ttspipe [-n 2] [--engine cpu|system] [--rtf 0.15] [--workers N]
+#   python3 al_bench.py mpris [-n 200]
+#   python3 al_bench.py apps [--apps 1000]
+#   python3 al_bench.py procs [--procs 2000] [-n 20]
+#   python3 al_bench.py stt [--wav FILE] [--model DIR]
+#   python3 al_bench.py wakeword [--fixtures DIR]
+#   python3 al_bench.py tokens [-n 100000]
+#   python3 al_bench.py llm [-n 10]
+#   python3 al_bench.py llmcache [-n 5000]
+#   python3 al_bench.py plan [-n 3]
+#   python3 al_bench.py config [-n 50]
+#   python3 al_bench.py overlay [--seconds 10]
+#   python3 al_bench.py idle [-n 10] [--voice-mb 60]
+#   python3 al_bench.py startup [-n 5] [--budget-ms 150]   (exit 1 over budget)
+#   python3 al_bench.py trace [-n 200000]
+#   python3 al_bench.py replay [-n 5000] [--golden FILE] [--update-golden]
+#   python3 al_bench.py context [-n 2000]
+#   python3 al_bench.py probe [-n 5]
+#   python3 al_bench.py prewarm [--days 60] [--history context.db] [--launch-ms 1200]
+#   python3 al_bench.py sessions [--sessions 300] [-n 20] [--think-ms 0]
+#   python3 al_bench.py browser [-n 50] [--tab-ms 1]
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from al import INTENTS, INTENT_TABLE
+from al_intents import IntentRegistry
+
+
+# -------------------------
+# Corpora
+# -------------------------
+
+APPS = ["chrome", "brave", "spotify", "browser", "settings", "firefox", "gedit", "terminal"]
+QUERIES = ["weather", "python docs", "news today", "cheap flights", "pasta recipe"]
+
+TEMPLATES = [
+    "exit", "quit", "bye", "clear",
+    "location services", "open location services", "turn off location services",
+    "turn off", "disable",
+    "open settings", "settings",
+    "check for updates", "software update", "system update",
+    "open software update", "open update settings",
+    "search for {q}", "search again", "again",
+    "close", "close {a}", "closet",
+    "open {a}", "go to {a}", "open {a} and search for {q}",
+    "play", "play some music", "pause", "stop", "next", "skip", "previous", "back",
+    "what time is it", "tell me a joke", "{a}",
+]
+
+
+def command_corpus(n, seed=0):
+    rnd = random.Random(seed)
+    return [
+        rnd.choice(TEMPLATES).format(a=rnd.choice(APPS), q=rnd.choice(QUERIES))
+        for _ in range(n)
+    ]
+
+
+# -------------------------
+# Dispatch
+# -------------------------
+
+def legacy_dispatch(text):
+    """
+    Branch selection of the original if-chain in ALAssistant.handle,
+    with every follow-up context present.
+    """
+    if text in ("exit", "quit", "bye"):
+        return "exit"
+    if text == "clear":
+        return "clear"
+    if "location services" in text:
+        return "location_services"
+    if text in ("turn off", "disable"):
+        return "turn_off"
+    if text in ("open settings", "settings"):
+        return "open_settings"
+    if text in ("check for updates", "software update", "system update"):
+        return "check_updates"
+    if text in ("open software update", "open update settings"):
+        return "open_update_settings"
+    if text.startswith("search for"):
+        return "search"
+    if text in ("search again", "again"):
+        return "search_again"
+    if text.startswith("close"):
+        return "close"
+    if text.startswith(("open", "go to")):
+        return "open"
+    if text.startswith("play"):
+        return "play"
+    if text in ("pause", "stop"):
+        return "pause"
+    if text in ("next", "skip"):
+        return "next"
+    if text in ("previous", "back"):
+        return "previous"
+    return None
+
+
+def registry_dispatch(text, registry=INTENTS):
+    intent = registry.match(text)
+    return intent.name if intent else None
+
+
+def _extra_intents(n):
+    """Synthetic commands standing in for a grown command set."""
+    extra = []
+    for k in range(n):
+        kind = ("exact", "prefixes", "contains")[k % 3]
+        phrase = {
+            "exact": f"run routine {k}",
+            "prefixes": f"start job {k} ",
+            "contains": f"macro {k} now",
+        }[kind]
+        extra.append((f"custom_{k}", kind, phrase))
+    return extra
+
+
+def _grown_dispatchers(extra):
+    """
+    Build an if-chain (as real Python source) and a registry that both
+    hold the stock intents followed by the synthetic ones.
+    """
+    registry = IntentRegistry()
+    for name, handler, phrases in INTENT_TABLE:
+        registry.add(name, handler, **phrases)
+
+    checks = {
+        "exact": "if text == {p!r}:",
+        "prefixes": "if text.startswith({p!r}):",
+        "contains": "if {p!r} in text:",
+    }
+    lines = ["def chain(text, _legacy=_legacy):",
+             "    name = _legacy(text)",
+             "    if name is not None:",
+             "        return name"]
+    for name, kind, phrase in extra:
+        registry.add(name, None, **{kind: (phrase,)})
+        lines.append("    " + checks[kind].format(p=phrase))
+        lines.append(f"        return {name!r}")
+    lines.append("    return None")
+
+    scope = {"_legacy": legacy_dispatch}
+    exec("\n".join(lines), scope)
+    return scope["chain"], registry
+
+
+def _time_per_call(fn, corpus):
+    start = time.perf_counter()
+    for text in corpus:
+        fn(text)
+    return (time.perf_counter() - start) / len(corpus)
+
+
+def bench_dispatch(args):
+    corpus = command_corpus(args.n)
+    chain, registry = legacy_dispatch, INTENTS
+
+    if args.extra:
+        extra = _extra_intents(args.extra)
+        chain, registry = _grown_dispatchers(extra)
+        rnd = random.Random(1)
+        for i in range(0, len(corpus), 4):
+            _, kind, phrase = rnd.choice(extra)
+            corpus[i] = {
+                "exact": phrase,
+                "prefixes": phrase + "please",
+                "contains": "please " + phrase,
+            }[kind]
+
+    def new_path(text):
+        return registry_dispatch(text, registry)
+
+    # both pick the same intent: tests/test_intents.py
+    old = _time_per_call(chain, corpus)
+    new = _time_per_call(new_path, corpus)
+    cold = _time_per_call(registry._lookup, corpus)
+
+    print(f"commands:   {len(corpus)}")
+    print(f"intents:    {len(registry.intents)}")
+    print(f"if-chain:   {old * 1e9:8.0f} ns/command")
+    print(f"registry:   {new * 1e9:8.0f} ns/command")
+    print(f"  no memo:  {cold * 1e9:8.0f} ns/command")
+    return 0
+
+
+# -------------------------
+# Wake-to-ready
+# -------------------------
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _cold_wake():
+    """Old path: a fresh `python3 al.py` until it prints its ready line."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "al.py")],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, text=True,
+    )
+    for line in proc.stdout:
+        if "AL is ready." in line:
+            break
+    elapsed = time.perf_counter() - start
+    proc.stdin.close()
+    proc.wait()
+    return elapsed
+
+
+def _client_wake(env):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-S", os.path.join(HERE, "al_client.py"), "activate"],
+        env=env, stdout=subprocess.DEVNULL, check=True,
+    )
+    return time.perf_counter() - start
+
+
+def _report(label, samples):
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2]
+    print(f"{label:<28} p50 {p50 * 1e3:8.2f} ms   max {samples[-1] * 1e3:8.2f} ms")
+
+
+def bench_wake(args):
+    from al_client import send
+
+    tmp = tempfile.mkdtemp(prefix="al-bench-")
+    env = dict(os.environ, AL_SOCKET=os.path.join(tmp, "al.sock"))
+    daemon = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "al_daemon.py")],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(200):
+            try:
+                send("ping", env["AL_SOCKET"])
+                break
+            except OSError:
+                time.sleep(0.02)
+
+        cold = [_cold_wake() for _ in range(args.n)]
+        client = [_client_wake(env) for _ in range(args.n)]
+        socket_only = []
+        for _ in range(args.n):
+            start = time.perf_counter()
+            send("activate", env["AL_SOCKET"])
+            socket_only.append(time.perf_counter() - start)
+
+        _report("cold python3 al.py", cold)
+        _report("warm daemon (client proc)", client)
+        _report("warm daemon (socket only)", socket_only)
+    finally:
+        try:
+            send("shutdown", env["AL_SOCKET"])
+        except OSError:
+            pass
+        daemon.wait(timeout=5)
+    return 0
+
+
+# -------------------------
+# Speech
+# -------------------------
+
+STOCK_PHRASES = [
+    "Opening system settings", "Searching again", "Goodbye.", "AL is ready.",
+    "Playing music", "Checking for system updates", "Cancelled.", "Close what?",
+    "Which app should I search in?", "Opening software update settings",
+]
+
+HIST_EDGES_MS = [0.1, 0.3, 1, 3, 10, 30, 100, 300, 1000, 3000]
+
+
+def _histogram(label, samples):
+    print(f"{label} ({len(samples)} utterances)")
+    counts = [0] * (len(HIST_EDGES_MS) + 1)
+    for s in samples:
+        ms = s * 1e3
+        i = 0
+        while i < len(HIST_EDGES_MS) and ms > HIST_EDGES_MS[i]:
+            i += 1
+        counts[i] += 1
+    lo = 0
+    for edge, n in zip(HIST_EDGES_MS + [float("inf")], counts):
+        if n:
+            print(f"  {lo:>7} - {edge:<7} ms  {'#' * max(1, 40 * n // len(samples))} {n}")
+        lo = edge
+
+
+def bench_tts(args):
+    import al_tts
+
+    settings = al_tts.load_voice_settings()
+    engine = al_tts.load_engine(settings["voice_model"])
+    if engine is None or engine.name == "say":
+        print("no cacheable TTS engine (Piper or espeak) available")
+        return 1
+
+    player = al_tts.play_pcm if args.play else (lambda pcm, rate: None)
+    worker = al_tts.TTSWorker(engine=engine, settings=settings, player=player)
+    for _ in range(args.n):
+        for phrase in STOCK_PHRASES:
+            worker.speak(phrase)
+            worker.wait()
+    worker.stop()
+
+    print(f"engine: {engine.name}   cached phrases: {len(worker.cache)}")
+    _histogram("cold (synthesized)", [t for hit, t in worker.latencies if not hit])
+    _histogram("cached (PCM replay)", [t for hit, t in worker.latencies if hit])
+    return 0
+
+
+LONG_REPLY_SENTENCES = [
+    "I can open and close apps, search the web and control your music.",
+    "Say open followed by an app name to start it, or close to quit it again.",
+    "To search, say search for and then what you are looking for.",
+    "I remember the last app you used, so search again repeats your search there.",
+    "Media commands such as play, pause, next and previous go to Spotify.",
+    "For system settings, ask about location services or software updates.",
+    "Anything else is answered by the local language model, one sentence at a time.",
+    "You can interrupt me at any time by simply speaking over me.",
+]
+
+
+def long_reply(sentences):
+    return " ".join(LONG_REPLY_SENTENCES[i % len(LONG_REPLY_SENTENCES)]
+                    for i in range(sentences))
+
+
+class _CPUEngine:
+    """Stand-in for a neural voice: burns `rtf` seconds of CPU per second of audio."""
+
+    name = "cpu-voice"
+    parallel = "process"
+
+    def __init__(self, rtf=0.15, rate=22050, chars_per_second=15.0):
+        self.rtf = rtf
+        self.rate = rate
+        self.chars_per_second = chars_per_second
+
+    @property
+    def factory(self):
+        return _CPUEngine, (self.rtf, self.rate, self.chars_per_second)
+
+    def synthesize(self, text, speed, pitch):
+        seconds = len(text) / (self.chars_per_second * speed)
+        # CPU time, not wall time: parallel renders must really compete for cores
+        end = time.thread_time() + self.rtf * seconds
+        x = 0
+        while time.thread_time() < end:
+            x += 1
+        return b"\0\0" * int(seconds * self.rate), self.rate
+
+
+class _ClockPlayer:
+    """Plays in simulated real time: records first audio, underruns and audio length."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.first = self.last = self.cursor = None
+        self.gaps = 0.0
+        self.audio = 0.0
+
+    def __call__(self, pcm, rate):
+        now = time.perf_counter()
+        if self.first is None:
+            self.first = self.cursor = now
+        elif now > self.cursor:
+            self.gaps += now - self.cursor  # the next sentence was not ready in time
+        seconds = len(pcm) / 2 / rate
+        self.cursor = max(now, self.cursor) + seconds
+        self.audio += seconds
+        self.last = now
+
+
+def bench_ttspipe(args):
+    import al_tts
+
+    if args.workers is None:
+        args.workers = al_tts.SYNTH_WORKERS
+    if args.engine == "system":
+        engine = al_tts.load_engine(al_tts.load_voice_settings()["voice_model"])
+        if engine is None or engine.name == "say":
+            print("no Piper or espeak voice available; try --engine cpu")
+            return 1
+    else:
+        engine = _CPUEngine(rtf=args.rtf)
+    settings = {"voice_model": None, "speed": 1.0, "pitch": 1.0}
+    replies = [("short", long_reply(1)), ("medium", long_reply(4)),
+               ("very long", long_reply(20))]
+
+    class Serial:
+        """The same voice without a pool: sentences rendered one after another."""
+
+        name = engine.name
+        synthesize = staticmethod(engine.synthesize)
+
+    player = _ClockPlayer()
+    pooled = al_tts.TTSWorker(engine=engine, settings=settings, player=player,
+                              cache=al_tts.PCMCache(max_bytes=0), workers=args.workers)
+    serial = al_tts.TTSWorker(engine=Serial(), settings=settings, player=player,
+                              cache=al_tts.PCMCache(max_bytes=0))
+    start = time.perf_counter()
+    pooled.speak(long_reply(2 * args.workers + 1))  # start and load the pool
+    pooled.wait()
+    print(f"engine: {engine.name}   CPUs: {os.cpu_count()}   pool: {args.workers} "
+          f"{engine.parallel} workers, warm-up {time.perf_counter() - start:.2f} s")
+    print(f"{'reply':<10} {'chars':>6} {'audio s':>8}  {'mode':<22} {'first audio':>11} "
+          f"{'RTF':>6} {'gaps s':>7}")
+
+    for label, text in replies:
+        rows = []
+        # before: one synthesis call for the whole text, then playback
+        for _ in range(args.n):
+            start = time.perf_counter()
+            pcm, rate = engine.synthesize(text, 1.0, 1.0)
+            ready = time.perf_counter() - start
+            audio = len(pcm) / 2 / rate
+            rows.append(("whole text", ready, ready / audio, 0.0))
+        for mode, worker in (("sentences, serial", serial), ("sentences, pooled", pooled)):
+            for _ in range(args.n):
+                player.reset()
+                start = time.perf_counter()
+                worker.speak(text)
+                worker.wait()
+                rows.append((mode, player.first - start, (player.last - start) / player.audio,
+                             player.gaps))
+        for mode in ("whole text", "sentences, serial", "sentences, pooled"):
+            mine = [r for r in rows if r[0] == mode]
+            first = statistics.median(r[1] for r in mine)
+            rtf = statistics.median(r[2] for r in mine)
+            gaps = statistics.median(r[3] for r in mine)
+            print(f"{label:<10} {len(text):>6} {audio:>8.1f}  {mode:<22} "
+                  f"{first * 1e3:>9.0f}ms {rtf:>6.2f} {gaps:>7.2f}")
+    pooled.stop()
+    serial.stop()
+    print("RTF: time until the last sentence was ready / audio length; "
+          "gaps: playback stalls waiting for synthesis")
+    return 0
+
+
+# -------------------------
+# Media (MPRIS)
+# -------------------------
+
+class StandInPlayer(threading.Thread):
+    """Minimal MPRIS player that answers and counts Player calls."""
+
+    def __init__(self, address, name):
+        super().__init__(daemon=True)
+        from jeepney import message_bus
+        from jeepney.io.blocking import Proxy, open_dbus_connection
+        from al_mpris import MPRIS_PREFIX
+
+        self.conn = open_dbus_connection(address)
+        Proxy(message_bus, self.conn).RequestName(MPRIS_PREFIX + name)
+        self.calls = {}
+
+    def run(self):
+        from jeepney import HeaderFields, MessageFlag, MessageType, new_method_return
+
+        while True:
+            try:
+                msg = self.conn.receive()
+            except Exception:
+                return
+            if msg.header.message_type is not MessageType.method_call:
+                continue
+            member = msg.header.fields[HeaderFields.member]
+            self.calls[member] = self.calls.get(member, 0) + 1
+            if not msg.header.flags & MessageFlag.no_reply_expected:
+                self.conn.send(new_method_return(msg))
+
+    def stop(self):
+        self.conn.close()
+
+
+def _private_bus():
+    proc = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    return proc, proc.stdout.readline().strip()
+
+
+def bench_mpris(args):
+    import shutil
+    from al_mpris import MPRISBackend
+
+    if not shutil.which("dbus-daemon"):
+        print("dbus-daemon not installed")
+        return 1
+
+    # discovery, batching and NameOwnerChanged are covered by tests/test_mpris.py
+    bus, address = _private_bus()
+    try:
+        player = StandInPlayer(address, "benchplayer")
+        player.start()
+        backend = MPRISBackend(address)
+
+        single = []
+        for _ in range(args.n):
+            start = time.perf_counter()
+            backend.call("Play", player="benchplayer")
+            single.append(time.perf_counter() - start)
+
+        batch = []
+        for _ in range(args.n // 10 or 1):
+            start = time.perf_counter()
+            backend.call("Next", count=5, player="benchplayer")
+            batch.append(time.perf_counter() - start)
+
+        _report("mpris, one call", single)
+        _report("mpris, skip 5 (batched)", batch)
+
+        env = dict(os.environ, DBUS_SESSION_BUS_ADDRESS=address)
+        if shutil.which("playerctl"):
+            forks = []
+            for _ in range(min(args.n, 50)):
+                start = time.perf_counter()
+                subprocess.run(["playerctl", "-p", "benchplayer", "play"], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                forks.append(time.perf_counter() - start)
+            _report("playerctl fork, one call", forks)
+            _report("playerctl fork, skip 5", [t * 5 for t in forks])
+        else:
+            forks = []
+            for _ in range(min(args.n, 50)):
+                start = time.perf_counter()
+                subprocess.run(["true"])
+                forks.append(time.perf_counter() - start)
+            print("playerctl not installed; bare fork+exec lower bound:")
+            _report("fork+exec of `true`", forks)
+
+        backend.close()
+        player.stop()
+    finally:
+        bus.terminate()
+        bus.wait()
+    return 0
+
+
+# -------------------------
+# App resolution
+# -------------------------
+
+APP_WORDS_A = ["blue", "quick", "open", "deep", "bright", "silent", "rapid", "little",
+               "north", "paper", "signal", "amber", "cobalt", "fern", "granite",
+               "harbor", "ivory", "juniper", "kite", "lunar", "maple", "nimbus",
+               "orbit", "pixel", "quartz", "raven", "sable", "tidal", "umber", "vivid",
+               "willow", "zephyr"]
+APP_WORDS_B = ["editor", "player", "browser", "studio", "viewer", "mail", "notes",
+               "terminal", "calendar", "camera", "maps", "music", "office", "paint",
+               "reader", "recorder", "scanner", "sync", "tasks", "weather", "wallet",
+               "chat", "clock", "files", "draw", "code", "photos", "radio", "writer",
+               "budget", "fonts", "backup"]
+
+
+def _write_desktop_files(directory, n, rnd):
+    names = []
+    pairs = [(a, b) for a in APP_WORDS_A for b in APP_WORDS_B]
+    rnd.shuffle(pairs)
+    for i, (a, b) in enumerate(pairs[:n]):
+        binary = f"{a}-{b}"
+        name = f"{a.title()} {b.title()}"
+        with open(os.path.join(directory, f"org.bench.{binary}.desktop"), "w") as f:
+            f.write(
+                "[Desktop Entry]\nType=Application\n"
+                f"Name={name}\nGenericName={b.title()} App\n"
+                f"Keywords={a};{b};\nExec={binary} %U\n"
+            )
+        names.append((f"org.bench.{binary}.desktop", name, binary))
+    return names
+
+
+def _typo(word, rnd):
+    i = rnd.randrange(len(word))
+    op = rnd.choice(("drop", "swap", "sub"))
+    if op == "drop":
+        return word[:i] + word[i + 1:]
+    if op == "swap" and i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rnd.choice("abcdefghijklmnopqrstuvwxyz") + word[i + 1:]
+
+
+def bench_apps(args):
+    import difflib
+    import shutil
+    from al_appindex import AppIndex
+
+    rnd = random.Random(0)
+    tmp = tempfile.mkdtemp(prefix="al-apps-")
+    try:
+        apps = _write_desktop_files(tmp, args.apps, rnd)
+
+        start = time.perf_counter()
+        index = AppIndex([tmp]).build()
+        build = time.perf_counter() - start
+
+        queries = []
+        for desktop_id, name, binary in rnd.sample(apps, min(len(apps), 300)):
+            queries.append(("exact", name.lower(), desktop_id))
+            queries.append(("binary", binary, desktop_id))
+            queries.append(("typo", _typo(name.lower(), rnd), desktop_id))
+
+        lowered = {name.lower(): desktop_id for desktop_id, name, _ in apps}
+        results = {}
+        for label, resolve in (
+            ("index", lambda q: getattr(index.resolve(q), "id", None)),
+            ("difflib", lambda q: lowered.get(
+                (difflib.get_close_matches(q, lowered, n=1, cutoff=0.6) or [None])[0])),
+        ):
+            for kind in ("exact", "binary", "typo"):
+                subset = [(q, want) for k, q, want in queries if k == kind]
+                times, hits = [], 0
+                for q, want in subset:
+                    t = time.perf_counter()
+                    got = resolve(q)
+                    times.append(time.perf_counter() - t)
+                    hits += got == want
+                results[label, kind] = (times, hits / len(subset))
+
+        print(f"{len(apps)} .desktop files, index built in {build * 1e3:.1f} ms")
+        for (label, kind), (times, accuracy) in results.items():
+            times.sort()
+            print(f"  {label:<8} {kind:<7} p50 {times[len(times) // 2] * 1e6:9.1f} us"
+                  f"   p99 {times[int(len(times) * 0.99)] * 1e6:9.1f} us"
+                  f"   accuracy {accuracy:6.1%}")
+
+        if index.watch():
+            path = os.path.join(tmp, "org.bench.new-app.desktop")
+            start = time.perf_counter()
+            with open(path, "w") as f:
+                f.write("[Desktop Entry]\nType=Application\nName=Brand New App\nExec=brand-new\n")
+            while index.resolve("brand new app") is None:
+                if time.perf_counter() - start > 2:
+                    print("  inotify refresh: new app not picked up")
+                    break
+                time.sleep(0.001)
+            else:
+                print(f"  inotify refresh: new app resolvable after "
+                      f"{(time.perf_counter() - start) * 1e3:.1f} ms")
+            index.close()
+    finally:
+        shutil.rmtree(tmp)
+    return 0
+
+
+# -------------------------
+# Closing apps
+# -------------------------
+
+def bench_procs(args):
+    import shutil
+    from al_procs import ProcessTable
+
+    tmp = tempfile.mkdtemp(prefix="al-procs-")
+    target = os.path.join(tmp, "benchapp")
+    os.symlink(shutil.which("sleep"), target)
+
+    quiet = dict(stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    fillers = [subprocess.Popen(["sleep", "600"], **quiet) for _ in range(args.procs)]
+    # innocent process whose arguments merely mention the app
+    bystander = subprocess.Popen(["sh", "-c", "sleep 600", "benchapp"], **quiet)
+
+    table = ProcessTable()
+    try:
+        start = time.perf_counter()
+        table.refresh()
+        print(f"{len(table)} processes, cold table build "
+              f"{(time.perf_counter() - start) * 1e3:.1f} ms")
+
+        def close_with_table():
+            table.terminate({"benchapp"}, timeout=1)
+
+        def close_with_pkill():
+            subprocess.run(["pkill", "-f", "benchapp"], **quiet)
+
+        for label, close in (("process table", close_with_table), ("pkill -f", close_with_pkill)):
+            samples, collateral = [], 0
+            for _ in range(args.n):
+                app = subprocess.Popen([target, "600"], **quiet)
+                time.sleep(0.01)
+                start = time.perf_counter()
+                close()
+                samples.append(time.perf_counter() - start)
+                app.wait(timeout=5)
+                if bystander.poll() is not None:
+                    collateral += 1
+                    bystander = subprocess.Popen(["sh", "-c", "sleep 600", "benchapp"], **quiet)
+            _report(label, samples)
+            print(f"{'':<28} unrelated processes killed: {collateral}")
+    finally:
+        for proc in fillers + [bystander]:
+            proc.kill()
+            proc.wait()
+        shutil.rmtree(tmp)
+    return 0
+
+
+# -------------------------
+# Speech to text
+# -------------------------
+
+class _CountingRecognizer:
+    """Stand-in recognizer: reports how much audio it was fed."""
+
+    def __init__(self):
+        self.frames = 0
+
+    def accept(self, frame):
+        self.frames += 1
+        return f"{self.frames} frames" if self.frames % 10 == 0 else ""
+
+    def finish(self):
+        text, self.frames = f"utterance of {self.frames} frames", 0
+        return text
+
+
+def _synthetic_speech_wav(path, utterances, rnd):
+    """Noise bursts shaped like short commands, separated by quiet gaps."""
+    import math
+    import wave
+    from array import array
+    import al_stt
+
+    samples = array("h")
+    for _ in range(utterances):
+        samples.extend(int(rnd.gauss(0, 30)) for _ in range(int(al_stt.RATE * 0.8)))
+        n = int(al_stt.RATE * rnd.uniform(0.6, 1.5))
+        for i in range(n):
+            envelope = math.sin(math.pi * i / n) ** 0.3
+            samples.append(int(envelope * 6000 * math.sin(i * 0.09) + rnd.gauss(0, 800)))
+    samples.extend(int(rnd.gauss(0, 30)) for _ in range(int(al_stt.RATE * 1.0)))
+
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(al_stt.RATE)
+        w.writeframes(samples.tobytes())
+
+
+def bench_stt(args):
+    import shutil
+    import al_stt
+
+    tmp = tempfile.mkdtemp(prefix="al-stt-")
+    try:
+        path, expected = args.wav, None
+        if path is None:
+            path, expected = os.path.join(tmp, "speech.wav"), args.utterances
+            _synthetic_speech_wav(path, expected, random.Random(0))
+
+        if args.model:
+            recognizer, name = al_stt.VoskRecognizer(os.path.expanduser(args.model)), "vosk"
+        else:
+            recognizer, name = _CountingRecognizer(), "front end only (no recognizer)"
+
+        finals, partials = [], []
+        pipeline = al_stt.SpeechPipeline(
+            al_stt.WavSource(path, realtime=args.realtime),
+            recognizer,
+            on_final=finals.append,
+            on_partial=partials.append,
+        )
+        pipeline.run()
+
+        print(f"recognizer: {name}   vad: {type(pipeline.vad).__name__}")
+        print(f"audio: {pipeline.audio_seconds:.1f} s   utterances: {len(finals)}"
+              + (f" (expected {expected})" if expected else "")
+              + f"   partials: {len(partials)}")
+        print(f"CPU per second of audio: {pipeline.cpu_seconds / pipeline.audio_seconds * 1e3:.1f} ms")
+        if args.realtime and pipeline.latencies:
+            _report("end of speech -> dispatch", pipeline.latencies)
+            print(f"{'':<28} (includes the {al_stt.END_MS} ms endpoint silence)")
+    finally:
+        shutil.rmtree(tmp)
+    return 0
+
+
+# -------------------------
+# Wake word
+# -------------------------
+
+def _tone_word(parts, rnd, rate=16000):
+    """Synthetic 'word': a sequence of (seconds, [freqs]) voiced parts."""
+    import math
+    from array import array
+
+    speed = rnd.uniform(0.85, 1.15)
+    gain = rnd.uniform(0.5, 1.5)
+    out = array("h", (int(rnd.gauss(0, 40)) for _ in range(int(rate * 0.3))))
+    for seconds, freqs in parts:
+        n = int(rate * seconds * speed)
+        for i in range(n):
+            env = math.sin(math.pi * i / n) ** 0.5
+            v = sum(math.sin(2 * math.pi * f * i / rate) for f in freqs) / len(freqs)
+            out.append(max(-32767, min(32767, int(gain * env * 9000 * v + rnd.gauss(0, 300)))))
+    out.extend(int(rnd.gauss(0, 40)) for _ in range(int(rate * 0.5)))
+    return out, rate
+
+
+WAKE_WORD = [(0.25, [450, 900]), (0.05, [200]), (0.35, [1400, 2300])]
+DISTRACTORS = [
+    [(0.35, [1400, 2300]), (0.05, [200]), (0.25, [450, 900])],
+    [(0.6, [700])],
+    [(0.2, [300, 600]), (0.2, [2500]), (0.2, [300, 600])],
+    [(0.5, [1000, 1100, 1200])],
+]
+
+
+def _wav_dir(directory):
+    from al_wake import read_wav
+    return [read_wav(p) for p in sorted(Path(directory).glob("*.wav"))]
+
+
+def bench_wakeword(args):
+    from array import array
+    from al_wake import SPOT_RATE, KeywordSpotter
+
+    rnd = random.Random(0)
+    if args.fixtures:
+        enroll = _wav_dir(os.path.join(args.fixtures, "enroll"))
+        positives = _wav_dir(os.path.join(args.fixtures, "positive"))
+        negatives = _wav_dir(os.path.join(args.fixtures, "negative"))
+    else:
+        enroll = [_tone_word(WAKE_WORD, rnd) for _ in range(3)]
+        positives = [_tone_word(WAKE_WORD, rnd) for _ in range(args.n)]
+        negatives = [_tone_word(rnd.choice(DISTRACTORS), rnd) for _ in range(args.n)]
+
+    spotter = KeywordSpotter([KeywordSpotter.features_of(s, r) for s, r in enroll])
+
+    def detect(samples, rate):
+        return spotter.process(samples.tobytes(), rate) or spotter.process(
+            array("h", bytes(2 * rate // 2)).tobytes(), rate)  # trailing silence
+
+    false_reject = sum(not detect(s, r) for s, r in positives)
+    false_accept = sum(detect(s, r) for s, r in negatives)
+
+    # idle: one minute of room noise at the spotter's own rate
+    quiet = array("h", (int(rnd.gauss(0, 60)) for _ in range(SPOT_RATE * 60)))
+    start = time.process_time()
+    for i in range(0, len(quiet), SPOT_RATE // 10):
+        spotter.process(quiet[i:i + SPOT_RATE // 10].tobytes(), SPOT_RATE)
+    idle_cpu = (time.process_time() - start) / 60
+
+    print(f"templates: {len(spotter.templates)}   threshold: {spotter.threshold:.3f}")
+    print(f"false reject: {false_reject}/{len(positives)} "
+          f"({false_reject / max(1, len(positives)):.1%})")
+    print(f"false accept: {false_accept}/{len(negatives)} "
+          f"({false_accept / max(1, len(negatives)):.1%})")
+    print(f"idle CPU (spotter on silence): {idle_cpu * 100:.3f} %")
+    print("hotkey: event driven (pynput), no CPU while keys are up")
+    return 0
+
+
+# -------------------------
+# Utterance parsing
+# -------------------------
+
+LEGACY_NUMBER_WORDS = {"once": 1, "twice": 2, "three": 3, "four": 4, "five": 5}
+
+
+def legacy_parse(raw):
+    """normalize -> correct_typos -> extract_count as ALAssistant used to."""
+    import re
+    from al_tokens import COMMON_CORRECTIONS
+
+    text = raw.lower().strip()
+    text = re.sub(r"[^\w\s.:/]", "", text)
+    text = re.sub(r"\s+", " ", text)
+    text = " ".join(COMMON_CORRECTIONS.get(w, w) for w in text.split())
+
+    words = text.split()
+    count = 1
+    for w in words[:]:
+        if w.isdigit():
+            count = int(w)
+            words.remove(w)
+            break
+        if w in LEGACY_NUMBER_WORDS:
+            count = LEGACY_NUMBER_WORDS[w]
+            words.remove(w)
+            break
+    return " ".join(words), max(1, min(count, 10))
+
+
+COUNTED = ["skip {n}", "next {n}", "previous {n}", "back {n}", "pause {n}",
+           "search again {n}", "{n} skip", "skip {n} times"]
+NUMBERS = ["2", "3", "10", "12", "once", "twice", "three", "four", "five",
+           "twenty three", "seven", "one hundred", "forty"]
+NOISE = ["", "!", "?", ",", "...", "  ", " please"]
+TYPOS = {"search": "serch", "and": "adn", "spotify": "apotify", "settings": "sertings"}
+
+
+def utterance_corpus(n, seed=0):
+    rnd = random.Random(seed)
+    corpus = []
+    for text in command_corpus(n, seed):
+        if rnd.random() < 0.3:
+            text = rnd.choice(COUNTED).format(n=rnd.choice(NUMBERS))
+        if rnd.random() < 0.2:
+            text = " ".join(TYPOS.get(w, w) if rnd.random() < 0.5 else w for w in text.split())
+        if rnd.random() < 0.3:
+            text = text.upper() if rnd.random() < 0.3 else text.title()
+        corpus.append(text + rnd.choice(NOISE))
+    return corpus
+
+
+def bench_tokens(args):
+    from al_tokens import parse
+
+    # behaviour is pinned by tests/test_tokens.py; this is throughput only
+    corpus = utterance_corpus(args.n)
+    old = _time_per_call(legacy_parse, corpus)
+    new = _time_per_call(parse, corpus)
+    print(f"utterances: {len(corpus)} ({len(set(corpus))} distinct)")
+    print(f"old pipeline: {1 / old:12,.0f} utterances/s")
+    print(f"token stream: {1 / new:12,.0f} utterances/s")
+    return 0
+
+
+# -------------------------
+# LLM (mock Ollama)
+# -------------------------
+
+MOCK_ANSWER = (
+    "The capital of France is Paris. It sits on the Seine in the north of "
+    "the country. About two million people live in the city itself, and "
+    "more than twelve million in the wider metropolitan area."
+)
+MOCK_LOAD_S = 0.8       # model load when it is not resident
+MOCK_PREFILL_S = 0.12   # prompt evaluation before the first token
+MOCK_TOKEN_S = 0.025    # per generated token
+
+
+def _mock_ollama():
+    """Ollama-compatible /api/chat on a loopback port; returns (server, stats)."""
+    import json
+    import socket
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    stats = {"connections": 0, "loads": 0, "cancelled": 0, "resident_until": 0.0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # like Ollama (Go), write small chunks immediately
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with lock:
+                stats["connections"] += 1
+
+        def log_message(self, *args):
+            pass
+
+        def _load(self, keep_alive):
+            with lock:
+                cold = time.monotonic() > stats["resident_until"]
+                if cold:
+                    stats["loads"] += 1
+            if cold:
+                time.sleep(MOCK_LOAD_S)
+            seconds = 300
+            if isinstance(keep_alive, str) and keep_alive.endswith("m"):
+                seconds = int(keep_alive[:-1]) * 60
+            elif isinstance(keep_alive, (int, float)):
+                seconds = keep_alive
+            with lock:
+                stats["resident_until"] = time.monotonic() + seconds
+
+        def _send(self, body, chunked=False):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            if chunked:
+                self.send_header("Transfer-Encoding", "chunked")
+            else:
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not chunked:
+                self.wfile.write(body)
+
+        def _chunk(self, data):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            self._load(request.get("keep_alive", "5m"))
+            if self.path == "/api/generate":
+                self._send(json.dumps({"done": True}).encode())
+                return
+
+            time.sleep(MOCK_PREFILL_S)
+            tokens = [w + " " for w in MOCK_ANSWER.split()]
+            if not request.get("stream", True):
+                time.sleep(MOCK_TOKEN_S * len(tokens))
+                body = {"message": {"role": "assistant", "content": MOCK_ANSWER}, "done": True}
+                self._send(json.dumps(body).encode())
+                return
+
+            self._send(b"", chunked=True)
+            try:
+                for token in tokens:
+                    line = {"message": {"role": "assistant", "content": token}, "done": False}
+                    self._chunk(json.dumps(line).encode() + b"\n")
+                    time.sleep(MOCK_TOKEN_S)
+                self._chunk(json.dumps({"done": True}).encode() + b"\n")
+                self._chunk(b"")
+            except OSError:
+                with lock:
+                    stats["cancelled"] += 1
+                self.close_connection = True
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, address: None  # clients hanging up
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+class _SilentEngine:
+    """Stand-in TTS engine: fixed render cost per sentence, no audio."""
+
+    name = "silent"
+
+    def synthesize(self, text, speed, pitch):
+        time.sleep(0.03)
+        return b"\0\0" * 160, 16000
+
+
+def bench_llm(args):
+    import al_llm
+    import al_text
+    import al_tts
+    import requests
+
+    server, stats = _mock_ollama()
+    settings = dict(al_llm.load_llm_settings(), host=f"http://127.0.0.1:{server.server_port}")
+
+    audio_at = []
+    worker = al_tts.TTSWorker(
+        engine=_SilentEngine(),
+        settings={"voice_model": None, "speed": 1.0, "pitch": 1.0},
+        player=lambda pcm, rate: audio_at.append(time.perf_counter()),
+        cache=al_tts.PCMCache(max_bytes=0),
+    )
+
+    # before: one fresh connection per question, whole answer, model unloads
+    before_ttfa, before_total = [], []
+    for _ in range(args.n):
+        start = time.perf_counter()
+        del audio_at[:]
+        reply = requests.post(
+            f"{settings['host']}/api/chat",
+            json={"model": settings["model"], "stream": False, "keep_alive": 0,
+                  "messages": [{"role": "user", "content": "capital of france"}]},
+        ).json()["message"]["content"]
+        before_total.append(time.perf_counter() - start)
+        splitter = al_text.SentenceSplitter()
+        for sentence in splitter.feed(reply) + [splitter.flush()]:
+            worker.speak(sentence)
+        worker.wait()
+        before_ttfa.append(audio_at[0] - start)
+    before_connections = stats["connections"]
+    before_loads = stats["loads"]
+
+    # after: pooled session, streamed sentences, model kept resident
+    client = al_llm.OllamaClient(settings)
+    client.warm()
+    ttft, ttfa, total = [], [], []
+    for _ in range(args.n):
+        client.history.clear()
+        del audio_at[:]
+        generation = al_llm.Generation()
+        client.respond("capital of france", worker.speak, generation)
+        total.append(time.perf_counter() - generation.started)
+        worker.wait()
+        ttft.append(generation.first_token_at - generation.started)
+        ttfa.append(audio_at[0] - generation.started)
+
+    # barge-in: cancel once the first sentence is out
+    cancel_delays = []
+    for _ in range(args.n):
+        generation = al_llm.Generation()
+        cancelled_at = []
+
+        def barge_in(sentence, generation=generation):
+            if not cancelled_at:
+                cancelled_at.append(time.perf_counter())
+                threading.Thread(target=generation.cancel).start()
+
+        client.respond("capital of france", barge_in, generation)
+        cancel_delays.append(time.perf_counter() - cancelled_at[0])
+    time.sleep(0.2)
+
+    worker.stop()
+    client.close()
+    server.shutdown()
+
+    print(f"mock: load {MOCK_LOAD_S * 1e3:.0f} ms, prefill {MOCK_PREFILL_S * 1e3:.0f} ms, "
+          f"{MOCK_TOKEN_S * 1e3:.0f} ms/token, {len(MOCK_ANSWER.split())} tokens")
+    _report("before: time to first audio", before_ttfa)
+    _report("before: full answer", before_total)
+    _report("after: time to first token", ttft)
+    _report("after: time to first audio", ttfa)
+    _report("after: full answer", total)
+    _report("barge-in: cancel to return", cancel_delays)
+    print(f"connections: before {before_connections} for {args.n} questions, "
+          f"after {stats['connections'] - before_connections} for {2 * args.n + 1} requests")
+    print(f"model loads: before {before_loads}, after {stats['loads'] - before_loads}; "
+          f"streams cancelled server-side: {stats['cancelled']}")
+    return 0
+
+
+# -------------------------
+# LLM answer cache
+# -------------------------
+
+# (phrasings of one question, fillers); the first phrasing names the topic
+QUESTION_TEMPLATES = [
+    (["what is the capital of {}", "what is the capital city of {}", "capital of {}",
+      "what is the captial of {}"],
+     ["france", "spain", "peru", "japan", "kenya", "norway"]),
+    (["how many legs does a {} have", "how many legs has a {} got",
+      "number of legs on a {}"],
+     ["spider", "crab", "dog", "bird", "centipede"]),
+    (["who wrote {}", "who is the author of {}", "who was the writer of {}"],
+     ["hamlet", "dracula", "dune", "emma", "ulysses"]),
+    (["how do i {}", "how can i {}", "what is the best way to {}"],
+     ["boil an egg", "tie a tie", "reset my router", "change a tire"]),
+    (["convert {} miles to kilometers", "{} miles in kilometers", "how many kilometers is {} miles"],
+     ["5", "12", "26", "100"]),
+    (["what does {} mean", "meaning of {}", "define {}"],
+     ["ephemeral", "ubiquitous", "serendipity", "hygge"]),
+    (["how tall is {}", "what is the height of {}"],
+     ["mount everest", "the eiffel tower", "big ben"]),
+]
+VOLATILE_QUESTIONS = ["what time is it", "what is the weather today", "latest news"]
+PARAPHRASES = [
+    "{}", "{}", "{}?", "Hey AL, {}?", "{} please", "um {}", "{}!", "So... {}",
+    "could you tell me {}", "tell me {}", "{} again",
+]
+
+
+def question_log(n, seed=0):
+    """[(question, topic)]; topics are Zipf-distributed like a real log."""
+    rnd = random.Random(seed)
+    topics = [(ts, x) for ts, xs in QUESTION_TEMPLATES for x in xs]
+    rnd.shuffle(topics)
+    weights = [1 / (rank + 1) for rank in range(len(topics))]
+    log = []
+    for _ in range(n):
+        if rnd.random() < 0.05:
+            q = rnd.choice(VOLATILE_QUESTIONS)
+            log.append((q, q))
+            continue
+        phrasings, x = rnd.choices(topics, weights)[0]
+        topic = phrasings[0].format(x)
+        question = rnd.choice(phrasings).format(x)
+        question = question.replace("what is", rnd.choice(["what is", "what's"]))
+        question = rnd.choice(PARAPHRASES).format(question)
+        if rnd.random() < 0.3:
+            question = question.capitalize()
+        log.append((question, topic))
+    return log
+
+
+def bench_llmcache(args):
+    import al_llmcache
+
+    llm_seconds = MOCK_PREFILL_S + MOCK_TOKEN_S * len(MOCK_ANSWER.split())
+    path = os.path.join(tempfile.mkdtemp(prefix="al-bench-"), "llm_cache.json")
+    log = question_log(args.n)
+
+    # that no wrong answer is served is checked by tests/test_llmcache.py
+    def replay(cache, log):
+        hits, lookup = {"exact": 0, "semantic": 0}, []
+        for question, topic in log:
+            start = time.perf_counter()
+            answer, tier = cache.get(question)
+            lookup.append(time.perf_counter() - start)
+            if answer is None:
+                cache.put(question, f"answer about {topic}")
+            else:
+                hits[tier] += 1
+        return hits, lookup
+
+    cache = al_llmcache.ResponseCache(path=path, threshold=args.threshold)
+    hits, lookup = replay(cache, log)
+    cache.save()
+
+    total = sum(hits.values())
+    saved = total * llm_seconds - sum(lookup)
+    print(f"replay: {len(log)} questions, {len(set(t for _, t in log))} topics, "
+          f"numpy {'yes' if al_llmcache.np is not None else 'no'}, threshold {args.threshold}")
+    print(f"hit rate: {total / len(log):6.1%}  (exact {hits['exact']}, semantic {hits['semantic']})")
+    lookup.sort()
+    print(f"lookup: p50 {lookup[len(lookup) // 2] * 1e6:.1f} us   "
+          f"p99 {lookup[len(lookup) * 99 // 100] * 1e6:.1f} us")
+    print(f"latency saved: {saved:.0f} s of modeled LLM time "
+          f"({llm_seconds * 1e3:.0f} ms per answer, {len(cache)} entries cached)")
+
+    # a restarted daemon picks up where the old one stopped
+    restarted = al_llmcache.ResponseCache(path=path, threshold=args.threshold).load()
+    hits, _ = replay(restarted, question_log(args.n, seed=1))
+    print(f"after restart: hit rate {sum(hits.values()) / args.n:6.1%}")
+    return 0
+
+
+# -------------------------
+# Compound commands
+# -------------------------
+
+COMPOUND_COMMANDS = [
+    "open spotify and close brave",
+    "pause and close spotify",
+    "open brave and search for cats",
+    "open gedit and open terminal and play",
+    "open firefox and close terminal and next",
+    "close gedit then open terminal",
+]
+# typical cost of each side effect; "playing music" is open + wait + play
+STEP_SECONDS = {
+    "open_app": 0.40, "close_app": 0.15, "open_url_in_app": 0.25,
+    "wait_until_ready": 0.14, "play": 0.06, "pause": 0.06,
+    "next_track": 0.06, "previous_track": 0.06,
+}
+
+
+def bench_plan(args):
+    import contextlib
+    import io
+
+    import al
+    from al_semantics import split_commands
+    from al_tokens import parse
+
+    from al_backend import RecordingBackend
+
+    assistant = al.ALAssistant(backend=RecordingBackend(delays=STEP_SECONDS))
+    quiet = contextlib.redirect_stdout(io.StringIO())
+
+    print(f"{'command':<42} {'one by one':>10} {'planned':>9}  plan")
+    for text in COMPOUND_COMMANDS:
+        serial, planned = [], []
+        for _ in range(args.n):
+            assistant.last_app = None
+            start = time.perf_counter()
+            with quiet:
+                for _, words in split_commands(parse(text).words):
+                    assistant.handle(" ".join(words))
+                    assistant.actions.wait()
+            serial.append(time.perf_counter() - start)
+
+            assistant.last_app = None
+            start = time.perf_counter()
+            with quiet:
+                assistant.handle(text)
+                assistant.actions.wait()
+            planned.append(time.perf_counter() - start)
+
+        plan = al.al_plan.build(parse(text), al.INTENTS, assistant.resolve_app)
+        print(f"{text:<42} {min(serial) * 1e3:8.0f}ms {min(planned) * 1e3:7.0f}ms  "
+              f"{len(plan)} steps, {plan.depth()} sequential")
+    assistant.actions.shutdown()
+    return 0
+
+
+# -------------------------
+# Configuration
+# -------------------------
+
+def bench_config(args):
+    import json
+
+    import al_config
+
+    tmp = Path(tempfile.mkdtemp(prefix="al-bench-"))
+    defaults = al_config.DEFAULTS_PATH
+    service = al_config.ConfigService(
+        defaults=defaults, legacy=tmp / "al_config.json", user=tmp / "al" / "config.json"
+    )
+    if not service.watch():
+        print("inotify not available")
+        return 1
+
+    applied = threading.Event()
+    service.subscribe(lambda old, new: applied.set())
+
+    def timed(write):
+        samples = []
+        for i in range(args.n):
+            applied.clear()
+            start = time.perf_counter()
+            write(i)
+            if not applied.wait(1.0):
+                raise RuntimeError("change was not applied")
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    # the settings app: merge + atomic rename
+    saved = timed(lambda i: service.save_user({"speed": 1.0 + i / 100}))
+
+    # a text editor writing the file in place
+    def edit(i):
+        with open(tmp / "al_config.json", "w") as f:
+            json.dump({"aliases": {"editor": f"App {i}"}}, f)
+    edited = timed(edit)
+
+    service.close()
+
+    def per_command_read():
+        for path in (defaults, tmp / "al_config.json", tmp / "al" / "config.json"):
+            with open(path) as f:
+                json.load(f)
+
+    reads = _time_per_call(lambda _: per_command_read(), range(2000))
+    snapshot = _time_per_call(lambda _: service.snapshot.aliases, range(200000))
+
+    _report("settings app save -> live", saved)
+    _report("editor write -> live", edited)
+    print(f"per-command config access: {reads * 1e6:8.1f} us reading files, "
+          f"{snapshot * 1e9:6.0f} ns from the snapshot")
+    return 0 if max(saved + edited) < 0.1 else 1
+
+
+# -------------------------
+# Overlay
+# -------------------------
+
+def _legacy_frame(cr, cairo, phase):
+    import math
+
+    cr.set_operator(cairo.OPERATOR_SOURCE)
+    cr.set_source_rgba(0, 0, 0, 0)
+    cr.paint()
+    cr.set_operator(cairo.OPERATOR_OVER)
+    for i in range(3):
+        radius = 40 + i * 25 + math.sin(phase + i) * 10
+        cr.set_line_width(4)
+        cr.set_source_rgba(0.2, 0.6, 1.0, 0.6)
+        cr.arc(150, 150, radius, 0, 2 * math.pi)
+        cr.stroke()
+
+
+def _overlay_frames(rings, levels, frames):
+    """Run the overlay's timer logic for `frames` ticks; returns drawn frames."""
+    timer = False
+    drawn, dirty_area = 0, 0
+    for tick in range(frames):
+        level = levels(tick)
+        if level is not None:
+            rings.feed("tts", level)
+            timer = timer or rings.active
+        if timer:
+            rect, timer = rings.step()
+            drawn += 1
+            dirty_area += rect[2] * rect[3]
+    return drawn, dirty_area
+
+
+def bench_overlay(args):
+    import math
+    from array import array
+
+    import al_levels
+    import al_rings
+
+    from al_rings import FRAME_MS, SIZE
+
+    ticks = int(args.seconds * 1000 / FRAME_MS)
+
+    # speech envelope: 2 s of a 180 Hz tone modulated at syllable rate
+    rate = 16000
+    pcm = array("h", (
+        int(9000 * abs(math.sin(2 * math.pi * 4 * i / rate)) * math.sin(2 * math.pi * 180 * i / rate))
+        for i in range(2 * rate)
+    ))
+    speech = al_levels.envelope(pcm, rate, FRAME_MS)
+
+    idle, _ = _overlay_frames(al_rings.RingAnimator(), lambda t: None, ticks)
+
+    def talking(tick):
+        # levels only arrive when they change, like over the socket
+        if tick < len(speech):
+            if tick == 0 or speech[tick] != speech[tick - 1]:
+                return speech[tick]
+        if tick == len(speech):
+            return 0.0  # LevelMeter.follow() ends every clip with silence
+        return None
+
+    active, area = _overlay_frames(al_rings.RingAnimator(), talking, ticks)
+    legacy = ticks
+
+    print(f"{args.seconds:.0f} s window, {FRAME_MS} ms frames, 2 s of speech in the active case")
+    print(f"wakeups/s  idle:   legacy {legacy / args.seconds:5.1f}   new {idle / args.seconds:5.1f}")
+    print(f"wakeups/s  active: legacy {legacy / args.seconds:5.1f}   new {active / args.seconds:5.1f}"
+          f"   ({active} frames, speech {len(speech)} + settle {active - len(speech)})")
+    if active:
+        print(f"dirty area per frame: {area / active / (SIZE * SIZE):.0%} of the window")
+
+    try:
+        import cairo
+    except ImportError:
+        print("pycairo not installed: frame-time comparison skipped")
+        return 0
+
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, SIZE, SIZE)
+    cr = cairo.Context(surface)
+    n = 2000
+    start = time.perf_counter()
+    for i in range(n):
+        _legacy_frame(cr, cairo, i * 0.15)
+    old = (time.perf_counter() - start) / n
+
+    rings = al_rings.RingAnimator()
+    sprites = al_rings.RingSprites(cairo)
+    rings.feed("tts", 1.0)
+    start = time.perf_counter()
+    for i in range(n):
+        rect, _ = rings.step()
+        cr.save()
+        cr.rectangle(*rect)
+        cr.clip()
+        al_rings.clear(cr, cairo)
+        sprites.paint(cr, rings.radii())
+        cr.restore()
+    new = (time.perf_counter() - start) / n
+    print(f"frame time: legacy {old * 1e6:7.1f} us   sprites {new * 1e6:7.1f} us "
+          f"({len(sprites)} cached sprites)")
+    return 0
+
+
+# -------------------------
+# Idle
+# -------------------------
+
+def _rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class _VoiceEngine:
+    """Stand-in for a Piper voice: `mb` of resident weights, filled on load."""
+
+    name = "voice"
+
+    def __init__(self, mb):
+        self.weights = os.urandom(mb << 20)
+
+    def synthesize(self, text, speed, pitch):
+        return None
+
+    def speak(self, text, speed, pitch):
+        pass
+
+
+def bench_idle(args):
+    import gc
+
+    import al
+    import al_llm
+    import al_tts
+
+    al_tts.load_engine = lambda voice_model=None: _VoiceEngine(args.voice_mb)
+    assistant = al.ALAssistant()
+    baseline = _rss_mb()
+
+    def wake_to_ready():
+        start = time.perf_counter()
+        assistant.wake()
+        assistant.speak("AL is ready.")
+        al_tts.wait()
+        return time.perf_counter() - start
+
+    warm, cold, active, idle = [], [], [], []
+    for _ in range(args.n):
+        wake_to_ready()
+        al_llm.get_client()
+        active.append(_rss_mb())
+        warm.append(wake_to_ready())
+
+        assistant.go_idle()
+        time.sleep(0.2)  # release runs in the background
+        gc.collect()
+        idle.append(_rss_mb())
+        cold.append(wake_to_ready())
+
+    print(f"stand-in voice: {args.voice_mb} MB   baseline RSS {baseline:.1f} MB")
+    print(f"RSS active                 {statistics.median(active):7.1f} MB")
+    print(f"RSS idle, old loop         {statistics.median(active):7.1f} MB   (nothing released)")
+    print(f"RSS idle, released         {statistics.median(idle):7.1f} MB")
+    _report("wake-to-ready, old (warm)", warm)
+    _report("wake-to-ready, after idle", cold)
+    print("(the Ollama model itself lives in the ollama process; idle unloads it there)")
+    return 0
+
+
+# -------------------------
+# Startup
+# -------------------------
+
+def bench_startup(args):
+    import al_startup
+
+    budget = args.budget_ms if args.budget_ms is not None else al_startup.BUDGET_MS
+    runs = sorted((al_startup.probe() for _ in range(args.n)), key=lambda run: run[1])
+    imports, median = runs[len(runs) // 2]
+    al_startup.report(imports, median)
+    print()
+
+    for tool in ("al_overlay", "al_settings"):
+        proc = subprocess.run(
+            [sys.executable, "-c", f"import time; t = time.perf_counter(); import {tool}; "
+                                   "print((time.perf_counter() - t) * 1e3)"],
+            cwd=HERE, capture_output=True, text=True,
+        )
+        if proc.returncode:
+            print(f"{tool:<32} import failed (GTK bindings not installed?)")
+        else:
+            print(f"{tool:<32} import {float(proc.stdout):8.1f} ms")
+
+    if median > budget:
+        print(f"FAIL: first prompt after {median:.1f} ms, budget {budget} ms")
+        return 1
+    print(f"ok: first prompt after {median:.1f} ms (p50 of {args.n}), budget {budget} ms")
+    return 0
+
+
+# -------------------------
+# Tracing
+# -------------------------
+
+def bench_trace(args):
+    import contextlib
+    import io
+
+    import al
+    import al_trace
+    from al_backend import RecordingBackend
+
+    def empty_spans():
+        for _ in range(args.n):
+            with al_trace.span("bench", n=1):
+                pass
+
+    def bare():
+        for _ in range(args.n):
+            pass
+
+    results = {}
+    for enabled in (False, True):
+        al_trace.set_enabled(enabled)
+        start = time.perf_counter()
+        empty_spans()
+        results[enabled] = (time.perf_counter() - start) / args.n
+    start = time.perf_counter()
+    bare()
+    loop_cost = (time.perf_counter() - start) / args.n
+    print(f"span overhead: disabled {(results[False] - loop_cost) * 1e9:6.0f} ns   "
+          f"enabled {(results[True] - loop_cost) * 1e9:6.0f} ns")
+
+    # whole commands, side effects replaced by no-ops
+    assistant = al.ALAssistant(backend=RecordingBackend())
+    corpus = [c for c in command_corpus(2500, seed=3) if c != "clear"][:2000]
+    timings = {}
+    for enabled in (False, True, False, True):
+        al_trace.set_enabled(enabled)
+        al_trace.clear()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for text in corpus:
+                assistant.handle(text)
+            assistant.actions.wait()
+        timings[enabled] = (time.perf_counter() - start) / len(corpus)
+    assistant.actions.shutdown()
+    print(f"handle():      disabled {timings[False] * 1e6:6.1f} us   "
+          f"enabled {timings[True] * 1e6:6.1f} us per command "
+          f"({len(al_trace.spans())} spans kept)")
+
+    start = time.perf_counter()
+    trace = json.dumps(al_trace.chrome_trace())
+    metrics = al_trace.prometheus()
+    print(f"export: {len(trace) / 1024:.0f} KiB trace, {len(metrics)} B metrics "
+          f"in {(time.perf_counter() - start) * 1e3:.1f} ms")
+    print(al_trace.format_stats(al_trace.stats()))
+    al_trace.set_enabled(False)
+    return 0
+
+
+# -------------------------
+# Replay
+# -------------------------
+
+# committed: asserted by tests/test_replay.py, rewritten only with --update-golden
+GOLDEN_PATH = Path(HERE).parent / "tests" / "replay_golden.json"
+
+# the installed apps the replay resolves names against: (desktop id, Name, Exec)
+REPLAY_APPS = [
+    ("google-chrome", "Google Chrome", "/usr/bin/google-chrome-stable %U"),
+    ("brave-browser", "Brave Browser", "/usr/bin/brave-browser-stable %U"),
+    ("spotify", "Spotify", "spotify %U"),
+    ("firefox", "Firefox", "firefox %u"),
+    ("org.gnome.gedit", "Text Editor", "gedit %U"),
+    ("org.gnome.Terminal", "Terminal", "gnome-terminal"),
+    ("gnome-control-center", "Settings", "gnome-control-center"),
+]
+
+REPLAY_COUNTED = [
+    "next three times", "skip twice", "previous two", "next 3", "back twice",
+    "search again twice", "pause", "next five",
+]
+COMPOUND = [
+    "open {a} and search for {q}", "open {a} and close {b}", "pause then next",
+    "open {a} then play", "close {a} and open {b}", "play and open {a}",
+]
+CONFIRMATIONS = [
+    ("location services", "yes"), ("open location services", "no"),
+    ("location services", "cancel"), ("location services", "turn off", "okay"),
+]
+REPLAY_TYPOS = [
+    "serch for {q}", "open apotify", "open sertings", "open spotfy", "close brav",
+    "open chrom", "play some music adn next", "searf for {q}",
+]
+
+
+def replay_corpus(n, seed=0):
+    """[(category, command)], with confirmation flows kept in sequence."""
+    rnd = random.Random(seed)
+    out = []
+    while len(out) < n:
+        kind = rnd.choices(
+            ["single", "compound", "counted", "confirmation", "typo"], [50, 15, 15, 10, 10]
+        )[0]
+        fill = dict(a=rnd.choice(APPS), b=rnd.choice(APPS), q=rnd.choice(QUERIES))
+        if kind == "single":
+            texts = [t for t in [rnd.choice(TEMPLATES).format(**fill)] if t != "clear"]
+        elif kind == "compound":
+            texts = [rnd.choice(COMPOUND).format(**fill)]
+        elif kind == "counted":
+            texts = [rnd.choice(REPLAY_COUNTED)]
+        elif kind == "confirmation":
+            texts = list(rnd.choice(CONFIRMATIONS))
+        else:
+            texts = [rnd.choice(REPLAY_TYPOS).format(**fill)]
+        out.extend((kind, t) for t in texts)
+    return out[:n]
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return pick(0.5), pick(0.95), pick(0.99)
+
+
+def replay_setup(directory):
+    """
+    (config service, app index) of a fixed machine: the shipped defaults
+    and REPLAY_APPS, so decisions do not depend on the host.
+    """
+    import al_config
+    from al_appindex import AppIndex
+
+    apps = Path(directory) / "applications"
+    apps.mkdir(parents=True, exist_ok=True)
+    for desktop_id, name, exec_line in REPLAY_APPS:
+        (apps / f"{desktop_id}.desktop").write_text(
+            f"[Desktop Entry]\nType=Application\nName={name}\nExec={exec_line}\n"
+        )
+    config = al_config.ConfigService(legacy=Path(directory) / "legacy.json",
+                                     user=Path(directory) / "config.json")
+    return config, AppIndex([str(apps)]).build()
+
+
+def replay_decisions(corpus, config, apps, latency=None):
+    """
+    Every command's side effects on a RecordingBackend, one command at a
+    time: [[text, calls]]. latency, if given, collects seconds per category.
+    """
+    import al
+    from al_backend import RecordingBackend
+
+    backend = RecordingBackend()
+    assistant = al.ALAssistant(backend=backend, config=config, apps=apps)
+    decisions = []
+    for kind, text in corpus:
+        start = time.perf_counter()
+        assistant.handle(text)
+        if latency is not None:
+            latency.setdefault(kind, []).append(time.perf_counter() - start)
+        assistant.actions.wait()
+        # pre-warming runs in the background on its own schedule
+        calls = [[op, list(a)] for op, a in backend.take() if op != "prewarm_app"]
+        # speech is ordered; actions of one command may run concurrently
+        said = [c for c in calls if c[0] == "say"]
+        actions = sorted(c for c in calls if c[0] != "say")
+        decisions.append([text, said + actions])
+    assistant.actions.shutdown()
+    return decisions
+
+
+def bench_replay(args):
+    import contextlib
+    import json
+    import tracemalloc
+
+    import al
+    from al_backend import RecordingBackend
+
+    golden_path = Path(args.golden)
+    if not (args.update_golden or golden_path.exists()):
+        print(f"no golden file at {golden_path}: record one with --update-golden")
+        return 1
+
+    corpus = replay_corpus(args.n, seed=args.seed)
+    config, apps = replay_setup(tempfile.mkdtemp(prefix="al-bench-"))
+    # discard, not StringIO: captured output would count as retained memory
+    devnull = open(os.devnull, "w")
+    quiet = contextlib.redirect_stdout(devnull)
+
+    # 1. decisions: every command's side effects, one command at a time
+    latency = {}
+    with quiet:
+        decisions = replay_decisions(corpus, config, apps, latency)
+
+    # 2. throughput: commands back to back, side effects overlapping
+    assistant = al.ALAssistant(backend=RecordingBackend(), config=config, apps=apps)
+    with quiet:
+        start = time.perf_counter()
+        for _, text in corpus:
+            assistant.handle(text)
+        assistant.actions.wait()
+        elapsed = time.perf_counter() - start
+    assistant.actions.shutdown()
+
+    # 3. memory per command
+    backend = RecordingBackend()
+    assistant = al.ALAssistant(backend=backend, config=config, apps=apps)
+    peaks = []
+    with quiet:
+        assistant.handle("open brave")  # first-use imports and caches
+        assistant.actions.wait()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for _, text in corpus:
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            assistant.handle(text)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+            backend.take()  # the fake's own call log is not AL's memory
+        assistant.actions.wait()
+        backend.take()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+    assistant.actions.shutdown()
+    devnull.close()
+
+    print(f"replayed {len(corpus)} commands (seed {args.seed})")
+    print(f"throughput: {len(corpus) / elapsed:,.0f} commands/s")
+    print(f"{'category':<14} {'n':>6} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9}")
+    for kind in ("single", "compound", "counted", "confirmation", "typo"):
+        if kind in latency:
+            p50, p95, p99 = _percentiles(latency[kind])
+            print(f"{kind:<14} {len(latency[kind]):>6} {p50 * 1e6:9.1f} {p95 * 1e6:9.1f} "
+                  f"{p99 * 1e6:9.1f}")
+    p50, p95, p99 = _percentiles(peaks)
+    print(f"allocated per command (tracemalloc peak): p50 {p50 / 1024:.1f} KiB   "
+          f"p95 {p95 / 1024:.1f} KiB   p99 {p99 / 1024:.1f} KiB")
+    print(f"retained after replay: {retained / 1024:.1f} KiB "
+          f"({retained / len(corpus):.0f} B per command)")
+
+    if args.update_golden:
+        # one decision per line, so a changed decision is a one-line diff
+        lines = ",\n".join(json.dumps(d) for d in decisions)
+        golden_path.write_text(f'{{"seed": {args.seed}, "n": {len(decisions)}, '
+                               f'"decisions": [\n{lines}\n]}}\n')
+        print(f"decisions recorded to {golden_path}")
+        return 0
+
+    golden = json.loads(golden_path.read_text())
+    if golden["seed"] != args.seed:
+        print(f"golden file is for seed {golden['seed']}: rerun with it or --update-golden")
+        return 1
+    # the corpus of a seed grows by appending: compare the common prefix
+    checked = min(len(decisions), golden["n"])
+    changed = [
+        (i, old, new) for i, (old, new) in enumerate(zip(golden["decisions"], decisions))
+        if old != new
+    ]
+    if not changed:
+        print(f"decisions: all {checked} unchanged vs. {golden_path}")
+        return 0
+    print(f"decisions: {len(changed)} of {checked} CHANGED vs. {golden_path}")
+    for i, old, new in changed[:10]:
+        print(f"  #{i} {new[0]!r}\n    was {old[1]}\n    now {new[1]}")
+    return 1
+
+
+# -------------------------
+# Context store
+# -------------------------
+
+def bench_context(args):
+    import tracemalloc
+
+    from al_context import ALContext, Turn
+
+    rnd = random.Random(0)
+    tmp = tempfile.mkdtemp(prefix="al-bench-")
+    path = os.path.join(tmp, "context.db")
+
+    def drive(context, n):
+        times = []
+        for i in range(n):
+            app = rnd.choice(APPS)
+            start = time.perf_counter()
+            context.opened(app)
+            if i % 3 == 0:
+                context.searched(app, f"https://www.google.com/search?q={rnd.choice(QUERIES)}")
+            context.add_turn(f"open {app}", "search" if i % 3 == 0 else "open")
+            times.append(time.perf_counter() - start)
+        return times
+
+    memory = drive(ALContext(), args.n)
+    persisted = drive(ALContext(path), args.n)
+    _report("turn, in memory", memory)
+    _report("turn, SQLite WAL", persisted)
+
+    loads = []
+    for _ in range(20):
+        start = time.perf_counter()
+        context = ALContext(path)
+        loads.append(time.perf_counter() - start)
+        context.close()
+    _report(f"load ({args.n} turns on disk)", loads)
+    print(f"restored: last app {context.last_app!r}, "
+          f"last app for search {context.last_app_for('search')!r}, "
+          f"{len(context.turns)} turns in memory, {len(context.apps)} apps")
+
+    # per-turn memory: __slots__ record vs. the dict it replaces
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    slotted = [Turn(i, 0.0, "open brave", "open", "Brave Browser") for i in range(10000)]
+    mid = tracemalloc.get_traced_memory()[0]
+    dicts = [{"id": i, "at": 0.0, "text": "open brave", "intent": "open",
+              "app": "Brave Browser"} for i in range(10000)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"memory per turn: slots {(mid - before) / len(slotted):.0f} B   "
+          f"dict {(after - mid) / len(dicts):.0f} B")
+    return 0
+
+
+# -------------------------
+# System prober
+# -------------------------
+
+def bench_probe(args):
+    import contextlib
+    import io
+
+    import al
+    import al_device
+    from al_backend import SystemBackend
+    from al_probe import SystemProber
+
+    # the probes themselves, on the request path before this change
+    for label, fn in (("updates probe", al_device.check_for_updates),
+                      ("location probe", al_device.location_services_state)):
+        times = []
+        for _ in range(args.n):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        _report(label, times)
+
+    class TimedBackend(SystemBackend):
+        """Real probes; say() only timestamps the answer."""
+
+        def __init__(self, prober):
+            super().__init__(prober)
+            self.answered = threading.Event()
+            self.at = None
+
+        def say(self, text):
+            if text != "Checking for system updates":
+                self.at = time.perf_counter()
+                self.answered.set()
+
+    prober = SystemProber()
+    prober.add("updates", al_device.check_for_updates, 3600, 3600)
+    prober.add("location", al_device.location_services_state, 600, 600)
+    prober.refresh_now("updates")
+    backend = TimedBackend(prober)
+    assistant = al.ALAssistant(backend=backend)
+
+    def ask():
+        backend.answered.clear()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            assistant.handle("check for updates")
+            returned = time.perf_counter() - start
+            backend.answered.wait(60)
+        return returned, backend.at - start
+
+    warm = [ask() for _ in range(args.n)]
+    stale = []
+    for _ in range(args.n):
+        prober.invalidate("updates")
+        stale.append(ask())
+    prober.stop()
+    assistant.actions.shutdown()
+
+    _report("handle, cached: returned", [r for r, _ in warm])
+    _report("handle, cached: answered", [a for _, a in warm])
+    _report("handle, stale: returned", [r for r, _ in stale])
+    _report("handle, stale: answered", [a for _, a in stale])
+    return 0
+
+
+# -------------------------
+# Predictive pre-warming
+# -------------------------
+
+# a day of commands: (hour, chance, commands in order)
+ROUTINE = [
+    (8, 0.9, ["open brave", "search for news today", "search for weather"]),
+    (9, 0.5, ["check for updates"]),
+    (12, 0.4, ["location services", "yes"]),
+    (14, 0.7, ["open chrome", "search for python docs"]),
+    (17, 0.3, ["open settings", "close settings"]),
+    (20, 0.8, ["play some music", "next", "pause"]),
+]
+ROUTINE_NOISE = ["what time is it", "tell me a joke", "open gedit", "open terminal", "close",
+         "search again", "open firefox", "location services", "no"]
+
+
+def routine_history(days, seed=0):
+    """Turns from `days` simulated days of the routine plus random commands."""
+    import contextlib
+    import io
+
+    import al
+    import al_config
+    from al_backend import RecordingBackend
+    from al_context import ALContext
+
+    # the generator's own assistant must not learn or warm anything
+    al_config.get_service().override("prewarm", {"enabled": False})
+    assistant = al.ALAssistant(backend=RecordingBackend(),
+                               context=ALContext(max_turns=days * 40))
+    rnd = random.Random(seed)
+    start = time.mktime(time.strptime("2026-01-05", "%Y-%m-%d"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        for day in range(days):
+            for hour, chance, commands in ROUTINE:
+                if rnd.random() > chance:
+                    continue
+                at = start + day * 86400 + hour * 3600 + rnd.randrange(3600)
+                said = []
+                for text in commands:
+                    said.append(text)
+                    if rnd.random() < 0.15:
+                        said.append(rnd.choice(ROUTINE_NOISE))
+                for text in said:
+                    first = len(assistant.context.turns)
+                    assistant.handle(text)
+                    for turn in list(assistant.context.turns)[first:]:
+                        turn.at = at
+                    at += rnd.randrange(5, 120)
+                assistant.actions.wait()
+    assistant.actions.shutdown()
+    al_config.get_service().override("prewarm", {"enabled": True})
+    return assistant.context.recent()
+
+
+def _read_all(paths):
+    for path in paths:
+        with open(path, "rb") as f:
+            while f.read(1 << 20):
+                pass
+
+
+def _drop_cache(paths):
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def bench_prewarm(args):
+    from collections import Counter
+
+    import al_apps
+    from al_context import ALContext
+    from al_predict import AppPredictor, load_prewarm_settings
+
+    if args.history:
+        turns = ALContext(args.history).history(args.turns)
+        source = args.history
+    else:
+        turns = routine_history(args.days, seed=args.seed)
+        source = f"{args.days} simulated days (seed {args.seed})"
+
+    settings = load_prewarm_settings()
+    predictor = AppPredictor()
+    per_turn, warmed = [], []
+    for turn in turns:
+        start = time.perf_counter()
+        predictor.observe(turn)
+        prediction = predictor.predict(settings["min_confidence"])
+        per_turn.append(time.perf_counter() - start)
+        warmed.append(prediction[0] if prediction else None)
+    report = predictor.report()
+    print(f"history: {len(turns)} turns from {source}")
+    print(f"app-needing turns: {report['needed']}   predictions made: {report['predictions']}")
+    print(f"hit rate: {report['hit_rate']:.0%} of app-needing turns warmed in time   "
+          f"precision: {report['precision']:.0%}")
+    p50, p95, _ = _percentiles(per_turn)
+    print(f"model cost per turn: p50 {p50 * 1e6:.1f} us   p95 {p95 * 1e6:.1f} us "
+          f"(on the pre-warm thread)")
+
+    # startup hidden by readahead: cold vs. pre-warmed read of an app's files
+    directory = args.app_dir or os.path.dirname(os.__file__)
+    paths = sorted(
+        os.path.join(directory, n) for n in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, n))
+    )
+    cold, warm = [], []
+    for _ in range(args.n):
+        _drop_cache(paths)
+        start = time.perf_counter()
+        _read_all(paths)
+        cold.append(time.perf_counter() - start)
+        _drop_cache(paths)
+        al_apps._readahead(paths, int(settings["readahead_mb"]) << 20)
+        time.sleep(0.5)     # the gap between prediction and the command
+        start = time.perf_counter()
+        _read_all(paths)
+        warm.append(time.perf_counter() - start)
+    size = sum(os.path.getsize(p) for p in paths)
+    saved = max(0.0, statistics.median(cold) - statistics.median(warm))
+    print(f"readahead ({len(paths)} files, {size / (1 << 20):.1f} MiB in {directory}): "
+          f"cold {statistics.median(cold) * 1e3:.1f} ms   "
+          f"pre-warmed {statistics.median(warm) * 1e3:.1f} ms")
+
+    # apps in the launch list hide their whole startup (modeled)
+    hits = Counter()
+    predictor = AppPredictor()
+    for turn in turns:
+        before = predictor.hits
+        app = predictor.observe(turn)
+        if predictor.hits > before:
+            hits[app] += 1
+        predictor.predict(settings["min_confidence"])
+    launch = set(args.launch)
+    hidden_launch = sum(n for app, n in hits.items() if app in launch) * args.launch_ms / 1e3
+    hidden_read = sum(n for app, n in hits.items() if app not in launch) * saved
+    print("hits per app: " + ", ".join(f"{app} {n}" for app, n in hits.most_common()))
+    print(f"startup hidden: {hidden_read + hidden_launch:.1f} s in total "
+          f"({hidden_read:.1f} s readahead, measured; {hidden_launch:.1f} s background "
+          f"launch of {', '.join(sorted(launch)) or 'nothing'} at {args.launch_ms:.0f} ms each, "
+          f"modeled)")
+    return 0
+
+
+# -------------------------
+# Multi-session daemon
+# -------------------------
+
+class _LineClient:
+    """Blocking line-based client for one daemon session."""
+
+    def __init__(self, path):
+        import socket
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(30)
+        self.sock.connect(path)
+        self.buffer = b""
+
+    def send(self, line):
+        self.sock.sendall(line.encode() + b"\n")
+
+    def readline(self):
+        while b"\n" not in self.buffer:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("daemon closed the connection")
+            self.buffer += chunk
+        line, self.buffer = self.buffer.split(b"\n", 1)
+        return line.decode()
+
+    def close(self):
+        self.sock.close()
+
+
+def bench_sessions(args):
+    import psutil  # optional dependency
+
+    tmp = tempfile.mkdtemp(prefix="al-bench-")
+    path = os.path.join(tmp, "al.sock")
+    env = dict(os.environ, AL_SOCKET=path)
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(__file__), "al_daemon.py"),
+         "--dry-run", "--socket", path],
+        stdout=subprocess.DEVNULL, env=env,
+    )
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                probe = _LineClient(path)
+                probe.send("ping")
+                probe.readline()
+                probe.close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    print("daemon did not start")
+                    return 1
+                time.sleep(0.05)
+        proc = psutil.Process(server.pid)
+        rss_before = proc.memory_info().rss
+
+        corpus = [c for c in command_corpus(args.sessions * args.n, seed=args.seed)
+                  if c not in ("exit", "quit", "bye")]
+        latencies, errors = [], []
+        lock = threading.Lock()
+        opened = threading.Barrier(args.sessions + 1)
+
+        def run_session(i):
+            mine = []
+            try:
+                client = _LineClient(path)
+                client.send("session script")
+                client.readline()
+            except Exception as e:
+                with lock:
+                    errors.append(f"session {i}: {e}")
+                opened.abort()
+                return
+            try:
+                opened.wait()
+                for k in range(args.n):
+                    text = corpus[(i * args.n + k) % len(corpus)]
+                    start = time.perf_counter()
+                    client.send(f"ask {text}")
+                    while client.readline() != "done":
+                        pass    # "say" lines of this or an earlier command
+                    mine.append(time.perf_counter() - start)
+                    if args.think_ms:
+                        time.sleep(args.think_ms / 1e3)
+                client.send("end")
+            except Exception as e:
+                with lock:
+                    errors.append(f"session {i}: {e}")
+            finally:
+                client.close()
+                with lock:
+                    latencies.extend(mine)
+
+        threads = [threading.Thread(target=run_session, args=(i,)) for i in range(args.sessions)]
+        for thread in threads:
+            thread.start()
+        try:
+            opened.wait()
+        except threading.BrokenBarrierError:
+            pass
+        rss_open = proc.memory_info().rss
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        rss_after = proc.memory_info().rss
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    if errors:
+        print(f"{len(errors)} session errors, e.g. {errors[0]}")
+    if not latencies:
+        return 1
+    p50, p95, p99 = _percentiles(latencies)
+    print(f"{args.sessions} concurrent sessions x {args.n} commands "
+          f"(think time {args.think_ms:.0f} ms), dry-run daemon")
+    print(f"throughput: {len(latencies) / elapsed:,.0f} commands/s "
+          f"({len(latencies)} in {elapsed:.2f} s)")
+    print(f"latency (ask -> done): p50 {p50 * 1e3:.2f} ms   p95 {p95 * 1e3:.2f} ms   "
+          f"p99 {p99 * 1e3:.2f} ms   max {max(latencies) * 1e3:.2f} ms")
+    print(f"daemon RSS: {rss_before / 2**20:.1f} MB idle, {rss_open / 2**20:.1f} MB with "
+          f"{args.sessions} sessions open "
+          f"({(rss_open - rss_before) / args.sessions / 1024:.0f} KiB per session), "
+          f"{rss_after / 2**20:.1f} MB after")
+    return 1 if errors else 0
+
+
+# -------------------------
+# Browser control channel
+# -------------------------
+
+STUB_BROWSER = """#!{python} -S
+# stand-in for `brave <url>`: a new process hands the URL to the running instance
+import http.client, sys, urllib.parse
+conn = http.client.HTTPConnection("127.0.0.1", {port})
+conn.request("PUT", "/json/new?" + urllib.parse.quote(sys.argv[1], safe=""))
+conn.getresponse().read()
+"""
+
+
+def _cdp_stub(tab_s=0.0):
+    """
+    Local stand-in for a browser's remote-debugging endpoint: /json/version,
+    PUT /json/new and a browser WebSocket answering the Target commands.
+    """
+    import base64
+    import hashlib
+    import socket
+    import struct
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    stats = {"connections": 0, "created": 0, "activated": 0, "spawned": 0}
+    lock = threading.Lock()
+    targets = {}
+
+    def read_frame(rfile):
+        first, second = rfile.read(2)
+        n = second & 0x7F
+        if n == 126:
+            (n,) = struct.unpack("!H", rfile.read(2))
+        elif n == 127:
+            (n,) = struct.unpack("!Q", rfile.read(8))
+        mask = rfile.read(4)
+        payload = bytes(b ^ mask[i & 3] for i, b in enumerate(rfile.read(n)))
+        return first & 0x0F, payload
+
+    def frame(text):
+        data = text.encode()
+        n = len(data)
+        head = (struct.pack("!BB", 0x81, n) if n < 126 else
+                struct.pack("!BBH", 0x81, 126, n) if n < 1 << 16 else
+                struct.pack("!BBQ", 0x81, 127, n))
+        return head + data
+
+    def new_target(url):
+        time.sleep(tab_s)
+        with lock:
+            stats["created"] += 1
+            target = f"T{stats['created']}"
+            targets[target] = url
+        return target
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *a):
+            pass
+
+        def _json(self, body):
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_PUT(self):
+            import urllib.parse
+
+            target = new_target(urllib.parse.unquote(self.path.partition("?")[2]))
+            with lock:
+                stats["spawned"] += 1
+            self._json({"id": target, "type": "page"})
+
+        def do_GET(self):
+            if self.path == "/json/version":
+                port = self.server.server_address[1]
+                self._json({"Browser": "Stub/1.0",
+                            "webSocketDebuggerUrl": f"ws://127.0.0.1:{port}/devtools/browser/stub"})
+                return
+            key = self.headers.get("Sec-WebSocket-Key")
+            if key is None:
+                self.send_error(404)
+                return
+            accept = base64.b64encode(hashlib.sha1(
+                (key + "258EAFA5-E914-47DA-95CA-C5AB0DC85B11").encode()).digest()).decode()
+            self.send_response(101)
+            self.send_header("Upgrade", "websocket")
+            self.send_header("Connection", "Upgrade")
+            self.send_header("Sec-WebSocket-Accept", accept)
+            self.end_headers()
+            self.wfile.flush()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with lock:
+                stats["connections"] += 1
+            self.close_connection = True
+            self._serve_ws()
+
+        def _serve_ws(self):
+            while True:
+                try:
+                    opcode, payload = read_frame(self.rfile)
+                except (OSError, ValueError):
+                    return
+                if opcode == 0x8:
+                    return
+                message = json.loads(payload)
+                method, params = message["method"], message.get("params", {})
+                if method == "Stub.hangUp":
+                    return      # the browser quit
+                if method == "Target.createTarget" and params["url"].startswith("refuse:"):
+                    out = [{"id": message["id"],
+                            "error": {"code": -32000, "message": "Failed to open a new tab"}}]
+                elif method == "Target.createTarget":
+                    target = new_target(params["url"])
+                    out = [{"method": "Target.targetCreated",
+                            "params": {"targetInfo": {"targetId": target}}},
+                           {"id": message["id"], "result": {"targetId": target}}]
+                elif method == "Target.activateTarget":
+                    with lock:
+                        stats["activated"] += 1
+                    out = [{"id": message["id"], "result": {}}]
+                else:
+                    out = [{"id": message["id"], "result": {}}]
+                self.wfile.write(b"".join(frame(json.dumps(m)) for m in out))
+                self.wfile.flush()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, address: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats, targets
+
+
+def bench_browser(args):
+    import al_apps
+    import al_browser
+    import al_config
+
+    # behaviour (batching, refusals, reconnects) is covered by tests/test_browser.py
+    server, stats, _ = _cdp_stub(args.tab_ms / 1e3)
+    port = server.server_address[1]
+    tmp = tempfile.mkdtemp(prefix="al-bench-")
+    profile = os.path.join(tmp, "profile")
+    os.makedirs(profile)
+    channels = al_browser.BrowserChannels({"brave": (profile,)})
+    al_browser._channels = channels
+    app = "stub-brave"
+    url = "https://www.google.com/search?q=al+bench"
+
+    with open(os.path.join(profile, "DevToolsActivePort"), "w") as f:
+        f.write(f"{port}\n/devtools/browser/stub\n")
+
+    # 1. attach once
+    start = time.perf_counter()
+    channels.open_urls(app, [url])
+    attach = time.perf_counter() - start
+
+    # 2. per-URL latency: persistent channel vs. one process per URL
+    results = {}
+    for count in (1, 10):
+        samples = []
+        for _ in range(args.n):
+            start = time.perf_counter()
+            al_apps.open_url_in_app(app, url, count)
+            samples.append((time.perf_counter() - start) / count)
+        results[("cdp", count)] = samples
+
+    bindir = os.path.join(tmp, "bin")
+    os.makedirs(bindir)
+    script = os.path.join(bindir, app)
+    with open(script, "w") as f:
+        f.write(STUB_BROWSER.format(python=sys.executable, port=port))
+    os.chmod(script, 0o755)
+    os.environ["PATH"] = bindir + os.pathsep + os.environ["PATH"]
+    al_config.get_service().override("browser", {"enabled": False})
+    spawned = stats["spawned"]
+    for count in (1, 10):
+        samples = []
+        for _ in range(max(1, args.n // 5)):
+            start = time.perf_counter()
+            al_apps.open_url_in_app(app, url, count)
+            samples.append((time.perf_counter() - start) / count)
+        results[("spawn", count)] = samples
+    channels.close()
+    server.shutdown()
+    if stats["spawned"] == spawned:
+        print("the spawn path did not reach the stub; no timings")
+        return 1
+
+    print(f"stub endpoint on port {port}, {args.tab_ms:g} ms per tab in the 'browser'")
+    print(f"attach (DevToolsActivePort + handshake + first tab): {attach * 1e3:.2f} ms")
+    print(f"{'path':<28} {'urls':>5} {'per URL p50':>12} {'p95':>10}")
+    for (path, count), samples in results.items():
+        samples = sorted(samples)
+        label = "CDP channel" if path == "cdp" else "spawn per URL (stand-in)"
+        p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+        print(f"{label:<28} {count:>5} {samples[len(samples) // 2] * 1e3:9.2f} ms "
+              f"{p95 * 1e3:7.2f} ms")
+    print("spawn stand-in is a `python3 -S` process; a real browser binary starts slower")
+    return 0
+
+
+# -------------------------
+# Entry point
+# -------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AL benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("dispatch", help="intent registry vs. if-chain")
+    p.add_argument("-n", type=int, default=100000)
+    p.add_argument("--extra", type=int, default=0,
+                   help="append N synthetic intents to both dispatchers")
+    p.set_defaults(func=bench_dispatch)
+
+    p = sub.add_parser("wake", help="cold spawn vs. warm daemon wake-to-ready")
+    p.add_argument("-n", type=int, default=20)
+    p.set_defaults(func=bench_wake)
+
+    p = sub.add_parser("tts", help="speech latency, cold vs. cached phrases")
+    p.add_argument("-n", type=int, default=5, help="rounds over the stock phrases")
+    p.add_argument("--play", action="store_true", help="play audio instead of discarding it")
+    p.set_defaults(func=bench_tts)
+
+    p = sub.add_parser("ttspipe", help="long replies: first audio and real-time factor")
+    p.add_argument("-n", type=int, default=2)
+    p.add_argument("--engine", choices=("cpu", "system"), default="cpu",
+                   help="cpu: a stand-in voice with a fixed real-time factor")
+    p.add_argument("--rtf", type=float, default=0.15,
+                   help="real-time factor of the cpu stand-in voice")
+    p.add_argument("--workers", type=int, default=None,
+                   help="synthesis pool size (default: al_tts.SYNTH_WORKERS)")
+    p.set_defaults(func=bench_ttspipe)
+
+    p = sub.add_parser("mpris", help="MPRIS D-Bus backend vs. playerctl")
+    p.add_argument("-n", type=int, default=200)
+    p.set_defaults(func=bench_mpris)
+
+    p = sub.add_parser("apps", help="app index resolution latency and accuracy")
+    p.add_argument("--apps", type=int, default=1000)
+    p.set_defaults(func=bench_apps)
+
+    p = sub.add_parser("procs", help="process-table close vs. pkill -f")
+    p.add_argument("--procs", type=int, default=2000, help="filler processes to spawn")
+    p.add_argument("-n", type=int, default=20)
+    p.set_defaults(func=bench_procs)
+
+    p = sub.add_parser("stt", help="streaming speech front end on a WAV file")
+    p.add_argument("--wav", help="16 kHz mono WAV (default: synthetic utterances)")
+    p.add_argument("--utterances", type=int, default=10)
+    p.add_argument("--model", help="Vosk model directory")
+    p.add_argument("--no-realtime", dest="realtime", action="store_false",
+                   help="feed the file as fast as possible (CPU only)")
+    p.set_defaults(func=bench_stt)
+
+    p = sub.add_parser("wakeword", help="wake word accuracy and idle CPU")
+    p.add_argument("--fixtures", help="dir with enroll/, positive/, negative/ WAVs")
+    p.add_argument("-n", type=int, default=30, help="synthetic clips per class")
+    p.set_defaults(func=bench_wakeword)
+
+    p = sub.add_parser("tokens", help="single-pass parser vs. old normalization")
+    p.add_argument("-n", type=int, default=100000)
+    p.set_defaults(func=bench_tokens)
+
+    p = sub.add_parser("llm", help="streaming Ollama client against a mock server")
+    p.add_argument("-n", type=int, default=10)
+    p.set_defaults(func=bench_llm)
+
+    p = sub.add_parser("llmcache", help="LLM answer cache hit rate on a replay log")
+    p.add_argument("-n", type=int, default=5000)
+    p.add_argument("--threshold", type=float, default=0.85)
+    p.set_defaults(func=bench_llmcache)
+
+    p = sub.add_parser("plan", help="compound commands, one by one vs. planned")
+    p.add_argument("-n", type=int, default=3)
+    p.set_defaults(func=bench_plan)
+
+    p = sub.add_parser("config", help="config hot-reload latency")
+    p.add_argument("-n", type=int, default=50)
+    p.set_defaults(func=bench_config)
+
+    p = sub.add_parser("overlay", help="overlay wakeups and frame time, idle vs. active")
+    p.add_argument("--seconds", type=float, default=10.0)
+    p.set_defaults(func=bench_overlay)
+
+    p = sub.add_parser("idle", help="RSS and wake-to-ready, active vs. released on idle")
+    p.add_argument("-n", type=int, default=10)
+    p.add_argument("--voice-mb", type=int, default=60, help="size of the stand-in TTS voice")
+    p.set_defaults(func=bench_idle)
+
+    p = sub.add_parser("startup", help="import times and time to first prompt vs. a budget")
+    p.add_argument("-n", type=int, default=5)
+    p.add_argument("--budget-ms", type=float, default=None,
+                   help="fail above this many ms (default: al_startup.BUDGET_MS)")
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("trace", help="tracing overhead, disabled vs. enabled")
+    p.add_argument("-n", type=int, default=200000)
+    p.set_defaults(func=bench_trace)
+
+    p = sub.add_parser("replay", help="replay command corpora through handle() on a fake backend")
+    p.add_argument("-n", type=int, default=5000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--golden", default=str(GOLDEN_PATH),
+                   help="dispatch decisions to compare against")
+    p.add_argument("--update-golden", action="store_true")
+    p.set_defaults(func=bench_replay)
+
+    p = sub.add_parser("context", help="context store: turn cost, load time, memory")
+    p.add_argument("-n", type=int, default=2000, help="turns to record")
+    p.set_defaults(func=bench_context)
+
+    p = sub.add_parser("probe", help="update check latency, cached by the prober vs. probed")
+    p.add_argument("-n", type=int, default=5)
+    p.set_defaults(func=bench_probe)
+
+    p = sub.add_parser("prewarm", help="pre-warm prediction hit rate and startup hidden")
+    p.add_argument("--days", type=int, default=60)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--history", help="replay turns from a context.db instead")
+    p.add_argument("--turns", type=int, default=2000, help="turns to read from --history")
+    p.add_argument("--app-dir", help="directory whose files stand in for an app's binaries")
+    p.add_argument("-n", type=int, default=5, help="readahead rounds")
+    p.add_argument("--launch", nargs="*", default=["Spotify"],
+                   help="apps pre-launched rather than read ahead")
+    p.add_argument("--launch-ms", type=float, default=1200,
+                   help="cold start of a launched app (the old fixed Spotify wait)")
+    p.set_defaults(func=bench_prewarm)
+
+    p = sub.add_parser("sessions", help="load generator: many daemon sessions at once")
+    p.add_argument("--sessions", type=int, default=300)
+    p.add_argument("-n", type=int, default=20, help="commands per session")
+    p.add_argument("--think-ms", type=float, default=0)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=bench_sessions)
+
+    p = sub.add_parser("browser", help="CDP browser channel vs. one process per URL")
+    p.add_argument("-n", type=int, default=50)
+    p.add_argument("--tab-ms", type=float, default=1.0,
+                   help="time the stand-in browser takes per new tab")
+    p.set_defaults(func=bench_browser)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
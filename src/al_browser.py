@@ -0,0 +1,380 @@
+# al_browser.py
+#
+# Opening URLs in a running Chromium-family browser (Chrome, Chromium,
+# Brave, Edge) over its remote-debugging protocol (CDP) instead of
+# spawning `brave <url>` for every search. One WebSocket per browser is
+# kept open; the tabs of one request go out as a single batch of
+# Target.createTarget commands and their replies are collected together.
+#
+# The browser has to be running with remote debugging enabled, e.g.
+# `--remote-debugging-port=9222` in its desktop entry; it then writes
+# DevToolsActivePort into its profile directory, which is how the
+# endpoint is found. Extra ports can be listed in the "browser" config
+# section for custom --user-data-dir setups. open_urls() returns how many
+# tabs it opened; al_apps spawns the browser for the rest as before.
+#
+# Stdlib only: the WebSocket client below speaks just enough RFC 6455
+# for CDP (text frames, ping, close).
+
+import base64
+import http.client
+import itertools
+import json
+import os
+import select
+import socket
+import struct
+import threading
+import urllib.parse
+
+import al_config
+from al_platform import SYSTEM
+
+DEFAULTS = {
+    "enabled": True,
+    "ports": (),        # remote-debugging ports to try besides DevToolsActivePort
+    "timeout": 2.0,     # seconds for a connect or a batch of replies
+}
+
+if SYSTEM == "darwin":
+    _BASE = os.path.expanduser("~/Library/Application Support")
+    PROFILES = {
+        "brave": ("BraveSoftware/Brave-Browser",),
+        "chromium": ("Chromium",),
+        "chrome": ("Google/Chrome", "Google/Chrome Beta"),
+        "edge": ("Microsoft Edge",),
+    }
+else:
+    _BASE = os.path.expanduser("~/.config")
+    PROFILES = {
+        "brave": ("BraveSoftware/Brave-Browser",),
+        "chromium": ("chromium",),
+        "chrome": ("google-chrome", "google-chrome-beta"),
+        "edge": ("microsoft-edge",),
+    }
+PROFILES = {key: tuple(os.path.join(_BASE, d) for d in dirs) for key, dirs in PROFILES.items()}
+
+
+def load_browser_settings(config=None):
+    config = config or al_config.get_config()
+    section = config.get("browser") or {}
+    settings = dict(DEFAULTS)
+    for key in settings:
+        if section.get(key) is not None:
+            settings[key] = section[key]
+    return settings
+
+
+def browser_key(app):
+    """PROFILES key for a Chromium-family app name, else None."""
+    name = app.lower()
+    for key in PROFILES:
+        if key in name:
+            return key
+    return None
+
+
+# -------------------------
+# WebSocket
+# -------------------------
+
+class WebSocket:
+    def __init__(self, url, timeout=DEFAULTS["timeout"]):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme != "ws":
+            raise ValueError(f"unsupported WebSocket URL: {url}")
+        self.sock = socket.create_connection((parts.hostname, parts.port or 80), timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._buffer = b""
+        try:
+            self._handshake(parts.netloc, parts.path or "/")
+        except Exception:
+            self.sock.close()
+            raise
+
+    def _handshake(self, host, path):
+        key = base64.b64encode(os.urandom(16)).decode()
+        # no Origin header: Chrome rejects unknown origins, not their absence
+        self.sock.sendall(
+            f"GET {path} HTTP/1.1\r\nHost: {host}\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+            f"Sec-WebSocket-Version: 13\r\n\r\n".encode()
+        )
+        while b"\r\n\r\n" not in self._buffer:
+            self._fill()
+        head, self._buffer = self._buffer.split(b"\r\n\r\n", 1)
+        status = head.split(b"\r\n", 1)[0]
+        if b" 101 " not in status + b" ":
+            raise ConnectionError(f"WebSocket handshake refused: {status.decode(errors='replace')}")
+
+    def _fill(self):
+        chunk = self.sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("connection closed")
+        self._buffer += chunk
+
+    def _read(self, n):
+        while len(self._buffer) < n:
+            self._fill()
+        data, self._buffer = self._buffer[:n], self._buffer[n:]
+        return data
+
+    def _frame(self, opcode, payload):
+        n = len(payload)
+        if n < 126:
+            head = struct.pack("!BB", 0x80 | opcode, 0x80 | n)
+        elif n < 1 << 16:
+            head = struct.pack("!BBH", 0x80 | opcode, 0x80 | 126, n)
+        else:
+            head = struct.pack("!BBQ", 0x80 | opcode, 0x80 | 127, n)
+        mask = os.urandom(4)
+        masked = bytes(b ^ mask[i & 3] for i, b in enumerate(payload))
+        return head + mask + masked
+
+    def closed(self):
+        """True if the peer has closed the connection (nothing is read)."""
+        if self._buffer:
+            return False
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+            return bool(readable) and self.sock.recv(1, socket.MSG_PEEK) == b""
+        except OSError:
+            return True
+
+    def send(self, texts):
+        """Send text messages in one write."""
+        self.sock.sendall(b"".join(self._frame(0x1, t.encode()) for t in texts))
+
+    def recv(self):
+        """Next text message; answers pings on the way."""
+        message = b""
+        while True:
+            first, second = self._read(2)
+            opcode, n = first & 0x0F, second & 0x7F
+            if n == 126:
+                (n,) = struct.unpack("!H", self._read(2))
+            elif n == 127:
+                (n,) = struct.unpack("!Q", self._read(8))
+            if second & 0x80:
+                mask = self._read(4)
+                payload = bytes(b ^ mask[i & 3] for i, b in enumerate(self._read(n)))
+            else:
+                payload = self._read(n)
+
+            if opcode == 0x8:
+                raise ConnectionError("closed by the browser")
+            if opcode == 0x9:
+                self.sock.sendall(self._frame(0xA, payload))
+                continue
+            if opcode == 0xA:
+                continue
+            message += payload
+            if first & 0x80:
+                return message.decode()
+
+    def close(self):
+        try:
+            self.sock.sendall(self._frame(0x8, b""))
+        except OSError:
+            pass
+        self.sock.close()
+
+
+# -------------------------
+# CDP
+# -------------------------
+
+class CDPError(Exception):
+    pass
+
+
+class NotSent(ConnectionError):
+    """The connection failed before a batch went out; it is safe to send again."""
+
+
+class CDPConnection:
+    """One browser-level CDP session; calls from several threads are serialised."""
+
+    def __init__(self, url, timeout=DEFAULTS["timeout"]):
+        self.url = url
+        self.ws = WebSocket(url, timeout)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def call_many(self, commands, errors=False):
+        """
+        Send [(method, params)] as one batch; their results, in order.
+        An error reply raises CDPError, or takes the result's place if
+        `errors` is set. NotSent means nothing reached the browser.
+        """
+        with self._lock:
+            ids = []
+            texts = []
+            for method, params in commands:
+                ids.append(next(self._ids))
+                texts.append(json.dumps({"id": ids[-1], "method": method, "params": params}))
+            if self.ws.closed():
+                raise NotSent("closed by the browser")
+            try:
+                self.ws.send(texts)
+            except OSError as e:
+                raise NotSent(str(e)) from e
+
+            replies = {}
+            while len(replies) < len(ids):
+                message = json.loads(self.ws.recv())
+                if message.get("id") in ids:    # events have no id
+                    replies[message["id"]] = message
+        out = []
+        for i in ids:
+            if "error" in replies[i]:
+                error = CDPError(replies[i]["error"].get("message", "CDP error"))
+                if not errors:
+                    raise error
+                out.append(error)
+            else:
+                out.append(replies[i].get("result", {}))
+        return out
+
+    def call(self, method, **params):
+        return self.call_many([(method, params)])[0]
+
+    def open_tabs(self, urls, activate=True):
+        """
+        New tabs for these URLs in one round trip; their target ids, with
+        the CDPError in place of each tab the browser refused.
+        """
+        results = self.call_many([("Target.createTarget", {"url": u}) for u in urls],
+                                 errors=True)
+        targets = [r if isinstance(r, CDPError) else r["targetId"] for r in results]
+        opened = [t for t in targets if not isinstance(t, CDPError)]
+        if activate and opened:
+            try:
+                self.call("Target.activateTarget", targetId=opened[-1])
+            except CDPError:
+                pass    # the tabs are open either way
+        return targets
+
+    def close(self):
+        self.ws.close()
+
+
+def _active_port_url(profile):
+    """WebSocket URL from a profile's DevToolsActivePort, or None."""
+    try:
+        with open(os.path.join(profile, "DevToolsActivePort")) as f:
+            port, path = f.read().split()[:2]
+    except (OSError, ValueError):
+        return None
+    return f"ws://127.0.0.1:{int(port)}{path}"
+
+
+def _version_url(port, timeout):
+    """WebSocket URL from /json/version on a debugging port, or None."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        conn.request("GET", "/json/version")
+        response = conn.getresponse()
+        if response.status != 200:
+            return None
+        return json.loads(response.read()).get("webSocketDebuggerUrl")
+    except (OSError, ValueError):
+        return None
+    finally:
+        conn.close()
+
+
+class BrowserChannels:
+    """
+    Open CDP connections, one per browser (PROFILES key). A connection
+    that fails is dropped and the endpoint looked up again once.
+    """
+
+    def __init__(self, profiles=PROFILES):
+        self.profiles = profiles
+        self.connections = {}
+        self._lock = threading.Lock()
+
+    def _endpoints(self, key, settings):
+        for profile in self.profiles.get(key, ()):
+            url = _active_port_url(profile)
+            if url:
+                yield url
+        for port in settings["ports"]:
+            url = _version_url(int(port), settings["timeout"])
+            if url:
+                yield url
+
+    def connection(self, key, settings):
+        with self._lock:
+            conn = self.connections.get(key)
+            if conn is not None:
+                return conn
+            for url in self._endpoints(key, settings):
+                try:
+                    conn = CDPConnection(url, settings["timeout"])
+                except (OSError, ValueError):
+                    continue
+                self.connections[key] = conn
+                return conn
+        return None
+
+    def drop(self, key, conn):
+        with self._lock:
+            if self.connections.get(key) is conn:
+                del self.connections[key]
+        conn.ws.sock.close()
+
+    def open_urls(self, app, urls):
+        """
+        Open urls as new tabs of a running `app`. Returns how many were
+        opened: 0 if it is not reachable, fewer than len(urls) if it
+        refused some. Tabs are never requested twice.
+        """
+        key = browser_key(app)
+        settings = load_browser_settings()
+        if key is None or not settings["enabled"]:
+            return 0
+        for _ in range(2):
+            conn = self.connection(key, settings)
+            if conn is None:
+                return 0
+            try:
+                targets = conn.open_tabs(urls)
+            except NotSent:
+                self.drop(key, conn)    # browser restarted or gone: look again
+                continue
+            except (OSError, ValueError) as e:
+                # the batch went out, so the tabs may be open: sending it
+                # again, or spawning the browser, could open them twice
+                self.drop(key, conn)
+                print(f"[AL] no reply from {app} while opening tabs: {e}")
+                return len(urls)
+            refused = [t for t in targets if isinstance(t, CDPError)]
+            if refused:
+                # the connection itself still works
+                print(f"[AL] {app} refused to open {len(refused)} of {len(urls)} tabs: {refused[0]}")
+            return len(urls) - len(refused)
+        return 0
+
+    def close(self):
+        with self._lock:
+            connections, self.connections = self.connections, {}
+        for conn in connections.values():
+            conn.close()
+
+
+_channels = None
+_channels_lock = threading.Lock()
+
+
+def get_channels():
+    global _channels
+    with _channels_lock:
+        if _channels is None:
+            _channels = BrowserChannels()
+        return _channels
+
+
+def open_urls(app, urls):
+    return get_channels().open_urls(app, urls)
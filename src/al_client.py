@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# al_client.py
+#
+# Tiny client for the AL daemon. Kept free of heavy imports so the wake
+# trigger can run it with `python3 -S` in a few milliseconds.
+#
+#   al_client.py activate
+#   al_client.py cmd open spotify
+#   al_client.py stats            p50/p95/p99 per pipeline stage
+#   al_client.py session [kind] [name]
+#                                 a conversation of its own (stdin -> AL)
+
+import os
+import socket
+import sys
+
+SOCKET_PATH = os.environ.get("AL_SOCKET") or os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or f"/tmp/al-{os.getuid()}",
+    "al.sock",
+)
+
+
+def send(line, path=SOCKET_PATH, timeout=5.0):
+    """Send one request line and return the daemon's one-line reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(line.encode() + b"\n")
+
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            reply += chunk
+    return reply.decode().strip()
+
+
+def stats():
+    """Per-stage latency table from the daemon (or the last export)."""
+    import al_trace
+
+    try:
+        reply = send("stats")
+        path = reply.split(" ", 1)[1]
+    except (OSError, IndexError):
+        path = al_trace.TRACE_DIR / "metrics.prom"
+        if not os.path.exists(path):
+            print("AL daemon not reachable and no exported metrics", file=sys.stderr)
+            return 1
+        print(f"(daemon not reachable; last export {path})")
+    table = al_trace.read_prometheus(path)
+    if not table:
+        print('no spans recorded; set "trace": true in the config or AL_TRACE=1')
+        return 0
+    print(al_trace.format_stats(table))
+    return 0
+
+
+def session(kind="terminal", name=None, path=SOCKET_PATH):
+    """Talk to AL in a session of this client's own, one line per command."""
+    import threading
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError as e:
+        print(f"AL daemon not reachable: {e}", file=sys.stderr)
+        return 1
+    reader = sock.makefile("r")
+    sock.sendall(f"session {kind} {name or ''}".strip().encode() + b"\n")
+    reply = reader.readline().strip()
+    if not reply.startswith("ok "):
+        print(reply, file=sys.stderr)
+        return 1
+    print(f"[AL] session {reply[3:]}")
+
+    def show():
+        # answers can arrive at any time (LLM, finished actions)
+        for line in reader:
+            verb, _, text = line.rstrip("\n").partition(" ")
+            if verb == "say":
+                print(f"[AL] {text}", flush=True)
+            elif verb == "bye":
+                break
+        os._exit(0)
+
+    shower = threading.Thread(target=show, daemon=True)
+    shower.start()
+    try:
+        for line in sys.stdin:
+            if line.strip():
+                sock.sendall(f"cmd {line.strip()}".encode() + b"\n")
+        sock.sendall(b"end\n")
+        shower.join(timeout=5)  # until "bye", after the last answers
+    except (KeyboardInterrupt, OSError):
+        pass
+    sock.close()
+    return 0
+
+
+def main(argv):
+    if not argv:
+        print("usage: al_client.py activate | ping | cmd <text> | stats | shutdown"
+              " | session [kind] [name]")
+        return 2
+    if argv == ["stats"]:
+        return stats()
+    if argv[0] == "session":
+        return session(*argv[1:3])
+    try:
+        print(send(" ".join(argv)))
+    except OSError as e:
+        print(f"AL daemon not reachable: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
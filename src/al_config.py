@@ -1,29 +1,285 @@
+# al_config.py
+#
+# One configuration service for the whole assistant. Layers, later wins:
+#
+#   defaults   config/al_config.json shipped with AL
+#   legacy     ~/.al_config.json (older installs: aliases, roles)
+#   user       ~/.config/al/config.json (written by the settings app)
+#   overrides  runtime values set with override()
+#
+# Each file is parsed once and again only when inotify reports a change;
+# the merged result is an immutable Config snapshot swapped in atomically,
+# so readers never see a half-applied change and never touch the disk.
+
+import copy
 import json
+import os
+import threading
 from pathlib import Path
 
-CONFIG_PATH = Path.home() / ".al_config.json"
+import al_inotify
+
+DEFAULTS_PATH = Path(__file__).resolve().parent.parent / "config" / "al_config.json"
+LEGACY_PATH = Path.home() / ".al_config.json"
+USER_PATH = Path.home() / ".config/al/config.json"
+CONFIG_PATH = LEGACY_PATH  # kept for load_config/save_config callers
+
+WATCH_MASK = (al_inotify.IN_CLOSE_WRITE | al_inotify.IN_MOVED_TO
+              | al_inotify.IN_MOVED_FROM | al_inotify.IN_DELETE)
+
+# used when the shipped defaults file is missing
+BUILTIN = {
+    "voice_model": None,
+    "speed": 1.0,
+    "pitch": 1.0,
+    "language": "en-US",
+    "personality": "neutral",
+    "roles": {},
+    "aliases": {
+        "chrome": "Google Chrome",
+        "google chrome": "Google Chrome",
+        "brave": "Brave Browser",
+        "spotify": "Spotify",
+        "browser": "Google Chrome",
+        "system settings": "System Settings",
+        "settings": "System Settings",
+    },
+    "app_integrations": {},
+    "llm": {},
+    "prewarm": {},
+    "browser": {},
+    "trace": False,
+}
+
+
+def merge(base, layer, remove_none=False):
+    """Deep merge of dicts; values in layer win (None removes the key if remove_none)."""
+    out = dict(base)
+    for key, value in layer.items():
+        if value is None and remove_none:
+            out.pop(key, None)
+        elif isinstance(value, dict) and isinstance(out.get(key), dict):
+            out[key] = merge(out[key], value, remove_none)
+        else:
+            out[key] = value
+    return out
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return _FrozenDict({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class _FrozenDict(dict):
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("config snapshots are read-only; use override()")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+
+# -------------------------
+# Snapshot
+# -------------------------
+
+class Config:
+    """Typed, read-only view of the merged configuration."""
+
+    __slots__ = (
+        "version", "raw", "voice_model", "speed", "pitch", "language",
+        "personality", "aliases", "roles", "app_integrations", "llm",
+    )
+
+    def __init__(self, merged, version=0):
+        raw = _freeze(merged)
+        set_ = object.__setattr__
+        set_(self, "version", version)
+        set_(self, "raw", raw)
+        set_(self, "voice_model", raw.get("voice_model") or None)
+        set_(self, "speed", float(raw.get("speed") or 1.0))
+        set_(self, "pitch", float(raw.get("pitch") or 1.0))
+        set_(self, "language", raw.get("language") or "en-US")
+        set_(self, "personality", raw.get("personality") or "neutral")
+        # alias keys are matched against normalized (lowercase) speech
+        set_(self, "aliases", _FrozenDict(
+            {k.lower(): v for k, v in (raw.get("aliases") or {}).items()}
+        ))
+        set_(self, "roles", raw.get("roles") or _FrozenDict())
+        set_(self, "app_integrations", raw.get("app_integrations") or _FrozenDict())
+        set_(self, "llm", raw.get("llm") or _FrozenDict())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("config snapshots are read-only; use override()")
+
+    def get(self, key, default=None):
+        return self.raw.get(key, default)
+
+
+# -------------------------
+# Service
+# -------------------------
+
+class _Source:
+    __slots__ = ("path", "stamp", "data")
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.stamp = None
+        self.data = {}
+
+    def refresh(self):
+        """Re-parse the file if it changed; returns True when it did."""
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            stamp = None
+        if stamp == self.stamp:
+            return False
+        if stamp is None:
+            self.stamp, self.data = None, {}
+            return True
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            # keep the last good contents; the next change retries
+            print(f"[AL] ignoring {self.path}: {e}")
+            return False
+        self.stamp = stamp
+        self.data = data if isinstance(data, dict) else {}
+        return True
+
+
+class ConfigService:
+    def __init__(self, defaults=DEFAULTS_PATH, legacy=LEGACY_PATH, user=USER_PATH):
+        self.sources = [_Source(p) for p in (defaults, legacy, user)]
+        self.user_path = Path(user)
+        self._overrides = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._watcher = None
+        self._version = 0
+        self._snapshot = None
+        self.reload(force=True)
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def subscribe(self, callback):
+        """callback(old, new) runs after every applied change."""
+        self._listeners.append(callback)
+
+    def reload(self, force=False):
+        with self._lock:
+            changed = [s.refresh() for s in self.sources]
+            if not (force or any(changed)):
+                return False
+            change = self._apply()
+        self._notify(*change)
+        return True
+
+    def _apply(self):
+        """Swap in a new snapshot (under _lock); (old, new) for _notify()."""
+        merged = copy.deepcopy(BUILTIN)
+        for source in self.sources:
+            merged = merge(merged, source.data)
+        merged = merge(merged, self._overrides)
+
+        self._version += 1
+        old, self._snapshot = self._snapshot, Config(merged, self._version)
+        return old, self._snapshot
+
+    def _notify(self, old, new):
+        # outside _lock: listeners may override, reload or save in turn
+        if old is None:
+            return
+        for callback in list(self._listeners):
+            try:
+                callback(old, new)
+            except Exception as e:
+                print(f"[AL] config listener failed: {e}")
+
+    def override(self, key, value):
+        """Set a runtime value on top of every file (not persisted)."""
+        with self._lock:
+            self._overrides = merge(self._overrides, {key: value})
+            change = self._apply()
+        self._notify(*change)
+
+    def save_user(self, changes):
+        """
+        Merge changes into the user config file, written atomically.
+        A None value removes the key.
+        """
+        with self._lock:
+            user = self.sources[-1]
+            user.refresh()
+            data = merge(user.data, changes, remove_none=True)
+            self.user_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.user_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=2))
+            os.replace(tmp, self.user_path)
+
+    # -------------------------
+    # Watching
+    # -------------------------
+
+    def watch(self):
+        """Apply file changes as they happen (Linux inotify)."""
+        if self._watcher is not None or not al_inotify.available():
+            return False
+        self.user_path.parent.mkdir(parents=True, exist_ok=True)
+        # files are complete on close-after-write or rename, not on create
+        self._watcher = al_inotify.DirectoryWatcher(self._on_change, WATCH_MASK)
+        for directory in {str(s.path.parent) for s in self.sources}:
+            self._watcher.watch(directory)
+        return True
+
+    def _on_change(self, path, mask):
+        # editors and save_user() replace the file, so watch the directory
+        if any(path == str(s.path) for s in self.sources):
+            self.reload()
+
+    def close(self):
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ConfigService()
+            _service.watch()
+        return _service
+
+
+def get_config():
+    """Current snapshot; an attribute read, no file access."""
+    return get_service().snapshot
+
 
+# -------------------------
+# Old API
+# -------------------------
 
 def load_config():
-    if CONFIG_PATH.exists():
-        with open(CONFIG_PATH) as f:
-            return json.load(f)
-
-    return {
-        "roles": {},
-        "aliases": {
-            "chrome": "Google Chrome",
-            "google chrome": "Google Chrome",
-            "brave": "Brave Browser",
-            "browser": "Google Chrome",
-            "spotify": "Spotify",
-        }
-    }
+    return dict(get_config().raw)
 
 
 def save_config(config):
+    """Merge config into the user file; a None value removes the key."""
     try:
-        with open(CONFIG_PATH, "w") as f:
-            json.dump(config, f, indent=2)
+        get_service().save_user(config)
     except Exception:
         pass
@@ -1,10 +1,137 @@
 # al_context.py
+#
+# Conversation context: what AL was last doing, per-app state and a ring
+# of recent turns. Records use __slots__; the ring and the app table are
+# bounded. With a path the context is persisted in SQLite (WAL), so a
+# restarted daemon continues where it stopped:
+#
+#   turns   append-only log of commands (pruned to KEEP_TURNS rows)
+#   apps    one row per app: last use, last search, open/search counts
+#           (pruned to the MAX_APPS most recently used)
+#   state   one JSON row with the scalar context
+#
+# Loading reads the state row, the app table and the last MAX_TURNS turns
+# by primary key. "Last app used for <intent>" is a dict lookup.
+
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+CONTEXT_PATH = Path.home() / ".local/share/al/context.db"
+
+MAX_TURNS = 64       # kept in memory
+MAX_APPS = 256
+KEEP_TURNS = 2000    # kept on disk
+PRUNE_EVERY = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY, at REAL, text TEXT, intent TEXT, app TEXT
+);
+CREATE TABLE IF NOT EXISTS apps (
+    name TEXT PRIMARY KEY, last_used REAL, last_search TEXT,
+    opened INTEGER, searches INTEGER
+);
+CREATE TABLE IF NOT EXISTS state (id INTEGER PRIMARY KEY CHECK (id = 1), data TEXT);
+"""
+
+
+class Turn:
+    __slots__ = ("id", "at", "text", "intent", "app")
+
+    def __init__(self, id, at, text, intent, app):
+        self.id = id
+        self.at = at
+        self.text = text
+        self.intent = intent
+        self.app = app
+
+    def __repr__(self):
+        return f"Turn({self.text!r}, intent={self.intent!r}, app={self.app!r})"
+
+
+class AppState:
+    __slots__ = ("name", "last_used", "last_search", "opened", "searches")
+
+    def __init__(self, name, last_used=0.0, last_search=None, opened=0, searches=0):
+        self.name = name
+        self.last_used = last_used
+        self.last_search = last_search
+        self.opened = opened
+        self.searches = searches
+
+
+class _Record:
+    """Small mutable record with a fixed set of fields."""
+
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def update(self, **values):
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class SettingsState(_Record):
+    __slots__ = ("open", "section", "subsection")
+
+
+class IntentState(_Record):
+    __slots__ = ("domain", "target", "action")
+
 
 class ALContext:
-    def __init__(self):
+    def __init__(self, path=None, max_turns=MAX_TURNS):
         self.last_app = None
+        self.last_search = None
         self.last_role = None
         self.last_action = None
+        self.settings = SettingsState(open=False)
+        self.intent = IntentState()
+
+        self.turns = deque(maxlen=max_turns)
+        self.apps = {}
+        self._last_by_intent = {}   # intent -> app of the latest such turn
+        self._dirty_apps = set()
+        self._next_id = 1
+
+        self.path = Path(path) if path else None
+        self._db = None
+        self._lock = threading.Lock()
+        if self.path is not None:
+            self._open()
+
+    @classmethod
+    def load(cls, path=CONTEXT_PATH):
+        try:
+            return cls(path)
+        except sqlite3.Error as e:
+            print(f"[AL] context store unavailable ({e}); starting fresh")
+            return cls()
+
+    # -------------------------
+    # Updates
+    # -------------------------
+
+    def _app(self, name):
+        state = self.apps.get(name)
+        if state is None:
+            if len(self.apps) >= MAX_APPS:
+                oldest = min(self.apps.values(), key=lambda a: a.last_used)
+                del self.apps[oldest.name]
+            state = self.apps[name] = AppState(name)
+        state.last_used = time.time()
+        self._dirty_apps.add(name)
+        return state
 
     def remember_app(self, app):
         self.last_app = app
@@ -15,5 +142,162 @@ class ALContext:
     def remember_action(self, action):
         self.last_action = action
 
+    def opened(self, app):
+        self.last_app = app
+        self._app(app).opened += 1
+
+    def searched(self, app, url):
+        self.last_search = url
+        state = self._app(app)
+        state.last_search = url
+        state.searches += 1
+
+    def closed(self, app):
+        if app in self.apps:
+            self._app(app)
+        self.last_app = None
+        self.intent.target = None
+
+    def add_turn(self, text, intent):
+        """Log one handled command; persists the turn and the current context."""
+        turn = Turn(self._next_id, time.time(), text, intent, self.last_app)
+        self._next_id += 1
+        self.turns.append(turn)
+        if turn.app is not None:
+            self._last_by_intent[intent] = turn.app
+        if self._db is not None:
+            self._write(turn)
+        return turn
+
     def clear(self):
-        self.__init__()
+        self.last_app = self.last_search = None
+        self.last_role = self.last_action = None
+        self.settings = SettingsState(open=False)
+        self.intent = IntentState()
+        self.turns.clear()
+        self.apps.clear()
+        self._last_by_intent.clear()
+        if self._db is not None:
+            with self._lock, self._db:
+                self._db.execute("DELETE FROM turns")
+                self._db.execute("DELETE FROM apps")
+                self._db.execute("DELETE FROM state")
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+
+    def app(self, name):
+        return self.apps.get(name)
+
+    def last_app_for(self, intent):
+        """App of the most recent turn with this intent ("search", "open", ...)."""
+        return self._last_by_intent.get(intent)
+
+    def recent(self, n=None):
+        turns = list(self.turns)
+        return turns if n is None else turns[-n:]
+
+    def history(self, limit=KEEP_TURNS):
+        """Up to `limit` most recent turns, oldest first, from disk when persisted."""
+        if self._db is None:
+            return self.recent(limit)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, at, text, intent, app FROM turns ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [Turn(*r) for r in reversed(rows)]
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; no fsync per turn
+        db.executescript(SCHEMA)
+        self._db = db
+        self._load()
+
+    def _load(self):
+        db = self._db
+        row = db.execute("SELECT data FROM state WHERE id = 1").fetchone()
+        if row:
+            data = json.loads(row[0])
+            self.last_app = data.get("last_app")
+            self.last_search = data.get("last_search")
+            self.last_role = data.get("last_role")
+            self.last_action = data.get("last_action")
+            self.settings = SettingsState(**data.get("settings", {"open": False}))
+            self.intent = IntentState(**data.get("intent", {}))
+            self._last_by_intent = data.get("last_by_intent", {})
+
+        for row in db.execute(
+            "SELECT name, last_used, last_search, opened, searches FROM apps "
+            "ORDER BY last_used DESC LIMIT ?",
+            (MAX_APPS,),
+        ):
+            self.apps[row[0]] = AppState(*row)
+
+        rows = db.execute(
+            "SELECT id, at, text, intent, app FROM turns ORDER BY id DESC LIMIT ?",
+            (self.turns.maxlen,),
+        ).fetchall()
+        self.turns.extend(Turn(*r) for r in reversed(rows))
+        if rows:
+            self._next_id = rows[0][0] + 1
+
+    def _state(self):
+        return json.dumps({
+            "last_app": self.last_app,
+            "last_search": self.last_search,
+            "last_role": self.last_role,
+            "last_action": self.last_action,
+            "settings": self.settings.as_dict(),
+            "intent": self.intent.as_dict(),
+            "last_by_intent": self._last_by_intent,
+        })
+
+    def _write(self, turn):
+        apps = [self.apps[n] for n in self._dirty_apps if n in self.apps]
+        self._dirty_apps.clear()
+        with self._lock:
+            db = self._db
+            try:
+                db.execute("BEGIN")
+                # SQLite numbers the turn: other processes append to the same log
+                turn.id = db.execute(
+                    "INSERT INTO turns (at, text, intent, app) VALUES (?, ?, ?, ?)",
+                    (turn.at, turn.text, turn.intent, turn.app),
+                ).lastrowid
+                db.executemany(
+                    "INSERT OR REPLACE INTO apps VALUES (?, ?, ?, ?, ?)",
+                    [(a.name, a.last_used, a.last_search, a.opened, a.searches) for a in apps],
+                )
+                db.execute("INSERT OR REPLACE INTO state (id, data) VALUES (1, ?)",
+                           (self._state(),))
+                if turn.id % PRUNE_EVERY == 0:
+                    db.execute("DELETE FROM turns WHERE id <= ?", (turn.id - KEEP_TURNS,))
+                    db.execute(
+                        "DELETE FROM apps WHERE name NOT IN "
+                        "(SELECT name FROM apps ORDER BY last_used DESC LIMIT ?)",
+                        (MAX_APPS,),
+                    )
+                db.execute("COMMIT")
+            except sqlite3.Error as e:
+                # e.g. "database is locked" by another AL process
+                if db.in_transaction:
+                    db.execute("ROLLBACK")
+                self._dirty_apps.update(a.name for a in apps)   # next turn retries
+                print(f"[AL] could not save context: {e}")
+                return
+        self._next_id = turn.id + 1
+
+    def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# al_daemon.py
+#
+# Long-lived AL process. Keeps one warm ALAssistant (imports, context,
+# follow-up state) and serves line-based requests on a Unix socket:
+#
+#   ping            -> pong
+#   activate        -> ready       (then greets the user)
+#   cmd <text>      -> ok          (runs ALAssistant.handle)
+#   levels          -> ok, then "level <source> <value>" lines for as
+#                      long as the client stays connected (overlay)
+#   stats           -> ok <metrics.prom>  (writes the al_trace exports)
+#   shutdown        -> bye
+#
+# A connection can also open its own session, with its own intent,
+# settings state, pending confirmation and LLM conversation:
+#
+#   session <kind> [name]   -> ok <id>   kind: terminal, hotkey, voice or
+#                                        script (script sessions are silent)
+#   ask <text>      -> "say <text>" lines, then done
+#   cmd <text>      -> ok, then "say <text>" lines as AL answers
+#   end             -> bye
+#
+# What AL says later (LLM answers, finished actions) arrives as further
+# "say" lines. A named session outlives its connection for SESSION_TTL
+# and is resumed by opening the same name again; unnamed sessions end
+# with their connection. Sessions share the backend (app index, TTS
+# voice, LLM connection, media bus) and one action thread pool.
+#
+# Requests, the idle timer and wake events all run on one al_loop.EventLoop;
+# per-session state is only touched on that thread.
+
+import itertools
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import al_levels
+import al_llm
+import al_probe
+import al_trace
+from al import ALAssistant
+from al_backend import RecordingBackend, SessionBackend
+from al_context import ALContext
+from al_client import SOCKET_PATH
+from al_loop import EventLoop
+from al_platform import SYSTEM, lazy
+
+al_appindex = lazy("al_appindex")
+
+SESSION_KINDS = ("terminal", "hotkey", "voice", "script")
+SESSION_VERBS = ("session", "ask", "end")
+SESSION_TTL = 1800
+MAX_SESSIONS = 512
+SESSION_WORKERS = 16
+SWEEP_INTERVAL = 60
+
+
+class _Connection:
+    """One client socket, read line by line on the event loop."""
+
+    def __init__(self, daemon, sock):
+        self.daemon = daemon
+        self.sock = sock
+        self.buffer = b""
+        self.level_callback = None
+        self.session = None
+        sock.setblocking(False)
+
+    def readable(self):
+        try:
+            data = self.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self.close()
+            return
+        self.buffer += data
+        *lines, self.buffer = self.buffer.split(b"\n")
+        for raw in lines:
+            if self.sock is None:
+                return      # a request closed the connection: drop the rest
+            line = raw.decode(errors="replace").strip()
+            if line and self.level_callback is None:
+                self.request(line)
+
+    def request(self, line):
+        verb, _, arg = line.partition(" ")
+        if verb == "levels":
+            self.daemon.stream_levels(self)
+            return
+        if verb in SESSION_VERBS or (verb == "cmd" and self.session is not None):
+            self.daemon.session_request(self, verb, arg)
+            return
+        reply, after = self.daemon.dispatch(verb, arg)
+        self.send(reply)
+        if after:
+            # the client never waits on speech or app launches
+            self.daemon.loop.call_soon(after)
+
+    def send(self, line):
+        try:
+            self.sock.sendall(line.encode() + b"\n")
+        except OSError:
+            self.close()  # includes a client too slow to keep up
+
+    def close(self):
+        if self.sock is None:
+            return
+        if self.level_callback is not None:
+            al_levels.get_meter().unsubscribe(self.level_callback)
+            self.level_callback = None
+        if self.session is not None:
+            self.daemon.detach(self.session)
+        self.daemon.loop.remove_reader(self.sock)
+        self.sock.close()
+        self.sock = None
+
+
+class Session:
+    """One client's conversation: its own ALAssistant on the shared backend."""
+
+    def __init__(self, daemon, id, kind, named):
+        self.daemon = daemon
+        self.id = id
+        self.kind = kind
+        self.named = named
+        self.conn = None
+        self.last_used = time.monotonic()
+        backend = SessionBackend(daemon.backend, self.output, aloud=kind != "script")
+        self.assistant = ALAssistant(
+            backend=backend,
+            context=ALContext(),
+            pool=daemon.pool,
+            prewarmer=daemon.assistant.prewarmer,
+            config=daemon.assistant.config,
+        )
+        self.assistant.loop = daemon.loop
+
+    def output(self, text):
+        # handle() speaks on the loop thread; actions and answers on workers
+        if threading.get_ident() == self.daemon.loop_thread:
+            self._send(f"say {text}")
+        else:
+            self.daemon.loop.call_soon_threadsafe(self._send, f"say {text}")
+
+    def _send(self, line):
+        if self.conn is not None and self.conn.sock is not None:
+            self.conn.send(line)
+
+    def handle(self, text):
+        self.last_used = time.monotonic()
+        try:
+            self.assistant.handle(text)
+        except Exception as e:
+            print(f"[AL] session {self.id}: command failed: {e}")
+            self._send(f"error {e}")
+
+    def close(self):
+        self.assistant.barge_in()
+        self.assistant.actions.shutdown(wait=False)
+        self.assistant.prewarmer.forget(self.assistant.context)
+        self.assistant.context.close()
+        self.conn = None
+
+
+class ALDaemon:
+    def __init__(self, assistant=None, path=SOCKET_PATH, backend=None):
+        # backend: what the sessions share (the assistant's by default)
+        # context survives daemon restarts
+        self.assistant = assistant or ALAssistant(backend=backend, context=ALContext.load())
+        self.backend = backend or self.assistant.backend
+        self.path = path
+        self.loop = EventLoop()
+        self.loop_thread = None
+        self.server = None
+
+        # sessions: own state, shared backend and action threads
+        self.sessions = {}
+        self.pool = ThreadPoolExecutor(max_workers=SESSION_WORKERS,
+                                       thread_name_prefix="al-session")
+        self._session_ids = itertools.count(1)
+        self.loop.call_later(SWEEP_INTERVAL, self._sweep)
+
+        # the assistant's idle timer and commands share the daemon's loop
+        self.assistant.attach(self.loop)
+
+        # the first resolve_app() would build the app index on the loop
+        # thread and stall every session meanwhile: build it off the loop
+        if SYSTEM == "linux":
+            threading.Thread(target=al_appindex.get_index, name="al-appindex",
+                             daemon=True).start()
+
+        # settings saved while running apply to the next command
+        self.assistant.config.subscribe(self._config_changed)
+
+    def stream_levels(self, conn):
+        """Push audio level changes to one client until it disconnects."""
+
+        def changed(source, value):
+            # called on audio threads; the socket is only touched by the loop
+            self.loop.call_soon_threadsafe(self._send_level, conn, source, value)
+
+        conn.level_callback = changed
+        conn.send("ok")
+        al_levels.get_meter().subscribe(changed)
+
+    def _send_level(self, conn, source, value):
+        if conn.sock is not None:
+            conn.send(f"level {source} {value:.2f}")
+
+    def _config_changed(self, old, new):
+        print(f"[AL] configuration reloaded (v{new.version})")
+
+    # -------------------------
+    # Requests
+    # -------------------------
+
+    def dispatch(self, verb, arg):
+        """
+        Return (reply, after). `after` runs once the reply is sent so the
+        client never waits on speech or app launches.
+        """
+        if verb == "ping":
+            return "pong", None
+
+        if verb == "activate":
+            started = al_trace.now()
+            self.assistant.wake()
+            return "ready", lambda: self._greet("client", started)
+
+        if verb == "cmd":
+            if not arg:
+                return "error empty command", None
+            return "ok", lambda: self._handle(arg)
+
+        if verb == "stats":
+            _, metrics = al_trace.export()
+            return f"ok {metrics}", None
+
+        if verb == "shutdown":
+            return "bye", self.shutdown
+
+        return f"error unknown request {verb!r}", None
+
+    def _greet(self, source, started):
+        self.assistant.speak("AL is ready.")
+        al_trace.record("wake", started, source=source)
+
+    def activate(self, source="client"):
+        """Wake from any thread (wake word, hotkey)."""
+        self.loop.call_soon_threadsafe(self._activate, source, al_trace.now())
+
+    def _activate(self, source, started):
+        self.assistant.wake()
+        self._greet(source, started)
+
+    def _handle(self, text):
+        try:
+            self.assistant.handle(text)
+        except Exception as e:
+            print(f"[AL] command failed: {e}")
+
+    # -------------------------
+    # Sessions
+    # -------------------------
+
+    def session_request(self, conn, verb, arg):
+        if verb == "session":
+            kind, _, name = arg.partition(" ")
+            kind = kind or "terminal"
+            if kind not in SESSION_KINDS:
+                conn.send(f"error unknown session kind {kind!r}")
+                return
+            session = self.open_session(kind, name.strip() or None)
+            if session is None:
+                conn.send("error too many sessions")
+                return
+            if conn.session is not None and conn.session is not session:
+                self.detach(conn.session)
+            if session.conn is not None and session.conn is not conn:
+                session.conn.session = None  # a new client takes a named session over
+            session.conn, conn.session = conn, session
+            conn.send(f"ok {session.id}")
+            return
+
+        session = conn.session
+        if session is None:
+            conn.send("error no session")
+            return
+
+        if verb == "end":
+            conn.session = None
+            self.close_session(session)
+            conn.send("bye")
+            return
+
+        if not arg:
+            conn.send("error empty command")
+            return
+        # handled in order with the connection's other requests; handle()
+        # itself never waits on speech or app launches
+        if verb == "cmd":
+            conn.send("ok")
+        self._session_command(session, arg, verb == "ask")
+
+    def _session_command(self, session, text, reply_done):
+        session.handle(text)
+        if reply_done:
+            session._send("done")
+        if not session.assistant.running:  # "exit" ends the session
+            conn = session.conn
+            self.close_session(session)
+            if conn is not None:
+                conn.session = None
+                conn.send("bye")
+
+    def open_session(self, kind, name=None):
+        if name is not None and name in self.sessions:
+            session = self.sessions[name]
+            session.last_used = time.monotonic()
+            return session
+        if len(self.sessions) >= MAX_SESSIONS:
+            detached = [s for s in self.sessions.values() if s.conn is None]
+            if not detached:
+                return None
+            self.close_session(min(detached, key=lambda s: s.last_used))
+        id = name or f"s{next(self._session_ids)}"
+        session = self.sessions[id] = Session(self, id, kind, named=name is not None)
+        return session
+
+    def detach(self, session):
+        """The session's client went away; named sessions wait to be resumed."""
+        session.conn = None
+        session.last_used = time.monotonic()
+        if not session.named:
+            self.close_session(session)
+
+    def close_session(self, session):
+        if self.sessions.get(session.id) is session:
+            del self.sessions[session.id]
+            session.close()
+
+    def _sweep(self):
+        cutoff = time.monotonic() - SESSION_TTL
+        for session in list(self.sessions.values()):
+            if session.conn is None and session.last_used < cutoff:
+                self.close_session(session)
+        self.loop.call_later(SWEEP_INTERVAL, self._sweep)
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+
+    def bind(self):
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self.server.listen(socket.SOMAXCONN)
+        self.server.setblocking(False)
+        self.loop.add_reader(self.server, self._accept)
+
+    def _accept(self):
+        try:
+            sock, _ = self.server.accept()
+        except BlockingIOError:
+            return
+        conn = _Connection(self, sock)
+        self.loop.add_reader(sock, conn.readable)
+
+    def serve_forever(self):
+        if self.server is None:
+            self.bind()
+        self.loop_thread = threading.get_ident()
+        try:
+            self.loop.run()
+        finally:
+            if al_trace.ENABLED:
+                al_trace.export()
+            for session in list(self.sessions.values()):
+                self.close_session(session)
+            self.pool.shutdown(wait=False)
+            self.assistant.context.close()
+            self.server.close()
+            self.loop.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def shutdown(self):
+        self.loop.stop()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AL daemon")
+    parser.add_argument("--wake", action="store_true",
+                        help="listen for Super+Space (and an enrolled wake word) in-process")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket to listen on")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="handle commands without touching apps, speech or the LLM "
+                             "(for testing clients)")
+    args = parser.parse_args(argv)
+
+    if args.dry_run:
+        backend = RecordingBackend(limit=1000)
+        daemon = ALDaemon(ALAssistant(backend=backend), path=args.socket)
+        print(f"[AL] dry-run daemon listening on {daemon.path}")
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    daemon = ALDaemon(path=args.socket)
+    wake = None
+    if args.wake:
+        from al_wake import WakeService
+        wake = WakeService(daemon.activate)
+        wake.start()
+
+    # load the model now and keep it resident (keep_alive) for fast answers
+    threading.Thread(target=al_llm.warm, name="al-llm-warm", daemon=True).start()
+    # answer update/location questions from a cache kept fresh in the background
+    al_probe.get_prober()
+
+    print(f"[AL] daemon listening on {daemon.path}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if wake:
+            wake.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,8 @@
-import platform
+import shutil
 import subprocess
+import threading
 
-SYSTEM = platform.system().lower()
+from al_platform import SYSTEM
 
 
 # -------------------------
@@ -12,6 +13,43 @@ def _run(cmd):
     subprocess.run(cmd, check=False)
 
 
+def _low_priority(cmd):
+    """Prefix cmd so it yields CPU and disk to everything else."""
+    prefix = []
+    if shutil.which("ionice"):
+        prefix += ["ionice", "-c", "3"]
+    if shutil.which("nice"):
+        prefix += ["nice", "-n", "19"]
+    return prefix + cmd
+
+
+def _output(cmd, timeout):
+    """stdout of a low-priority command, or None if it failed."""
+    try:
+        out = subprocess.run(_low_priority(cmd), capture_output=True, text=True,
+                             timeout=timeout, check=False)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout if out.returncode == 0 else None
+
+
+_pk = None
+_pk_lock = threading.Lock()
+
+
+def _packagekit():
+    """Shared PackageKit connection, or None when only apt is usable."""
+    global _pk
+    with _pk_lock:
+        if _pk is None:
+            try:
+                from al_packagekit import PackageKit
+                _pk = PackageKit()
+            except Exception:
+                _pk = False
+        return _pk or None
+
+
 # -------------------------
 # Settings
 # -------------------------
@@ -67,12 +105,44 @@ def enable_location_services():
 # Software Updates
 # -------------------------
 
-def check_for_updates():
-    """Check for available updates via CLI"""
+def pending_updates(refresh=False):
+    """
+    Names of packages with an update available, or None if unknown.
+    refresh=True also refreshes the package metadata where that needs
+    no root (PackageKit); al_probe calls this in the background.
+    """
     if SYSTEM == "darwin":
-        _run(["softwareupdate", "-l"])
-    elif SYSTEM == "linux":
-        _run(["sudo", "apt", "update"])
+        # softwareupdate -l contacts Apple's servers; it is slow but needs no root
+        out = _output(["softwareupdate", "-l"], timeout=600)
+        if out is None:
+            return None
+        return [
+            line.split("Label:", 1)[1].strip()
+            for line in out.splitlines()
+            if line.strip().startswith("* Label:")
+        ]
+
+    if SYSTEM == "linux":
+        pk = _packagekit()
+        if pk is not None:
+            try:
+                if refresh:
+                    pk.refresh_cache()
+                return [package_id.split(";")[0] for package_id in pk.updates()]
+            except Exception as e:
+                print(f"[AL] PackageKit query failed ({e}), using apt")
+        # local package lists only: refreshing them needs root
+        out = _output(["apt", "list", "--upgradable"], timeout=60)
+        if out is None:
+            return None
+        return [line.split("/", 1)[0] for line in out.splitlines() if "/" in line]
+
+    return None
+
+
+def check_for_updates():
+    """Refresh and return pending updates (see pending_updates)."""
+    return pending_updates(refresh=True)
 
 
 def open_update_settings():
@@ -84,10 +154,22 @@ def open_update_settings():
         ])
     elif SYSTEM == "linux":
         _run(["gnome-control-center", "updates"])
+
+
 def location_services_state():
-    """
-    macOS does not reliably expose Location Services state.
-    Returns 'unknown' on purpose.
-    """
-    return "unknown"
+    """'on', 'off' or 'unknown'."""
+    if SYSTEM == "darwin":
+        # readable without root on most releases; 'unknown' otherwise
+        out = _output([
+            "defaults", "read",
+            "/var/db/locationd/Library/Preferences/ByHost/com.apple.locationd",
+            "LocationServicesEnabled",
+        ], timeout=5)
+        value = (out or "").strip()
+    elif SYSTEM == "linux":
+        out = _output(["gsettings", "get", "org.gnome.system.location", "enabled"], timeout=5)
+        value = (out or "").strip()
+    else:
+        value = ""
+    return {"1": "on", "true": "on", "0": "off", "false": "off"}.get(value, "unknown")
 
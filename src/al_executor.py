@@ -0,0 +1,135 @@
+# al_executor.py
+#
+# Runs side effects (app launches, media control, settings panes) on a
+# bounded worker pool so ALAssistant can accept the next command right
+# away. Actions sharing a key (e.g. "media") run in submission order;
+# unrelated actions run concurrently. `after` adds explicit dependencies
+# on other actions (used by compound-command plans). Each run is traced
+# as an al_trace span named by `stage`.
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import al_trace
+
+MAX_WORKERS = 4
+
+
+class Action:
+    __slots__ = ("name", "key", "future", "submitted", "finished", "error")
+
+    def __init__(self, name, key):
+        self.name = name
+        self.key = key
+        self.future = None
+        self.submitted = time.monotonic()
+        self.finished = None
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.finished is not None and self.error is None
+
+    def __repr__(self):
+        state = "pending" if self.finished is None else ("ok" if self.ok else "failed")
+        return f"Action({self.name!r}, {state})"
+
+
+class ActionExecutor:
+    def __init__(self, on_done=None, max_workers=MAX_WORKERS, pool=None):
+        self.on_done = on_done
+        self.pending = set()
+        self.recent = deque(maxlen=50)
+
+        # a pool passed in is shared (e.g. by every daemon session) and
+        # outlives this executor
+        self._own_pool = pool is None
+        self._pool = pool or ThreadPoolExecutor(max_workers=max_workers,
+                                                thread_name_prefix="al-action")
+        self._lock = threading.Lock()
+        self._lanes = {}  # key -> last future submitted for that key
+
+    def submit(self, name, fn, *args, key=None, after=(), stage="action"):
+        action = Action(name, key)
+        action.future = Future()
+
+        with self._lock:
+            waits = [a.future for a in after]
+            before = self._lanes.get(key) if key else None
+            if before is not None:
+                waits.append(before)
+            if key:
+                self._lanes[key] = action.future
+            self.pending.add(action)
+
+        # keep per-key order and plan dependencies without holding a pool
+        # thread: the action is queued when the last of them finishes (the
+        # earlier actions' outcomes are their own)
+        waits = [f for f in waits if not f.done()]
+        if not waits:
+            self._start(action, fn, args, stage)
+            return action
+
+        remaining = [len(waits)]
+
+        def ready(_):
+            with self._lock:
+                remaining[0] -= 1
+                go = remaining[0] == 0
+            if go:
+                self._start(action, fn, args, stage)
+
+        for future in waits:
+            future.add_done_callback(ready)
+        return action
+
+    def _start(self, action, fn, args, stage):
+        try:
+            self._pool.submit(self._run, action, fn, args, stage)
+        except RuntimeError as e:   # the pool was shut down meanwhile
+            action.error = e
+            self._finish(action, None)
+
+    def _run(self, action, fn, args, stage):
+        result = None
+        try:
+            with al_trace.span(stage, name=action.name):
+                result = fn(*args)
+        except Exception as e:
+            action.error = e
+        finally:
+            self._finish(action, result)
+
+    def _finish(self, action, result):
+        action.finished = time.monotonic()
+        with self._lock:
+            self.pending.discard(action)
+            if action.key and self._lanes.get(action.key) is action.future:
+                del self._lanes[action.key]
+        self.recent.append(action)
+        try:
+            if self.on_done:
+                self.on_done(action)
+        except Exception as e:
+            print(f"[AL] on_done for {action.name} failed: {e}")
+        finally:
+            # last: this runs the callbacks of the actions waiting for it
+            action.future.set_result(result)
+
+    def wait(self, timeout=None):
+        """Block until every action submitted so far has finished."""
+        with self._lock:
+            futures = [a.future for a in self.pending]
+        for future in futures:
+            try:
+                future.result(timeout)
+            except Exception:
+                pass
+
+    def shutdown(self, wait=True):
+        if self._own_pool:
+            self._pool.shutdown(wait=wait)
+        elif wait:
+            self.wait()
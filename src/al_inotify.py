@@ -0,0 +1,97 @@
+# al_inotify.py
+#
+# Small inotify wrapper (Linux, via ctypes) used to refresh indexes and
+# config in place instead of re-reading files on every command.
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_ISDIR = 0x40000000
+
+CHANGES = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT = struct.Struct("iIII")
+
+_libc = None
+
+
+def available():
+    global _libc
+    if _libc is None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            libc.inotify_init1
+            _libc = libc
+        except (OSError, AttributeError, TypeError):
+            _libc = False
+    return bool(_libc)
+
+
+class DirectoryWatcher:
+    """
+    Watch directories and call callback(path, mask) from a background
+    thread for every change below them.
+    """
+
+    def __init__(self, callback, mask=CHANGES):
+        if not available():
+            raise OSError("inotify is not available")
+        self.callback = callback
+        self.mask = mask
+        self._fd = _libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}  # watch descriptor -> directory
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = threading.Thread(target=self._loop, name="al-inotify", daemon=True)
+        self._thread.start()
+
+    def watch(self, directory):
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(directory), self.mask)
+        if wd < 0:
+            return False
+        self._dirs[wd] = directory
+        return True
+
+    def _loop(self):
+        while True:
+            ready, _, _ = select.select([self._fd, self._stop_r], [], [])
+            if self._stop_r in ready:
+                return
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                try:
+                    self.callback(path, mask)
+                except Exception as e:
+                    print(f"[AL] watcher callback failed: {e}")
+
+    def close(self):
+        os.write(self._stop_w, b"x")
+        self._thread.join()
+        for fd in (self._fd, self._stop_r, self._stop_w):
+            os.close(fd)
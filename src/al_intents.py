@@ -0,0 +1,197 @@
+# al_intents.py
+#
+# Declarative intent registry used by ALAssistant.handle.
+#
+#   exact     -> phrase must equal the whole command   (hash map)
+#   prefixes  -> command starts with the phrase        (radix trie)
+#   contains  -> phrase appears anywhere in command    (Aho-Corasick)
+#
+# Intents are ranked by registration order, so the registry reproduces
+# the behaviour of an if-chain without testing every branch in turn.
+
+import re
+from collections import deque
+
+MEMO_SIZE = 4096
+
+
+class Intent:
+    __slots__ = ("name", "handler", "priority")
+
+    def __init__(self, name, handler, priority):
+        self.name = name
+        self.handler = handler
+        self.priority = priority
+
+    def __repr__(self):
+        return f"Intent({self.name!r})"
+
+
+class _TrieNode:
+    __slots__ = ("edges", "intents")
+
+    def __init__(self):
+        self.edges = {}  # first char -> (label, child)
+        self.intents = []
+
+
+class IntentRegistry:
+    def __init__(self):
+        self.intents = []
+        self._exact = {}
+        self._trie = _TrieNode()
+
+        # Aho-Corasick automaton, one list entry per state
+        self._goto = [{}]
+        self._fail = [0]
+        self._own = [[]]
+        self._out = [[]]
+
+        # single compiled pass that rejects commands without any trigger
+        self._contains = []
+        self._gate = None
+        self._compiled = True
+
+        # spoken commands repeat a lot ("pause", "next", ...)
+        self._memo = {}
+
+    # -------------------------
+    # Registration
+    # -------------------------
+
+    def add(self, name, handler=None, exact=(), prefixes=(), contains=()):
+        intent = Intent(name, handler, len(self.intents))
+        self.intents.append(intent)
+        self._memo.clear()
+
+        for phrase in exact:
+            self._exact.setdefault(phrase, intent)
+
+        for phrase in prefixes:
+            self._add_prefix(phrase, intent)
+
+        for phrase in contains:
+            self._add_contains(phrase, intent)
+
+        return intent
+
+    def _add_prefix(self, phrase, intent):
+        node = self._trie
+        i = 0
+        while i < len(phrase):
+            edge = node.edges.get(phrase[i])
+            if edge is None:
+                child = _TrieNode()
+                node.edges[phrase[i]] = (phrase[i:], child)
+                node = child
+                break
+
+            label, child = edge
+            rest = phrase[i:]
+            j = 0
+            while j < len(label) and j < len(rest) and label[j] == rest[j]:
+                j += 1
+
+            if j < len(label):
+                # split the edge where the new phrase diverges
+                mid = _TrieNode()
+                mid.edges[label[j]] = (label[j:], child)
+                node.edges[phrase[i]] = (label[:j], mid)
+                child = mid
+
+            node = child
+            i += j
+
+        node.intents.append(intent)
+
+    def _add_contains(self, phrase, intent):
+        state = 0
+        for ch in phrase:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append([])
+                self._out.append([])
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._own[state].append(intent)
+        self._contains.append(phrase)
+        self._compiled = False
+
+    def _compile(self):
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+            self._out[state] = list(self._own[state])
+
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._own[nxt] + self._out[self._fail[nxt]]
+
+        self._gate = re.compile("|".join(map(re.escape, self._contains)))
+        self._compiled = True
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+
+    def lookup(self, text):
+        """
+        Return every intent matching text, best (earliest registered) first.
+        """
+        found = self._memo.get(text)
+        if found is None:
+            found = self._lookup(text)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[text] = found
+        return found
+
+    def _lookup(self, text):
+        if not self._compiled:
+            self._compile()
+
+        found = []
+
+        intent = self._exact.get(text)
+        if intent is not None:
+            found.append(intent)
+
+        node = self._trie
+        i, n = 0, len(text)
+        while i < n:
+            edge = node.edges.get(text[i])
+            if edge is None:
+                break
+            label, node = edge
+            if not text.startswith(label, i):
+                break
+            i += len(label)
+            if node.intents:
+                found.extend(node.intents)
+
+        if self._gate is not None and self._gate.search(text):
+            goto, fail, out = self._goto, self._fail, self._out
+            state = 0
+            for ch in text:
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+                if out[state]:
+                    found.extend(out[state])
+
+        if len(found) > 1:
+            found = sorted(set(found), key=lambda i: i.priority)
+        return tuple(found)
+
+    def match(self, text):
+        found = self.lookup(text)
+        return found[0] if found else None
@@ -0,0 +1,98 @@
+# al_levels.py
+#
+# Audio level meter shared by the speech worker, the microphone pipeline
+# and the overlay. Levels are normalized RMS in 0..1, quantized so that
+# silence and steady noise produce no events at all; listeners are only
+# called when a level actually changes.
+
+import math
+import threading
+from array import array
+
+FULL_SCALE = 6000.0   # RMS of loud speech
+FLOOR = 0.03          # below this counts as silence
+STEP = 0.02           # quantization of reported levels
+ENVELOPE_MS = 30
+
+
+def level(pcm):
+    """Normalized level of a 16-bit mono PCM chunk (bytes or array)."""
+    samples = pcm if isinstance(pcm, array) else array("h", pcm)
+    if not samples:
+        return 0.0
+    rms = math.sqrt(sum(s * s for s in samples) / len(samples))
+    value = min(1.0, rms / FULL_SCALE)
+    if value < FLOOR:
+        return 0.0
+    return round(value / STEP) * STEP
+
+
+def envelope(pcm, rate, step_ms=ENVELOPE_MS):
+    """Levels of consecutive step_ms windows of a clip."""
+    samples = array("h", pcm)
+    n = max(1, rate * step_ms // 1000)
+    return [level(samples[i:i + n]) for i in range(0, len(samples), n)]
+
+
+class LevelMeter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._levels = {}
+        self._listeners = []
+
+    def subscribe(self, callback):
+        """callback(source, level) on every change."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    @property
+    def watched(self):
+        """True while anyone listens; producers skip the RMS work otherwise."""
+        return bool(self._listeners)
+
+    def get(self, source=None):
+        with self._lock:
+            if source is not None:
+                return self._levels.get(source, 0.0)
+            return max(self._levels.values(), default=0.0)
+
+    def set(self, source, value):
+        with self._lock:
+            if self._levels.get(source, 0.0) == value:
+                return
+            self._levels[source] = value
+            listeners = list(self._listeners)
+        for callback in listeners:
+            callback(source, value)
+
+    def follow(self, source, levels, step_ms=ENVELOPE_MS, delay=0.0):
+        """
+        Report a precomputed envelope in real time (audio that is played
+        by another process), starting `delay` seconds from now. Returns
+        an Event; set it to stop early.
+        """
+        stop = threading.Event()
+
+        def run():
+            if delay > 0 and stop.wait(delay):
+                return
+            for value in levels:
+                self.set(source, value)
+                if stop.wait(step_ms / 1000):
+                    break
+            self.set(source, 0.0)
+
+        threading.Thread(target=run, name=f"al-level-{source}", daemon=True).start()
+        return stop
+
+
+_meter = LevelMeter()
+
+
+def get_meter():
+    return _meter
@@ -1,8 +1,312 @@
-def respond(text: str) -> str:
+# al_llm.py
+#
+# Streaming client for a local Ollama server. One pooled keep-alive HTTP
+# session is reused for every request, the model is kept resident with
+# keep_alive, and tokens are streamed so complete sentences can go to TTS
+# while the rest of the answer is still being generated. A Generation
+# can be cancelled from another thread (barge-in); closing the response
+# drops the connection, which makes Ollama stop generating.
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import al_config
+import al_llmcache
+from al_text import SentenceSplitter
+
+DEFAULT_HOST = "http://127.0.0.1:11434"
+DEFAULT_MODEL = "llama3.2"
+DEFAULT_KEEP_ALIVE = "30m"
+DEFAULT_SYSTEM = (
+    "You are AL, a desktop voice assistant. Answer in one to three short "
+    "spoken sentences without markdown."
+)
+
+CONNECT_TIMEOUT = 2.0
+READ_TIMEOUT = 60.0
+HISTORY_TURNS = 4
+
+FALLBACK = (
+    "I can open and close apps, search, control media, "
+    "and guide you through system settings."
+)
+
+
+def load_llm_settings(config=None):
+    config = config or al_config.get_config()
+    settings = {
+        "host": DEFAULT_HOST,
+        "model": DEFAULT_MODEL,
+        "keep_alive": DEFAULT_KEEP_ALIVE,
+        "system": DEFAULT_SYSTEM,
+        "cache_threshold": al_llmcache.THRESHOLD,
+        "cache_ttl": al_llmcache.TTL_SECONDS,
+        "cache_size": al_llmcache.MAX_ENTRIES,
+    }
+    for key in settings:
+        if config.llm.get(key) is not None:
+            settings[key] = config.llm[key]
+    if os.environ.get("OLLAMA_HOST"):
+        settings["host"] = os.environ["OLLAMA_HOST"]
+    if not settings["host"].startswith(("http://", "https://")):
+        settings["host"] = "http://" + settings["host"]
+    return settings
+
+
+# -------------------------
+# Client
+# -------------------------
+
+class Generation:
+    """Handle on one streamed answer; cancel() may be called from any thread."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.first_sentence_at = None
+        self.text = ""
+        self._cancelled = threading.Event()
+        self._response = None
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        response = self._response
+        if response is not None:
+            response.close()
+
+
+class OllamaClient:
+    def __init__(self, settings=None):
+        import requests  # optional dependency
+        from requests.adapters import HTTPAdapter
+
+        self.settings = settings or load_llm_settings()
+        self.host = self.settings["host"].rstrip("/")
+        self.history = conversation()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def warm(self):
+        """Load the model (an empty generate request) so the first answer is fast."""
+        self.session.post(
+            f"{self.host}/api/generate",
+            json={"model": self.settings["model"], "keep_alive": self.settings["keep_alive"]},
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+        ).raise_for_status()
+
+    def unload(self):
+        """Ask Ollama to drop the model from memory now."""
+        self.session.post(
+            f"{self.host}/api/generate",
+            json={"model": self.settings["model"], "keep_alive": 0},
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+        ).raise_for_status()
+
+    def _messages(self, prompt, history):
+        messages = [{"role": "system", "content": self.settings["system"]}]
+        messages.extend(history)
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def stream(self, prompt, generation=None, history=None):
+        """Yield answer tokens as they arrive."""
+        generation = generation or Generation()
+        history = self.history if history is None else history
+        response = self.session.post(
+            f"{self.host}/api/chat",
+            json={
+                "model": self.settings["model"],
+                "messages": self._messages(prompt, history),
+                "stream": True,
+                "keep_alive": self.settings["keep_alive"],
+            },
+            stream=True,
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+        )
+        generation._response = response
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if generation.cancelled:
+                    return
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                token = chunk.get("message", {}).get("content", "")
+                if token:
+                    if generation.first_token_at is None:
+                        generation.first_token_at = time.perf_counter()
+                    yield token
+            # fully read, so close() hands the connection back to the pool
+        except Exception:
+            # cancel() closes the socket under iter_lines; that is not an error
+            if not generation.cancelled:
+                raise
+        finally:
+            generation._response = None
+            response.close()
+
+    def respond(self, prompt, on_sentence=None, generation=None, history=None):
+        """
+        Stream an answer, calling on_sentence(text) for each complete
+        sentence. Returns the (possibly cancelled) answer text. `history`
+        is the conversation to continue (a deque of messages); the
+        client's own by default.
+        """
+        generation = generation or Generation()
+        history = self.history if history is None else history
+        splitter = SentenceSplitter()
+
+        def emit(sentence):
+            if sentence and on_sentence and not generation.cancelled:
+                if generation.first_sentence_at is None:
+                    generation.first_sentence_at = time.perf_counter()
+                on_sentence(sentence)
+
+        for token in self.stream(prompt, generation, history):
+            generation.text += token
+            for sentence in splitter.feed(token):
+                emit(sentence)
+        emit(splitter.flush())
+
+        if generation.text and not generation.cancelled:
+            history.append({"role": "user", "content": prompt})
+            history.append({"role": "assistant", "content": generation.text})
+        return generation.text
+
+    def close(self):
+        self.session.close()
+
+
+def conversation():
+    """An empty conversation history, e.g. for one daemon session."""
+    return deque(maxlen=HISTORY_TURNS * 2)
+
+
+_client = None
+_client_lock = threading.Lock()
+_cache = None
+
+
+def get_client():
+    """Shared client; rebuilt when the "llm" config section changes."""
+    global _client
+    with _client_lock:
+        settings = load_llm_settings()
+        if _client is None or _client.settings != settings:
+            if _client is not None:
+                _client.close()
+            _client = OllamaClient(settings)
+        return _client
+
+
+def get_cache():
+    """Shared answer cache, loaded from disk on first use; saved on every new answer."""
+    global _cache
+    with _client_lock:
+        settings = load_llm_settings()
+        if _cache is None:
+            _cache = al_llmcache.ResponseCache(
+                max_entries=settings["cache_size"],
+                ttl=settings["cache_ttl"],
+                threshold=settings["cache_threshold"],
+            ).load()
+        else:
+            # size applies on the next start; the rest takes effect now
+            _cache.ttl = settings["cache_ttl"]
+            _cache.threshold = settings["cache_threshold"]
+        return _cache
+
+
+def save_cache():
+    if _cache is None:
+        return
+    try:
+        _cache.save()
+    except OSError as e:
+        print(f"[AL] could not save the answer cache: {e}")
+
+
+def release():
+    """Let Ollama unload the model now and close the pooled connection."""
+    global _client
+    save_cache()
+    with _client_lock:
+        client, _client = _client, None
+    if client is None:
+        return
+
+    def unload():
+        try:
+            client.unload()
+        except Exception:
+            pass
+        client.close()
+
+    threading.Thread(target=unload, name="al-llm-release", daemon=True).start()
+
+
+def warm():
+    try:
+        get_client().warm()
+    except Exception as e:
+        print(f"[AL] LLM warm-up failed: {e}")
+
+
+def respond(text, on_sentence=None, generation=None, history=None):
     """
-    Placeholder for LLM integration.
+    Answer free-form text, from the answer cache when the same (or a
+    near-identical) question was answered before, else with the local
+    LLM. Falls back to a canned reply when Ollama (or requests) is not
+    available.
+
+    The cache only serves questions that stand on their own: a
+    follow-up ("how old is he") depends on the history it continues.
     """
-    return (
-        "I can answer questions, control apps, or learn commands. "
-        "LLM conversation is not enabled yet."
-    )
+    cache = get_cache()
+    if history is None:
+        try:
+            history = get_client().history
+        except Exception:
+            history = None
+    standalone = not history or al_llmcache.standalone(text)
+
+    if standalone:
+        answer, tier = cache.get(text)
+        if answer is not None:
+            print(f"[AL] answer from cache ({tier})")
+            if on_sentence:
+                splitter = SentenceSplitter()
+                for sentence in splitter.feed(answer + " ") + [splitter.flush()]:
+                    if sentence and not (generation and generation.cancelled):
+                        on_sentence(sentence)
+            if history is not None and not (generation and generation.cancelled):
+                history.append({"role": "user", "content": text})
+                history.append({"role": "assistant", "content": answer})
+            return answer
+
+    try:
+        generation = generation or Generation()
+        answer = get_client().respond(text, on_sentence, generation, history)
+    except Exception as e:
+        print(f"[AL] LLM unavailable: {e}")
+        if on_sentence and not (generation and generation.cancelled):
+            on_sentence(FALLBACK)
+        return FALLBACK
+
+    if standalone and not generation.cancelled:
+        cache.put(text, answer)
+        save_cache()    # now: a killed daemon never runs exit handlers
+    return answer
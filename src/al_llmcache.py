@@ -0,0 +1,302 @@
+# al_llmcache.py
+#
+# Answer cache in front of the LLM. Two tiers:
+#
+#   exact     - dict lookup on the normalized question
+#   semantic  - cosine search over compact hashed embeddings (word and
+#               character-trigram features), vectorized with NumPy when
+#               it is installed
+#
+# Entries expire after a TTL, the store is bounded with LRU eviction and
+# it is persisted as JSON so answers survive daemon restarts.
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+np = None  # numpy, imported by the first ResponseCache
+
+
+def _load_numpy():
+    # numpy costs ~40 ms to import; keep it off the assistant's startup path
+    global np
+    if np is None:
+        try:
+            import numpy  # optional dependency
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+CACHE_PATH = Path.home() / ".cache/al/llm_cache.json"
+
+EMBED_DIM = 512
+MAX_ENTRIES = 1024
+TTL_SECONDS = 7 * 24 * 3600
+THRESHOLD = 0.85
+MIN_SEMANTIC_WORDS = 3   # shorter questions are usually context-dependent follow-ups
+W_WORD = 1.0
+W_GRAM = 0.35
+W_STOP = 0.15
+
+# answers to these depend on when they are asked, never cache them
+VOLATILE = {
+    "time", "today", "tonight", "tomorrow", "yesterday", "now", "current",
+    "currently", "latest", "news", "weather", "date", "day", "week", "score",
+}
+
+_DROP = re.compile(r"[^\w\s]")
+_FILLER = {"please", "hey", "al", "um", "uh", "so", "well", "ok", "okay", "again"}
+_POLITE = re.compile(r"^(?:(?:can|could|would) you |do you know |)(?:tell me |say )")
+_CONTRACTIONS = {"what's": "what is", "who's": "who is", "where's": "where is",
+                 "how's": "how is", "it's": "it is", "what're": "what are"}
+
+# function words carry little meaning: low weight, no trigrams
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "of", "to", "in", "on", "for", "do",
+    "does", "did", "i", "me", "my", "you", "it", "what", "who", "how", "when",
+    "where", "which", "why", "can", "could", "and", "or", "many", "much",
+}
+
+
+# a question with one of these leans on the conversation before it
+# ("how old is he", "and in france?"): its answer is not reusable
+CONTEXT_WORDS = {
+    "he", "she", "it", "they", "him", "her", "them", "his", "hers", "its",
+    "their", "theirs", "this", "that", "these", "those", "there", "then",
+    "same", "else",
+}
+CONTINUATIONS = ("and", "also", "but", "or", "so", "what about", "how about", "why not")
+
+
+def standalone(question):
+    """True if the question can be understood without the conversation."""
+    text = " ".join(_DROP.sub(" ", question.lower().replace("’", "'")).split())
+    if not text or text.startswith(tuple(c + " " for c in CONTINUATIONS)) or text in CONTINUATIONS:
+        return False
+    words = [w.split("'")[0] for w in text.split()]
+    return len(words) >= 2 and not CONTEXT_WORDS.intersection(words)
+
+
+def normalize(text):
+    words = text.lower().replace("’", "'").split()
+    text = " ".join(_CONTRACTIONS.get(w, w) for w in words)
+    words = [w for w in _DROP.sub(" ", text).split() if w not in _FILLER]
+    return _POLITE.sub("", " ".join(words))
+
+
+def cacheable(key):
+    return bool(key) and not VOLATILE.intersection(key.split())
+
+
+def _bucket(feature):
+    h = zlib.crc32(feature.encode())
+    return h % EMBED_DIM, (1.0 if h & 0x80000000 else -1.0)
+
+
+def embed(key):
+    """Feature-hashed bag of words and character trigrams, L2-normalized."""
+    vec = [0.0] * EMBED_DIM
+    for word in key.split():
+        i, sign = _bucket(word)
+        if word in STOPWORDS:
+            vec[i] += sign * W_STOP
+            continue
+        vec[i] += sign * W_WORD
+        padded = f" {word} "
+        for j in range(len(padded) - 2):
+            i, sign = _bucket(padded[j:j + 3])
+            vec[i] += sign * W_GRAM
+    norm = sum(x * x for x in vec) ** 0.5 or 1.0
+    return [x / norm for x in vec]
+
+
+def _numbers(key):
+    return [w for w in key.split() if w.isdigit()]
+
+
+class _Entry:
+    __slots__ = ("key", "answer", "created", "slot")
+
+    def __init__(self, key, answer, created, slot):
+        self.key = key
+        self.answer = answer
+        self.created = created
+        self.slot = slot
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS,
+                 threshold=THRESHOLD):
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        _load_numpy()
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> _Entry, least recently used first
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._owners = [None] * max_entries  # slot -> key
+        if np is not None:
+            self._vectors = np.zeros((max_entries, EMBED_DIM), dtype=np.float32)
+        else:
+            self._vectors = [None] * max_entries
+        self._dirty = False
+        self._changes = 0               # puts so far; a save clears _dirty for those
+        self._save_lock = threading.Lock()   # the last snapshot taken is the last written
+
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    # -------------------------
+    # Store
+    # -------------------------
+
+    def _expired(self, entry, now):
+        return self.ttl and now - entry.created > self.ttl
+
+    def _evict(self, key):
+        entry = self._entries.pop(key)
+        self._owners[entry.slot] = None
+        if np is not None:
+            self._vectors[entry.slot] = 0.0
+        else:
+            self._vectors[entry.slot] = None
+        self._free.append(entry.slot)
+
+    def _insert(self, key, answer, created):
+        if key in self._entries:
+            self._evict(key)
+        if not self._free:
+            self._evict(next(iter(self._entries)))
+        slot = self._free.pop()
+        self._entries[key] = _Entry(key, answer, created, slot)
+        self._owners[slot] = key
+        self._vectors[slot] = embed(key)
+
+    def put(self, question, answer):
+        key = normalize(question)
+        if not answer or not cacheable(key):
+            return
+        with self._lock:
+            self._insert(key, answer, time.time())
+            self._dirty = True
+            self._changes += 1
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+
+    def get(self, question):
+        """(answer, tier) for a cached question, else (None, None)."""
+        key = normalize(question)
+        if not cacheable(key):
+            return None, None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._evict(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits["exact"] += 1
+                return entry.answer, "exact"
+
+            if len(key.split()) >= MIN_SEMANTIC_WORDS and self._entries:
+                entry = self._nearest(key, now)
+                if entry is not None:
+                    self._entries.move_to_end(entry.key)
+                    self.hits["semantic"] += 1
+                    return entry.answer, "semantic"
+
+            self.misses += 1
+            return None, None
+
+    def _nearest(self, key, now):
+        query = embed(key)
+        numbers = _numbers(key)  # "5 miles" must never answer "12 miles"
+        if np is not None:
+            scores = self._vectors @ np.asarray(query, dtype=np.float32)
+        else:
+            scores = [
+                sum(a * b for a, b in zip(vec, query)) if vec is not None else 0.0
+                for vec in self._vectors
+            ]
+
+        # empty slots are zero vectors and score 0, below any threshold
+        while True:
+            if np is not None:
+                slot = int(np.argmax(scores))
+            else:
+                slot = max(range(len(scores)), key=scores.__getitem__)
+            if scores[slot] < self.threshold:
+                return None
+            owner = self._owners[slot]
+            if owner is None:
+                return None
+            entry = self._entries[owner]
+            if self._expired(entry, now):
+                self._evict(entry.key)
+            elif _numbers(entry.key) == numbers:
+                return entry
+            scores[slot] = -1.0
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+
+    def load(self):
+        if self.path is None or not self.path.exists():
+            return self
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            print(f"[AL] ignoring unreadable answer cache: {e}")
+            return self
+        now = time.time()
+        with self._lock:
+            for key, answer, created in data.get("entries", [])[-self.max_entries:]:
+                if not (self.ttl and now - created > self.ttl):
+                    self._insert(key, answer, created)
+        return self
+
+    def save(self):
+        """
+        Write the entries atomically. Session threads may save at once:
+        each writes its own temp file, and the cache stays dirty until
+        a write has replaced the file.
+        """
+        if self.path is None or not self._dirty:
+            return
+        with self._save_lock:
+            with self._lock:
+                entries = [[e.key, e.answer, e.created] for e in self._entries.values()]
+                changes = self._changes
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=self.path.parent, prefix=self.path.name,
+                                             suffix=".tmp", delete=False) as f:
+                try:
+                    json.dump({"entries": entries}, f)
+                except BaseException:
+                    os.unlink(f.name)
+                    raise
+            try:
+                os.replace(f.name, self.path)
+            except OSError:
+                os.unlink(f.name)
+                raise
+            with self._lock:
+                if self._changes == changes:
+                    self._dirty = False
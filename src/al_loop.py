@@ -0,0 +1,125 @@
+# al_loop.py
+#
+# Small selectors-based event loop for the assistant's main thread. It
+# multiplexes readable file objects (stdin, control sockets), timers and
+# callbacks posted from other threads (speech recognizer, wake service,
+# action executor), so nothing has to busy-wait or block on input().
+
+import heapq
+import itertools
+import os
+import selectors
+import threading
+import time
+
+
+class Timer:
+    __slots__ = ("when", "fn", "args", "cancelled")
+
+    def __init__(self, when, fn, args):
+        self.when = when
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class EventLoop:
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._timers = []           # heap of (when, seq, Timer)
+        self._seq = itertools.count()
+        self._posted = []
+        self._posted_lock = threading.Lock()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self.running = False
+
+    # -------------------------
+    # Sources
+    # -------------------------
+
+    def add_reader(self, fileobj, callback, *args):
+        """callback(*args) whenever fileobj is readable."""
+        self._selector.register(fileobj, selectors.EVENT_READ, (callback, args))
+
+    def remove_reader(self, fileobj):
+        try:
+            self._selector.unregister(fileobj)
+        except (KeyError, ValueError):
+            pass
+
+    def call_later(self, delay, fn, *args):
+        timer = Timer(time.monotonic() + delay, fn, args)
+        heapq.heappush(self._timers, (timer.when, next(self._seq), timer))
+        return timer
+
+    def call_soon(self, fn, *args):
+        return self.call_later(0, fn, *args)
+
+    def call_soon_threadsafe(self, fn, *args):
+        """Run fn(*args) on the loop thread; safe to call from any thread."""
+        with self._posted_lock:
+            self._posted.append((fn, args))
+        try:
+            os.write(self._wake_w, b"x")
+        except BlockingIOError:
+            pass  # a wakeup is already pending
+
+    # -------------------------
+    # Running
+    # -------------------------
+
+    def _run_callback(self, fn, args):
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"[AL] {getattr(fn, '__name__', 'callback')} failed: {e}")
+
+    def _next_timeout(self):
+        while self._timers and self._timers[0][2].cancelled:
+            heapq.heappop(self._timers)
+        if not self._timers:
+            return None
+        return max(0.0, self._timers[0][0] - time.monotonic())
+
+    def run_once(self):
+        for key, _ in self._selector.select(self._next_timeout()):
+            if key.data is None:
+                try:
+                    while os.read(self._wake_r, 4096):
+                        pass
+                except BlockingIOError:
+                    pass
+                continue
+            callback, args = key.data
+            self._run_callback(callback, args)
+
+        with self._posted_lock:
+            posted, self._posted = self._posted, []
+        for fn, args in posted:
+            self._run_callback(fn, args)
+
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            _, _, timer = heapq.heappop(self._timers)
+            if not timer.cancelled:
+                self._run_callback(timer.fn, timer.args)
+
+    def run(self):
+        self.running = True
+        while self.running:
+            self.run_once()
+
+    def stop(self):
+        """Stop after the current iteration; safe from any thread."""
+        self.call_soon_threadsafe(setattr, self, "running", False)
+
+    def close(self):
+        self._selector.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
@@ -1,7 +1,8 @@
-import platform
 import subprocess
+import threading
+import time
 
-SYSTEM = platform.system().lower()
+from al_platform import SYSTEM
 
 
 def _osascript(script: str):
@@ -18,48 +19,126 @@ def _osascript(script: str):
 
 if SYSTEM == "darwin":
 
-    def play():
-        _osascript('tell application "Spotify" to play')
+    def _spotify(command, count=1):
+        for _ in range(count):
+            _osascript(f'tell application "Spotify" to {command}')
 
-    def pause():
-        _osascript('tell application "Spotify" to pause')
+    def play(count=1):
+        _spotify("play", count)
 
-    def play_pause():
-        _osascript('tell application "Spotify" to playpause')
+    def pause(count=1):
+        _spotify("pause", count)
 
-    def next_track():
-        _osascript('tell application "Spotify" to next track')
+    def play_pause(count=1):
+        _spotify("playpause", count)
 
-    def previous_track():
-        _osascript('tell application "Spotify" to previous track')
+    def next_track(count=1):
+        _spotify("next track", count)
+
+    def previous_track(count=1):
+        _spotify("previous track", count)
+
+    def is_ready(player="spotify"):
+        out = subprocess.run(
+            ["osascript", "-e", f'application "{player.title()}" is running'],
+            capture_output=True,
+            text=True,
+        )
+        return out.stdout.strip() == "true"
 
 
 # =========================
-# Linux – playerctl
+# Linux – MPRIS over D-Bus (playerctl fallback)
 # =========================
 
 else:
 
+    MPRIS_RETRY = 30.0  # seconds before a failed session bus is tried again
+
+    _backend = None
+    _backend_lock = threading.Lock()
+    _retry_at = 0.0
+
+    def _mpris():
+        """Shared MPRIS connection, or None when only playerctl is usable."""
+        global _backend, _retry_at
+        with _backend_lock:
+            if _backend is None and time.monotonic() >= _retry_at:
+                try:
+                    from al_mpris import MPRISBackend
+                    _backend = MPRISBackend()
+                except ImportError:
+                    _backend = False    # no jeepney: playerctl for good
+                except Exception:
+                    # no session bus yet (e.g. started before login)
+                    _retry_at = time.monotonic() + MPRIS_RETRY
+            return _backend or None
+
     def _playerctl(cmd):
-        subprocess.run(
+        return subprocess.run(
             ["playerctl", cmd],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
+        ).returncode
+
+    def _player(method, cmd, count=1):
+        backend = _mpris()
+        if backend is not None:
+            found = backend.call(method, count)
+        else:
+            found = all(_playerctl(cmd) == 0 for _ in range(count))
+        if not found:
+            raise RuntimeError("no media player is running")
+
+    def play(count=1):
+        _player("Play", "play", count)
+
+    def pause(count=1):
+        _player("Pause", "pause", count)
+
+    def stop(count=1):
+        _player("Pause", "pause", count)
+
+    def play_pause(count=1):
+        _player("PlayPause", "play-pause", count)
+
+    def next_track(count=1):
+        _player("Next", "next", count)
+
+    def previous_track(count=1):
+        _player("Previous", "previous", count)
+
+    def is_ready(player="spotify"):
+        backend = _mpris()
+        if backend is not None:
+            return backend.has_player(player)
+        out = subprocess.run(
+            ["playerctl", "-l"],
+            capture_output=True,
+            text=True,
+        )
+        return any(
+            name.split(".")[0] == player
+            for name in out.stdout.split()
         )
 
-    def play():
-        _playerctl("play")
-
-    def pause():
-        _playerctl("pause")
-    def stop():
-        _playerctl("pause")
-
-    def play_pause():
-        _playerctl("play-pause")
-
-    def next_track():
-        _playerctl("next")
 
-    def previous_track():
-        _playerctl("previous")
+def wait_until_ready(player="spotify", timeout=10.0, interval=0.1):
+    """
+    Wait until the player accepts media commands (instead of a blind sleep).
+    """
+    if SYSTEM != "darwin":
+        backend = _mpris()
+        if backend is not None:
+            return backend.wait_for_player(player, timeout)
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if is_ready(player):
+                return True
+        except OSError:
+            pass
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
@@ -0,0 +1,120 @@
+# al_mpris.py
+#
+# Media control over one persistent session-bus connection, calling
+# org.mpris.MediaPlayer2.Player directly instead of forking playerctl.
+# The player list is read once and then kept current by watching
+# NameOwnerChanged.
+#
+# Needs `jeepney` (pure Python); al_media falls back to playerctl
+# when it is missing or no session bus is reachable.
+
+import threading
+from queue import Queue
+
+from jeepney import DBusAddress, MatchRule, MessageFlag, message_bus, new_method_call
+from jeepney.io.threading import DBusRouter, Proxy, open_dbus_connection
+from jeepney.wrappers import unwrap_msg
+
+MPRIS_PREFIX = "org.mpris.MediaPlayer2."
+MPRIS_PATH = "/org/mpris/MediaPlayer2"
+PLAYER_IFACE = "org.mpris.MediaPlayer2.Player"
+CALL_TIMEOUT = 2.0
+
+
+class MPRISBackend:
+    def __init__(self, bus="SESSION"):
+        self.conn = open_dbus_connection(bus)
+        self.router = DBusRouter(self.conn)
+        self.bus = Proxy(message_bus, self.router, timeout=CALL_TIMEOUT)
+
+        self.players = []  # well-known names, in order of appearance
+        self._changed = threading.Condition()
+
+        rule = MatchRule(
+            type="signal",
+            sender=message_bus.bus_name,
+            interface=message_bus.interface,
+            member="NameOwnerChanged",
+            path=message_bus.object_path,
+        )
+        rule.add_arg_condition(0, MPRIS_PREFIX.rstrip("."), kind="namespace")
+        self._signals = Queue()
+        self._filter = self.router.filter(rule, queue=self._signals)
+        self.bus.AddMatch(rule)
+
+        (names,) = self.bus.ListNames()
+        with self._changed:
+            self.players = [n for n in names if n.startswith(MPRIS_PREFIX)]
+
+        self._watcher = threading.Thread(target=self._watch, name="al-mpris", daemon=True)
+        self._watcher.start()
+
+    # -------------------------
+    # Player tracking
+    # -------------------------
+
+    def _watch(self):
+        while True:
+            msg = self._signals.get()
+            if msg is None:
+                return
+            name, old_owner, new_owner = msg.body
+            if not name.startswith(MPRIS_PREFIX):
+                continue
+            with self._changed:
+                if new_owner and name not in self.players:
+                    self.players.append(name)
+                elif not new_owner and name in self.players:
+                    self.players.remove(name)
+                self._changed.notify_all()
+
+    def find_player(self, player=None):
+        """
+        Full bus name for `player` ("spotify"), or the first known player.
+        MPRIS instances may carry a suffix: org.mpris.MediaPlayer2.vlc.instance42
+        """
+        with self._changed:
+            players = list(self.players)
+        if player is None:
+            return players[0] if players else None
+        for name in players:
+            if name[len(MPRIS_PREFIX):].split(".")[0] == player:
+                return name
+        return None
+
+    def has_player(self, player):
+        return self.find_player(player) is not None
+
+    def wait_for_player(self, player, timeout=10.0):
+        with self._changed:
+            return self._changed.wait_for(lambda: self.has_player(player), timeout)
+
+    # -------------------------
+    # Commands
+    # -------------------------
+
+    def call(self, method, count=1, player=None):
+        """
+        Send `method` `count` times as one batch. Only the last call waits
+        for a reply; D-Bus keeps messages from one connection in order.
+        """
+        name = self.find_player(player)
+        if name is None:
+            return False
+
+        address = DBusAddress(MPRIS_PATH, bus_name=name, interface=PLAYER_IFACE)
+        for _ in range(count - 1):
+            msg = new_method_call(address, method)
+            msg.header.flags |= MessageFlag.no_reply_expected
+            self.router.send(msg)
+        reply = self.router.send_and_get_reply(
+            new_method_call(address, method), timeout=CALL_TIMEOUT
+        )
+        unwrap_msg(reply)  # raises DBusErrorResponse on failure
+        return True
+
+    def close(self):
+        self._signals.put(None)
+        self._filter.close()
+        self.router.close()
+        self.conn.close()
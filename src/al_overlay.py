@@ -1,45 +1,128 @@
 #!/usr/bin/env python3
+# al_overlay.py
+#
+# Pulsing rings shown while AL talks or listens. The rings follow the
+# TTS and microphone levels the daemon pushes over its socket ("levels");
+# the frame timer only runs while there is audio (plus a short settle)
+# and the window is mapped, so an idle overlay causes no wakeups at all.
 import gi
-import math
-import time
+import socket
 
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk, Gdk, GLib
 import cairo
 
+from al_client import SOCKET_PATH
+from al_rings import FRAME_MS, SIZE, RingAnimator, RingSprites, clear
+
+RECONNECT_SECONDS = 5
+
+
+class LevelFeed:
+    """Level updates from the daemon, delivered on the GLib main loop."""
+
+    def __init__(self, on_level, path=SOCKET_PATH):
+        self.on_level = on_level
+        self.path = path
+        self._sock = None
+        self._buffer = b""
+        self._connect()
+
+    def _connect(self):
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.path)
+            sock.sendall(b"levels\n")
+        except OSError:
+            # daemon not up yet; try again later
+            GLib.timeout_add_seconds(RECONNECT_SECONDS, self._retry)
+            return
+        sock.setblocking(False)
+        self._sock = sock
+        GLib.io_add_watch(sock.fileno(), GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR, self._readable)
+
+    def _retry(self):
+        self._connect()
+        return False
+
+    def _readable(self, fd, condition):
+        try:
+            data = self._sock.recv(4096)
+        except BlockingIOError:
+            return True
+        except OSError:
+            data = b""
+        if not data:
+            self._sock.close()
+            self._sock = None
+            self.on_level("daemon", 0.0)
+            GLib.timeout_add_seconds(RECONNECT_SECONDS, self._retry)
+            return False
+
+        self._buffer += data
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for line in lines:
+            parts = line.decode(errors="replace").split()
+            if len(parts) == 3 and parts[0] == "level":
+                self.on_level(parts[1], float(parts[2]))
+        return True
+
+
 class ALOverylay(Gtk.Window):
     def __init__(self):
         super().__init__(type=Gtk.WindowType.POPUP)
         self.set_app_paintable(True)
-        self.set_default_size(300, 300)
+        self.set_default_size(SIZE, SIZE)
         self.set_position(Gtk.WindowPosition.CENTER)
         self.connect("draw", self.on_draw)
+        self.connect("map", lambda *_: self._start())
+        self.connect("unmap", lambda *_: self._stop())
 
         screen = self.get_screen()
         visual = screen.get_rgba_visual()
         self.set_visual(visual)
 
-        self.phase = 0
-        GLib.timeout_add(30, self.animate)
+        self.rings = RingAnimator()
+        self.sprites = RingSprites(cairo)
+        self._timer = None
+        self.frames = 0
+
+        self.levels = LevelFeed(self.on_level)
+
+    # -------------------------
+    # Timer
+    # -------------------------
+
+    def on_level(self, source, level):
+        self.rings.feed(source, level)
+        if self.rings.active:
+            self._start()
+
+    def _start(self):
+        if self._timer is None and self.get_mapped() and self.rings.active:
+            self._timer = GLib.timeout_add(FRAME_MS, self.animate)
+
+    def _stop(self):
+        if self._timer is not None:
+            GLib.source_remove(self._timer)
+            self._timer = None
 
     def animate(self):
-        self.phase += 0.15
-        self.queue_draw()
-        return True
+        dirty, running = self.rings.step()
+        self.queue_draw_area(*dirty)
+        self.frames += 1
+        if not running:
+            self._timer = None  # idle: no more wakeups until audio returns
+        return running
+
+    # -------------------------
+    # Drawing
+    # -------------------------
 
     def on_draw(self, widget, cr):
-        cr.set_operator(cairo.OPERATOR_SOURCE)
-        cr.set_source_rgba(0, 0, 0, 0)
-        cr.paint()
-        cr.set_operator(cairo.OPERATOR_OVER)
-
-        cx, cy = 150, 150
-        for i in range(3):
-            radius = 40 + i * 25 + math.sin(self.phase + i) * 10
-            cr.set_line_width(4)
-            cr.set_source_rgba(0.2, 0.6, 1.0, 0.6)
-            cr.arc(cx, cy, radius, 0, 2 * math.pi)
-            cr.stroke()
+        clear(cr, cairo)
+        self.sprites.paint(cr, self.rings.radii())
+
 
 if __name__ == "__main__":
     win = ALOverylay()
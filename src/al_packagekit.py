@@ -0,0 +1,87 @@
+# al_packagekit.py
+#
+# Pending updates from PackageKit over the system bus, instead of
+# `sudo apt update`. GetUpdates answers from PackageKit's metadata
+# cache; RefreshCache(force=False) refetches only metadata older than
+# PackageKit's own cache age, and the daemon does it at low priority.
+#
+# Needs `jeepney` and a running packagekitd; al_device falls back to
+# `apt list --upgradable` (local package lists, no refetch).
+
+import time
+from queue import Empty, Queue
+
+from jeepney import DBusAddress, MatchRule, message_bus, new_method_call
+from jeepney.io.threading import DBusRouter, Proxy, open_dbus_connection
+from jeepney.low_level import HeaderFields
+from jeepney.wrappers import unwrap_msg
+
+PK_NAME = "org.freedesktop.PackageKit"
+PK_PATH = "/org/freedesktop/PackageKit"
+PK_IFACE = "org.freedesktop.PackageKit"
+TX_IFACE = "org.freedesktop.PackageKit.Transaction"
+
+FILTER_NONE = 1 << 1   # PK_FILTER_ENUM_NONE as a filter bitfield
+CALL_TIMEOUT = 5.0
+QUERY_TIMEOUT = 60.0
+REFRESH_TIMEOUT = 900.0
+
+
+class PackageKitError(RuntimeError):
+    pass
+
+
+class PackageKit:
+    def __init__(self):
+        self.conn = open_dbus_connection("SYSTEM")
+        self.router = DBusRouter(self.conn)
+        self.bus = Proxy(message_bus, self.router, timeout=CALL_TIMEOUT)
+        self.daemon = DBusAddress(PK_PATH, bus_name=PK_NAME, interface=PK_IFACE)
+
+    def _call(self, address, method, signature=None, body=()):
+        msg = new_method_call(address, method, signature, body)
+        return unwrap_msg(self.router.send_and_get_reply(msg, timeout=CALL_TIMEOUT))
+
+    def _transaction(self, method, signature, body, timeout):
+        """Run one transaction; returns the package ids it reported."""
+        (path,) = self._call(self.daemon, "CreateTransaction")
+        rule = MatchRule(type="signal", interface=TX_IFACE, path=path)
+        signals = Queue()
+        packages, error = [], None
+
+        with self.router.filter(rule, queue=signals):
+            self.bus.AddMatch(rule)
+            try:
+                self._call(DBusAddress(path, bus_name=PK_NAME, interface=TX_IFACE),
+                           method, signature, body)
+                deadline = time.monotonic() + timeout
+                while True:
+                    try:
+                        msg = signals.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except Empty:
+                        raise PackageKitError(f"{method} timed out") from None
+                    member = msg.header.fields.get(HeaderFields.member)
+                    if member == "Package":
+                        packages.append(msg.body[1])
+                    elif member == "ErrorCode":
+                        error = msg.body[1]
+                    elif member == "Finished":
+                        break
+            finally:
+                self.bus.RemoveMatch(rule)
+
+        if error:
+            raise PackageKitError(error)
+        return packages
+
+    def updates(self):
+        """Package ids with a pending update, from PackageKit's cache."""
+        return self._transaction("GetUpdates", "t", (FILTER_NONE,), QUERY_TIMEOUT)
+
+    def refresh_cache(self):
+        """Refetch stale metadata only (force=False)."""
+        self._transaction("RefreshCache", "b", (False,), REFRESH_TIMEOUT)
+
+    def close(self):
+        self.router.close()
+        self.conn.close()
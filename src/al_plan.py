@@ -0,0 +1,181 @@
+# al_plan.py
+#
+# Command planner for compound utterances. The parsed words are split
+# into steps on "and" / "then" (al_semantics.split_commands), so a
+# command is tokenized once, and each step gets the
+# set of things it acts on (an app, the media player, system settings).
+# A step depends on:
+#
+#   "then"  - every earlier step (strict ordering)
+#   "and"   - earlier steps that share one of its targets
+#
+# Independent steps run concurrently, so "open spotify and close brave"
+# takes as long as the slower of the two, not their sum.
+#
+# An utterance is only split when every step is a command and every app
+# a close names is a known app (a guessed name could close anything).
+# Anything else, like the question "what's the difference between open
+# source and close source", stays whole and goes to the LLM.
+
+from al_semantics import split_commands
+from al_tokens import from_words
+
+MEDIA_PLAYER = "Spotify"
+ALL = "*"  # target of steps that must not overlap with anything
+
+SETTINGS_INTENTS = {
+    "location_services", "turn_off", "open_settings",
+    "check_updates", "open_update_settings",
+}
+MEDIA_INTENTS = {"play", "pause", "next", "previous"}
+BARRIER_INTENTS = {"exit", "clear"}
+APP_INTENTS = {"open": ("open", "go to"), "close": ("close",)}
+
+# questions are answered, never split into commands
+QUESTION_WORDS = {
+    "what", "what's", "whats", "who", "who's", "why", "how", "when", "where",
+    "which", "is", "are", "does", "do", "can", "could", "should", "would",
+}
+
+
+class Step:
+    __slots__ = ("index", "joiner", "utt", "intent", "targets", "after")
+
+    def __init__(self, index, joiner, utt, intent):
+        self.index = index
+        self.joiner = joiner
+        self.utt = utt
+        self.intent = intent        # name of the first matching intent, or None
+        self.targets = set()
+        self.after = []            # indexes of steps this one waits for
+
+    def conflicts(self, other):
+        return bool(
+            self.targets & other.targets
+            or ALL in self.targets
+            or ALL in other.targets
+        )
+
+    def __repr__(self):
+        return f"Step({self.index}, {self.utt.text!r}, after={self.after})"
+
+
+class Plan:
+    def __init__(self, steps, answer=False):
+        self.steps = steps
+        self.answer = answer    # not a command: the whole text goes to the LLM
+
+    def __len__(self):
+        return len(self.steps)
+
+    def depth(self):
+        """Length of the longest dependency chain (1 = fully parallel)."""
+        depth = []
+        for step in self.steps:
+            depth.append(1 + max((depth[i] for i in step.after), default=0))
+        return max(depth, default=0)
+
+    def describe(self):
+        width = max(len(s.utt.text) for s in self.steps)
+        lines = [f"plan: {len(self.steps)} steps, {self.depth()} sequential"]
+        for step in self.steps:
+            targets = ", ".join(sorted(step.targets)) or "-"
+            after = f"  after {', '.join(str(i + 1) for i in step.after)}" if step.after else ""
+            text = step.utt.text + (f" x{step.utt.count}" if step.utt.count > 1 else "")
+            lines.append(f"  {step.index + 1}. {text:<{width + 4}}  [{targets}]{after}")
+        return "\n".join(lines)
+
+
+def _intent_name(registry, text):
+    matches = registry.lookup(text)
+    return matches[0].name if matches else None
+
+
+def _app_name(utt, intent):
+    for prefix in APP_INTENTS[intent]:
+        if utt.text.startswith(prefix):
+            return utt.after(prefix)
+    return ""
+
+
+def is_question(text):
+    words = text.lower().split()
+    return text.rstrip().endswith("?") or bool(words and words[0] in QUESTION_WORDS)
+
+
+def _split(utt, registry, resolve_app):
+    """
+    (joiner, Utterance, intent) per step, or None when the utterance must
+    not be split. A part that is not a command on its own ("search for
+    salt and pepper") stays with the part before. Several parts are only
+    planned when the text is not a question, every part is a command and
+    every app a close names is known (an unnamed one is the current app).
+    """
+    steps = split_commands(utt.words)
+    if len(steps) <= 1:
+        return [(None, utt, _intent_name(registry, utt.text))]
+
+    parts = []
+    for joiner, words in steps:
+        part = from_words(" ".join(words), words)
+        intent = _intent_name(registry, part.text)
+        if parts and intent is None:
+            prev_joiner, prev, _ = parts[-1]
+            words = prev.words + [joiner] + words
+            merged = from_words(" ".join(words), words)
+            parts[-1] = (prev_joiner, merged, _intent_name(registry, merged.text))
+            continue
+        parts.append((joiner, part, intent))
+
+    if len(parts) == 1:
+        return [(None, utt, parts[0][2])]
+    if is_question(utt.raw):
+        return None
+    for _, part, intent in parts:
+        if intent is None:
+            return None
+        name = _app_name(part, intent) if intent == "close" else ""
+        if name and not resolve_app(name, known=True):
+            return None
+    return parts
+
+
+def build(utt, registry, resolve_app, app=None):
+    """
+    Plan a parsed utterance. `app` is the current app context (last_app);
+    steps are walked in order so "open brave and search for x" knows the
+    search goes to Brave.
+    """
+    parts = _split(utt, registry, resolve_app)
+    if parts is None:
+        return Plan([Step(0, None, utt, None)], answer=True)
+    if len(parts) == 1:
+        return Plan([Step(0, None, parts[0][1], parts[0][2])])
+
+    steps = []
+    for index, (joiner, utt, intent) in enumerate(parts):
+        step = Step(index, joiner, utt, intent)
+
+        if intent is None:
+            step.targets = {"llm"}
+        elif intent in BARRIER_INTENTS:
+            step.targets = {ALL}
+        elif intent in MEDIA_INTENTS:
+            step.targets = {"media", MEDIA_PLAYER}
+        elif intent in SETTINGS_INTENTS:
+            step.targets = {"System Settings"}
+        elif intent == "open":
+            app = resolve_app(_app_name(utt, intent)) or app
+            step.targets = {app}
+        elif intent == "close":
+            target = resolve_app(_app_name(utt, intent)) or app
+            step.targets = {target} if target else {ALL}
+            app = None
+        elif intent in ("search", "search_again"):
+            step.targets = {app} if app else {ALL}
+
+        for earlier in steps:
+            if joiner == "then" or step.conflicts(earlier):
+                step.after.append(earlier.index)
+        steps.append(step)
+    return Plan(steps)
@@ -0,0 +1,41 @@
+# al_platform.py
+#
+# Startup helpers:
+#
+#   SYSTEM  - the platform, decided once. sys.platform is known without
+#             importing the platform module; the values match
+#             platform.system().lower().
+#   lazy()  - a backend module that is imported on first use, so the
+#             assistant reaches its prompt before media, device or app
+#             backends are loaded.
+
+import importlib
+import sys
+
+if sys.platform == "darwin":
+    SYSTEM = "darwin"
+elif sys.platform in ("win32", "cygwin"):
+    SYSTEM = "windows"
+elif sys.platform.startswith("linux"):
+    SYSTEM = "linux"
+else:
+    SYSTEM = sys.platform
+
+
+class lazy:
+    """Module stand-in that imports the real module on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            # import_module holds the import lock, so racing threads are fine
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
@@ -0,0 +1,286 @@
+# al_predict.py
+#
+# Predictive pre-warming. AppPredictor learns from the command history
+# (al_context turns) which app the next command is likely to need, from
+#
+#   prev     the intent of the command just handled
+#   context  the app in context when it was handled (turn.app)
+#   hour     the time of day, in HOUR_SLOT-hour slots
+#
+# Each feature keeps counts of the app needed next; a candidate's score
+# is the weighted blend of P(app | feature). Prewarmer runs the model on
+# its own low-priority thread after every turn and, when a prediction is
+# confident enough and the budget allows, warms the app through the
+# backend (resolve + readahead, or a background launch for apps listed
+# in the "prewarm" config section).
+
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+
+import al_config
+
+HOUR_SLOT = 3
+WEIGHTS = {"prev": 0.5, "context": 0.25, "hour": 0.25}
+MIN_SEEN = 2           # a feature value needs this many samples to vote
+
+# apps needed by intents that do not name them
+INTENT_APPS = {
+    "play": "Spotify",
+    "open_settings": "System Settings",
+    "open_update_settings": "System Settings",
+}
+# intents whose app is the one in context after the turn
+APP_INTENTS = ("open", "search", "search_again")
+# a confirmed prompt of these intents opens System Settings
+SETTINGS_PROMPTS = ("location_services", "turn_off")
+YES = ("yes", "ok", "okay", "sure")
+
+DEFAULTS = {
+    "enabled": True,
+    "min_confidence": 0.35,
+    "readahead_mb": 256,    # page cache a single warm-up may fill
+    "min_free_mb": 1024,    # launch only with this much memory available
+    "max_load": 0.75,       # skip while the 1-min load per CPU is higher
+    "cooldown": 60,         # seconds before the same app is warmed again
+    "launch": (),           # apps started in the background, not just read ahead
+    "history": 2000,        # turns to learn from at startup
+}
+
+
+def load_prewarm_settings(config=None):
+    config = config or al_config.get_config()
+    section = config.get("prewarm") or {}
+    settings = dict(DEFAULTS)
+    for key in settings:
+        if section.get(key) is not None:
+            settings[key] = section[key]
+    return settings
+
+
+def needed_app(turn, previous=None):
+    """App the command of this turn needed, or None."""
+    if turn.intent in APP_INTENTS:
+        return turn.app
+    if turn.intent in INTENT_APPS:
+        return INTENT_APPS[turn.intent]
+    if (turn.intent == "confirmation" and previous is not None
+            and previous.intent in SETTINGS_PROMPTS
+            and turn.text.strip().lower() in YES):
+        return "System Settings"
+    return None
+
+
+def _features(turn):
+    """Feature values describing the moment right after this turn."""
+    return {
+        "prev": turn.intent,
+        "context": turn.app,
+        "hour": time.localtime(turn.at).tm_hour // HOUR_SLOT,
+    }
+
+
+class AppPredictor:
+    def __init__(self, weights=WEIGHTS):
+        self.weights = dict(weights)
+        self.counts = {name: {} for name in self.weights}
+        # per stream (a daemon session, or None): conversations interleave
+        self.previous = {}
+        self.pending = {}         # features of the last turn, waiting for an outcome
+        self.predicted = {}       # app predicted for the next app-needing turn
+
+        self.predictions = 0
+        self.hits = 0
+        self.misses = 0
+        self.needed = 0
+
+    def observe(self, turn, stream=None):
+        """Learn from one turn of `stream`; returns the app it needed (or None)."""
+        app = needed_app(turn, self.previous.get(stream))
+        if app is not None:
+            self.needed += 1
+            predicted = self.predicted.pop(stream, None)
+            if predicted is not None:
+                if app == predicted:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            pending = self.pending.get(stream)
+            if pending is not None:
+                for name, value in pending.items():
+                    self.counts[name].setdefault(value, Counter())[app] += 1
+        self.previous[stream] = turn
+        self.pending[stream] = _features(turn)
+        return app
+
+    def forget(self, stream):
+        """Drop the state of a finished stream."""
+        self.previous.pop(stream, None)
+        self.pending.pop(stream, None)
+        self.predicted.pop(stream, None)
+
+    def train(self, turns, stream=None):
+        for turn in turns:
+            self.observe(turn, stream)
+        self.predictions = self.hits = self.misses = self.needed = 0
+        self.predicted.clear()
+
+    def scores(self, stream=None):
+        """{app: score in [0, 1]} for the turn after the last one observed."""
+        out = Counter()
+        pending = self.pending.get(stream)
+        if pending is None:
+            return out
+        for name, value in pending.items():
+            seen = self.counts[name].get(value)
+            total = sum(seen.values()) if seen else 0
+            if total < MIN_SEEN:
+                continue
+            for app, n in seen.items():
+                out[app] += self.weights[name] * n / total
+        return out
+
+    def predict(self, min_confidence=DEFAULTS["min_confidence"], stream=None):
+        """(app, score) for the next app-needing command of `stream`, or None."""
+        scores = self.scores(stream)
+        if not scores:
+            return None
+        app, score = scores.most_common(1)[0]
+        if score < min_confidence:
+            return None
+        if stream not in self.predicted:
+            self.predictions += 1
+        self.predicted[stream] = app
+        return app, score
+
+    def report(self):
+        return {
+            "needed": self.needed,
+            "predictions": self.predictions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / self.needed if self.needed else 0.0,
+            "precision": self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+        }
+
+
+def _load_per_cpu():
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return 0.0
+
+
+def _available_mb():
+    try:
+        import psutil  # optional dependency
+    except ImportError:
+        return None
+    return psutil.virtual_memory().available / (1 << 20)
+
+
+class Prewarmer:
+    """
+    Learns and warms on one background thread; observe() only enqueues,
+    so the request path never waits for the model or a warm-up.
+    warm(app, launch, max_bytes) is the backend's prewarm_app. Daemon
+    sessions share one Prewarmer and pass themselves as the stream.
+    """
+
+    def __init__(self, warm, history=None, predictor=None, nice=10):
+        self.warm = warm
+        self.history = history          # callable(limit) -> turns to learn from
+        self.predictor = predictor or AppPredictor()
+        self.nice = nice
+        self.settings = load_prewarm_settings()
+        self.warmed = {}                # app -> monotonic time of its last warm-up
+        self.skipped = Counter()
+        self.results = deque(maxlen=100)  # (app, launched, seconds) per warm-up
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def observe(self, turn, stream=None):
+        if not self.settings["enabled"]:
+            return
+        self._queue.put((stream, turn))
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="al-prewarm",
+                                                    daemon=True)
+                    self._thread.start()
+
+    def forget(self, stream):
+        if self._thread is not None:
+            self._queue.put((stream, None))
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+        except (AttributeError, OSError):
+            pass
+        # turns queued before the history was read may be part of it;
+        # ids are per context, so they are matched by time and text
+        learned = set()
+        if self.history is not None:
+            try:
+                turns = self.history(self.settings["history"])
+                # the context the history comes from continues from its last turn
+                self.predictor.train(turns, getattr(self.history, "__self__", None))
+                learned = {(t.at, t.text) for t in turns}
+            except Exception as e:
+                print(f"[AL] could not learn from history: {e}")
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            stream, turn = item
+            if turn is None:
+                self.predictor.forget(stream)
+                continue
+            if learned and (turn.at, turn.text) in learned:
+                continue    # already part of the history learned above
+            self.predictor.observe(turn, stream)
+            if not self._queue.empty():
+                continue    # a newer turn is waiting; predict from that one
+            learned = None  # everything queued before the history is through
+            self.settings = load_prewarm_settings()
+            prediction = self.predictor.predict(self.settings["min_confidence"], stream)
+            if prediction is not None:
+                self._maybe_warm(prediction[0])
+
+    def _maybe_warm(self, app):
+        settings = self.settings
+        now = time.monotonic()
+        if now - self.warmed.get(app, float("-inf")) < settings["cooldown"]:
+            self.skipped["cooldown"] += 1
+            return
+        if _load_per_cpu() > settings["max_load"]:
+            self.skipped["cpu"] += 1
+            return
+        launch = app in settings["launch"]
+        if launch:
+            # unknown (no psutil) is not enough: a launch must fit the budget
+            available = _available_mb()
+            if available is None or available < settings["min_free_mb"]:
+                self.skipped["memory"] += 1
+                launch = False
+
+        self.warmed[app] = now
+        start = time.perf_counter()
+        try:
+            self.warm(app, launch, int(settings["readahead_mb"]) << 20)
+        except Exception as e:
+            print(f"[AL] pre-warming {app} failed: {e}")
+            return
+        self.results.append((app, launch, time.perf_counter() - start))
@@ -0,0 +1,189 @@
+# al_probe.py
+#
+# Background system-state prober. Slow questions about the system
+# (pending updates, location services) are answered ahead of time on a
+# low-priority thread and kept in a TTL cache, so a command reads a
+# cached Reading instead of running the check on the request path.
+#
+#   get(name)        latest Reading (possibly stale), never blocks
+#   fresh(name)      its value if younger than the probe's TTL, else None
+#   refresh(name)    run the probe now (in the background); on_done gets
+#                    the new Reading
+#   invalidate(name) mark stale, e.g. after opening the matching pane
+
+import os
+import threading
+import time
+
+UPDATES_TTL = 4 * 3600
+UPDATES_INTERVAL = 2 * 3600
+LOCATION_TTL = 600
+LOCATION_INTERVAL = 300
+NICE = 10
+
+
+class Reading:
+    __slots__ = ("value", "at", "error")
+
+    def __init__(self, value, at, error=None):
+        self.value = value
+        self.at = at
+        self.error = error
+
+    @property
+    def age(self):
+        return time.monotonic() - self.at
+
+    def __repr__(self):
+        return f"Reading({self.value!r}, age={self.age:.0f}s, error={self.error!r})"
+
+
+class _Probe:
+    __slots__ = ("name", "fn", "ttl", "interval", "reading", "due", "waiters", "running")
+
+    def __init__(self, name, fn, ttl, interval):
+        self.name = name
+        self.fn = fn
+        self.ttl = ttl
+        self.interval = interval
+        self.reading = None
+        self.due = 0.0           # monotonic time of the next run
+        self.waiters = []        # on_done callbacks for the next run
+        self.running = None      # on_done callbacks of the run in progress
+
+
+class SystemProber:
+    def __init__(self, nice=NICE):
+        self.nice = nice
+        self._probes = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def add(self, name, fn, ttl, interval):
+        with self._cond:
+            self._probes[name] = _Probe(name, fn, ttl, interval)
+            self._cond.notify()
+
+    # -------------------------
+    # Reads
+    # -------------------------
+
+    def get(self, name):
+        probe = self._probes.get(name)
+        return probe.reading if probe is not None else None
+
+    def fresh(self, name):
+        probe = self._probes.get(name)
+        reading = probe.reading if probe is not None else None
+        if reading is None or reading.error is not None or reading.age > probe.ttl:
+            return None
+        return reading.value
+
+    # -------------------------
+    # Scheduling
+    # -------------------------
+
+    def refresh(self, name, on_done=None):
+        """Run the probe as soon as the prober is free."""
+        with self._cond:
+            probe = self._probes[name]
+            probe.due = 0.0
+            if on_done is not None:
+                probe.waiters.append(on_done)
+            self._cond.notify()
+        self.start()
+
+    def refresh_now(self, name, timeout=None):
+        """
+        Wait for a new Reading (None on timeout). A run already in
+        progress counts: its result is as new as a run started now.
+        """
+        done = threading.Event()
+        result = []
+        on_done = lambda reading: (result.append(reading), done.set())
+        with self._cond:
+            running = self._probes[name].running
+            if running is not None:
+                running.append(on_done)
+        if running is None:
+            self.refresh(name, on_done)
+        done.wait(timeout)
+        return result[0] if result else None
+
+    def invalidate(self, name):
+        probe = self._probes.get(name)
+        if probe is not None and probe.reading is not None:
+            probe.reading = Reading(probe.reading.value, float("-inf"), probe.reading.error)
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="al-probe", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+            self._cond.notify()
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def _run(self):
+        try:
+            # Linux nice values are per thread; the probes' own commands
+            # additionally run under nice/ionice
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+        except (AttributeError, OSError):
+            pass
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    now = time.monotonic()
+                    due = [p for p in self._probes.values() if p.due <= now]
+                    if due:
+                        probe = min(due, key=lambda p: p.due)
+                        probe.due = now + probe.interval
+                        probe.running, probe.waiters = probe.waiters, []
+                        break
+                    next_due = min((p.due for p in self._probes.values()), default=None)
+                    self._cond.wait(None if next_due is None else next_due - now)
+
+            try:
+                reading = Reading(probe.fn(), time.monotonic())
+            except Exception as e:
+                previous = probe.reading
+                reading = Reading(previous.value if previous else None, time.monotonic(), e)
+            with self._cond:
+                probe.reading = reading
+                waiters, probe.running = probe.running, None
+            for on_done in waiters:
+                try:
+                    on_done(reading)
+                except Exception as e:
+                    print(f"[AL] probe listener failed: {e}")
+
+
+_prober = None
+_prober_lock = threading.Lock()
+
+
+def get_prober():
+    """Prober with the standard system probes; started on first use."""
+    global _prober
+    with _prober_lock:
+        if _prober is None:
+            import al_device
+
+            _prober = SystemProber()
+            _prober.add("updates", al_device.check_for_updates, UPDATES_TTL, UPDATES_INTERVAL)
+            _prober.add("location", al_device.location_services_state,
+                        LOCATION_TTL, LOCATION_INTERVAL)
+            _prober.start()
+        return _prober
@@ -0,0 +1,279 @@
+# al_procs.py
+#
+# In-process process table for close_app. Processes are indexed by
+# executable name, so closing an app is a dict lookup that signals only
+# the matching PIDs (no `pkill -f` scan of every command line). Apps
+# installed in a directory of their own (/opt/google/chrome) also match
+# by executable path, since their launcher script rarely shares a name
+# with the process (google-chrome -> chrome). Refreshes are incremental:
+# only PIDs that appeared since the last refresh are inspected.
+#
+# Apps started through an interpreter or wrapper (python3 script.py,
+# env VAR=1 app, flatpak run org.app.Id) are keyed by the script, the
+# wrapped program or the flatpak app id, never by the launcher itself:
+# `python3` would name every Python process of the user, AL included.
+
+import os
+import re
+import shutil
+import threading
+
+import psutil
+
+TERM_TIMEOUT = 3.0
+COMM_LEN = 15  # kernel truncates process names to 15 chars
+
+# launcher binary -> names of the processes it starts
+KNOWN_PROCESSES = {
+    "google-chrome": ("chrome",),
+    "google-chrome-stable": ("chrome",),
+    "google-chrome-beta": ("chrome",),
+    "chromium-browser": ("chromium",),
+    "brave-browser": ("brave",),
+    "brave-browser-stable": ("brave",),
+    "microsoft-edge": ("msedge",),
+    "microsoft-edge-stable": ("msedge",),
+    "firefox-esr": ("firefox",),
+    "libreoffice": ("soffice.bin",),
+    "soffice": ("soffice.bin",),
+}
+
+# launchers that exec the command following their own options
+WRAPPERS = {"env", "nohup", "setsid", "gamemoderun", "prime-run", "primusrun", "optirun"}
+# interpreters whose program is the first argument that is not an option
+INTERPRETER = re.compile(
+    r"(python|pypy|perl|ruby|node|nodejs|java|gjs|lua|php|wish|tclsh"
+    r"|sh|bash|dash|zsh|ksh|fish)[\d.]*$"
+)
+FLATPAK_SCOPE = re.compile(r"app-flatpak-([A-Za-z0-9_.-]+?)-\d+\.scope")
+
+
+def _program(argv):
+    """
+    What a command line runs, past any wrapper or interpreter:
+    ("exec", path), ("script", path or module), ("flatpak", app id),
+    or None when it cannot tell (`sh -c ...`, a bare interpreter).
+    """
+    i = 0
+    while i < len(argv):
+        base = os.path.basename(argv[i]).lower()
+        if base not in WRAPPERS:
+            break
+        i += 1
+        while i < len(argv) and (argv[i].startswith("-") or
+                                 (base == "env" and "=" in argv[i])):
+            i += 1
+    if i >= len(argv):
+        return None
+
+    base = os.path.basename(argv[i]).lower()
+    args = argv[i + 1:]
+    if base == "flatpak":
+        if not args or args[0] != "run":
+            return None
+        ids = [a for a in args[1:] if not a.startswith("-")]
+        return ("flatpak", ids[0]) if ids else None
+    if INTERPRETER.fullmatch(base):
+        for j, arg in enumerate(args):
+            if arg in ("-c", "-e", "--eval"):
+                return None     # inline code: no script to name
+            if arg in ("-m", "-jar") and j + 1 < len(args):
+                return ("script", args[j + 1])
+            if not arg.startswith("-"):
+                return ("script", arg)
+        return None
+    return ("exec", argv[i])
+
+
+def _flatpak_id(pid):
+    try:
+        with open(f"/proc/{pid}/cgroup") as f:
+            match = FLATPAK_SCOPE.search(f.read())
+    except OSError:
+        return None
+    return match.group(1).lower() if match else None
+
+
+def _keys(proc):
+    """
+    (index keys, exe path) for one process: comm, exe and argv[0]
+    basenames, the script an interpreter runs and the flatpak app id.
+    """
+    keys = set()
+    exe = None
+    try:
+        with proc.oneshot():
+            keys.add(proc.name().lower())
+            exe = proc.exe()
+            if exe:
+                keys.add(os.path.basename(exe).lower())
+            cmdline = proc.cmdline()
+            if cmdline:
+                keys.add(os.path.basename(cmdline[0]).lower())
+                program = _program(cmdline)
+                if program is not None and program[0] == "script":
+                    keys.add(os.path.basename(program[1]).lower())
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        pass
+    app_id = _flatpak_id(proc.pid)
+    if app_id:
+        keys.add(app_id)
+    keys.discard("")
+    return keys, exe or None
+
+
+def _binary_path(entry):
+    program = _program(entry.argv()) if entry is not None else None
+    if program is None or program[0] == "flatpak":
+        return None
+    word = program[1]
+    path = word if os.path.isabs(word) else shutil.which(word)
+    return os.path.realpath(path) if path else None
+
+
+def app_keys(entry):
+    """
+    Process names a resolved app is known by: its Exec binary (or the
+    script or flatpak app id behind a launcher), the binary it links to
+    and their KNOWN_PROCESSES. Never the spoken name: "notes" or "mail"
+    would name unrelated processes.
+    """
+    keys = set()
+    program = _program(entry.argv()) if entry is not None else None
+    if program is not None:
+        kind, word = program
+        keys.add(os.path.basename(word).lower())
+        if kind == "exec":
+            path = _binary_path(entry)
+            if path:
+                keys.add(os.path.basename(path).lower())
+            for key in list(keys):
+                keys.update(KNOWN_PROCESSES.get(key, ()))
+    return keys
+
+
+def app_dir(entry):
+    """
+    Install directory of an app that has one of its own (/opt/google/
+    chrome), else None: a shared bin directory says nothing about the app.
+    """
+    path = _binary_path(entry)
+    if path is None:
+        return None
+    directory = os.path.dirname(path)
+    shared = {os.path.realpath(d) for d in os.get_exec_path()}
+    shared.update(("/usr/lib", "/usr/libexec", "/usr/local/lib"))
+    if directory in shared or os.path.basename(directory) in ("", "bin", "sbin"):
+        return None     # a bin directory of a runtime (a JVM, a venv) is shared too
+    return directory
+
+
+class ProcessTable:
+    def __init__(self):
+        self.uid = os.getuid()
+        self._lock = threading.Lock()
+        self._procs = {}  # pid -> (psutil.Process, keys, exe path)
+        self._by_key = {}  # key -> set of pids
+
+    def __len__(self):
+        return len(self._procs)
+
+    # -------------------------
+    # Index maintenance
+    # -------------------------
+
+    def refresh(self):
+        """Bring the table up to date; only new PIDs are inspected."""
+        current = set(psutil.pids())
+        with self._lock:
+            known = set(self._procs)
+            for pid in known - current:
+                self._drop(pid)
+            for pid in current - known:
+                self._add(pid)
+
+    def _add(self, pid):
+        try:
+            proc = psutil.Process(pid)
+            if proc.uids().real != self.uid and self.uid != 0:
+                keys, exe = set(), None  # never signal other users' processes
+            else:
+                keys, exe = _keys(proc)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return
+        self._procs[pid] = (proc, keys, exe)
+        for key in keys:
+            self._by_key.setdefault(key, set()).add(pid)
+            if len(key) > COMM_LEN:
+                self._by_key.setdefault(key[:COMM_LEN], set()).add(pid)
+
+    def _drop(self, pid):
+        _, keys, _ = self._procs.pop(pid)
+        for key in keys:
+            for k in (key, key[:COMM_LEN]):
+                pids = self._by_key.get(k)
+                if pids is not None:
+                    pids.discard(pid)
+                    if not pids:
+                        del self._by_key[k]
+
+    # -------------------------
+    # Lookup / termination
+    # -------------------------
+
+    def find(self, keys, directory=None):
+        """Processes named by keys, or running an executable under directory."""
+        self.refresh()
+        pids = set()
+        with self._lock:
+            for key in keys:
+                pids |= self._by_key.get(key, set())
+                pids |= self._by_key.get(key[:COMM_LEN], set())
+            if directory:
+                prefix = directory.rstrip("/") + "/"
+                pids |= {pid for pid, (_, _, exe) in self._procs.items()
+                         if exe and exe.startswith(prefix)}
+            procs = [self._procs[pid][0] for pid in pids if pid in self._procs]
+
+        alive = []
+        for proc in procs:
+            # guard against PID reuse since the process was indexed
+            try:
+                if proc.is_running() and proc.pid != os.getpid():
+                    alive.append(proc)
+            except psutil.Error:
+                pass
+        return alive
+
+    def terminate(self, keys, directory=None, timeout=TERM_TIMEOUT):
+        """
+        SIGTERM every process matching keys (or directory), then SIGKILL
+        whatever is still alive after timeout. Returns the number of
+        processes signalled.
+        """
+        procs = self.find(keys, directory)
+        for proc in procs:
+            try:
+                proc.terminate()
+            except psutil.Error:
+                pass
+
+        _, alive = psutil.wait_procs(procs, timeout=timeout)
+        for proc in alive:
+            try:
+                proc.kill()
+            except psutil.Error:
+                pass
+        return len(procs)
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_table():
+    global _table
+    with _table_lock:
+        if _table is None:
+            _table = ProcessTable()
+        return _table
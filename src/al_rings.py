@@ -0,0 +1,117 @@
+# al_rings.py
+#
+# Toolkit-independent half of the overlay animation:
+#
+#   RingAnimator - ring geometry driven by audio levels. step() advances
+#                  one frame and returns the dirty rectangle and whether
+#                  another frame is needed; once audio stops and the rings
+#                  have settled it returns False and the timer can stop.
+#   RingSprites  - every ring radius is rendered once into a small cairo
+#                  surface; frames are composed by painting cached sprites
+#                  instead of stroking arcs.
+
+import math
+
+SIZE = 300
+CENTER = SIZE // 2
+RINGS = 3
+BASE_RADIUS = 40
+SPACING = 25
+SWING = 10
+LINE_WIDTH = 4
+COLOR = (0.2, 0.6, 1.0, 0.6)
+
+FRAME_MS = 30
+PHASE_STEP = 0.15
+ATTACK = 0.5          # how fast the amplitude follows a louder level
+RELEASE = 0.12        # ... and falls back when it gets quieter
+MIN_AMPLITUDE = 0.01  # below this the rings are at rest
+PAD = LINE_WIDTH      # antialiasing margin around a ring
+
+
+class RingAnimator:
+    def __init__(self):
+        self.phase = 0.0
+        self.amplitude = 0.0
+        self.levels = {}   # source -> latest level
+
+    @property
+    def target(self):
+        return max(self.levels.values(), default=0.0)
+
+    def feed(self, source, level):
+        self.levels[source] = level
+
+    @property
+    def active(self):
+        return self.target > 0 or self.amplitude > MIN_AMPLITUDE
+
+    def radii(self):
+        return [
+            BASE_RADIUS + i * SPACING + math.sin(self.phase + i) * SWING * self.amplitude
+            for i in range(RINGS)
+        ]
+
+    def bounds(self):
+        """(x, y, w, h) covering every ring as currently drawn."""
+        r = int(math.ceil(max(self.radii()))) + PAD
+        return CENTER - r, CENTER - r, 2 * r, 2 * r
+
+    def step(self):
+        """Advance one frame: (dirty rectangle, keep animating)."""
+        before = self.bounds()
+
+        target = self.target
+        rate = ATTACK if target > self.amplitude else RELEASE
+        self.amplitude += (target - self.amplitude) * rate
+        if target == 0 and self.amplitude < MIN_AMPLITUDE:
+            self.amplitude = 0.0
+        self.phase += PHASE_STEP
+
+        after = self.bounds()
+        # concentric rings: the larger box contains the smaller one
+        dirty = before if before[2] >= after[2] else after
+        return dirty, self.active
+
+
+class RingSprites:
+    """Cache of pre-rendered rings, keyed by radius in whole pixels."""
+
+    def __init__(self, cairo):
+        self.cairo = cairo
+        self._cache = {}
+
+    def __len__(self):
+        return len(self._cache)
+
+    def _render(self, radius):
+        size = 2 * (radius + PAD)
+        surface = self.cairo.ImageSurface(self.cairo.FORMAT_ARGB32, size, size)
+        cr = self.cairo.Context(surface)
+        cr.set_line_width(LINE_WIDTH)
+        cr.set_source_rgba(*COLOR)
+        cr.arc(size / 2, size / 2, radius, 0, 2 * math.pi)
+        cr.stroke()
+        surface.flush()
+        return surface
+
+    def get(self, radius):
+        radius = int(round(radius))
+        surface = self._cache.get(radius)
+        if surface is None:
+            surface = self._cache[radius] = self._render(radius)
+        return surface, radius + PAD
+
+    def paint(self, cr, radii):
+        for radius in radii:
+            surface, offset = self.get(radius)
+            cr.set_source_surface(surface, CENTER - offset, CENTER - offset)
+            cr.paint()
+
+
+def clear(cr, cairo):
+    """Clear to transparent; GTK has already clipped to the dirty area."""
+    cr.set_operator(cairo.OPERATOR_SOURCE)
+    cr.set_source_rgba(0, 0, 0, 0)
+    cr.paint()
+    cr.set_operator(cairo.OPERATOR_OVER)
@@ -1,9 +1,28 @@
-import re
+JOINERS = ("and", "then")
 
 
-def split_commands(text: str):
-    parts = re.split(r"\band\b|\bthen\b", text)
-    return [p.strip() for p in parts if p.strip()]
+def split_commands(words):
+    """
+    Split parsed words on "and" / "then": [(joiner, part words)] with
+    joiner None for the first part, else "and" or "then" ("and then"
+    counts as "then").
+    """
+    steps = []
+    joiner = None
+    part = []
+    for word in words:
+        if word not in JOINERS:
+            part.append(word)
+            continue
+        if part:
+            steps.append((joiner if steps else None, part))
+            part = []
+            joiner = word
+        elif joiner is not None and word == "then":
+            joiner = "then"     # "and then"
+    if part:
+        steps.append((joiner if steps else None, part))
+    return steps
 
 
 def normalize(text: str):
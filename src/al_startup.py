@@ -0,0 +1,74 @@
+# al_startup.py
+#
+# Startup profiler behind `al.py --profile-startup`. AL is started in a
+# child interpreter with -X importtime; the report lists the slowest
+# imports and the time from exec to the first prompt. al_bench.py startup
+# repeats this and exits 1 when the prompt takes longer than BUDGET_MS.
+# tests/test_startup.py holds AL's own share of the startup (the time
+# past a bare interpreter's) to BUDGET_MS and checks which modules the
+# prompt loads.
+
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BUDGET_MS = 150
+READY_MARK = "al-startup-ready"
+
+
+def probe(script="al.py", args=("--startup-probe",), env=None):
+    """
+    Start one child and return (imports, ready_ms). imports is a list of
+    (name, self_ms, cumulative_ms, depth) in import order.
+    """
+    start = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(HERE, script), *args],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        text=True, check=False, env=env,
+    )
+    imports, ready = [], None
+    for line in proc.stderr.splitlines():
+        if line.startswith(READY_MARK):
+            ready = (float(line.split()[1]) - start) * 1e3
+        elif line.startswith("import time:"):
+            own, total, name = line[len("import time:"):].split("|")
+            if not own.strip().isdigit():
+                continue  # column header
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            imports.append((name.strip(), int(own) / 1e3, int(total) / 1e3, depth))
+    if ready is None:
+        raise RuntimeError(f"{script} did not reach its prompt:\n{proc.stderr[-2000:]}")
+    return imports, ready
+
+
+def baseline_ms(env=None):
+    """Exec to exit of a bare interpreter, started the way probe() starts AL."""
+    start = time.time()
+    subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], stdin=subprocess.DEVNULL,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False, env=env)
+    return (time.time() - start) * 1e3
+
+
+def report(imports, ready_ms, top=15):
+    own = [i for i in imports if i[0].startswith("al")]
+    top_level = sorted((i for i in imports if i[3] == 0), key=lambda i: -i[2])
+    total = sum(i[2] for i in imports if i[3] == 0)
+
+    print(f"{'module':<32} {'self ms':>8} {'total ms':>9}")
+    for name, self_ms, cumulative, _ in top_level[:top]:
+        print(f"{name:<32} {self_ms:8.2f} {cumulative:9.2f}")
+    print()
+    print("AL modules")
+    for name, self_ms, cumulative, depth in own:
+        print(f"{'  ' * depth + name:<32} {self_ms:8.2f} {cumulative:9.2f}")
+    print()
+    print(f"imports                          {total:8.1f} ms")
+    print(f"exec to first prompt             {ready_ms:8.1f} ms   (budget {BUDGET_MS} ms)")
+
+
+def mark_ready():
+    """Called by the child at its first prompt."""
+    print(f"{READY_MARK} {time.time():.6f}", file=sys.stderr, flush=True)
@@ -0,0 +1,348 @@
+# al_stt.py
+#
+# Streaming speech-to-text front end:
+#
+#   source (mic / WAV) -> ring buffer -> VAD endpointer -> recognizer
+#
+# Frames are 30 ms of 16 kHz mono 16-bit PCM. The recognizer is fed while
+# the user is still talking, so partial hypotheses arrive early and the
+# final text is ready almost as soon as the endpoint is detected.
+#
+# Optional dependencies: pyaudio (microphone), vosk (offline recognizer),
+# webrtcvad (better VAD; an energy VAD is used otherwise).
+
+import json
+import math
+import threading
+import time
+import wave
+from array import array
+from collections import deque
+
+import al_levels
+import al_trace
+
+RATE = 16000
+FRAME_MS = 30
+FRAME_BYTES = RATE * FRAME_MS // 1000 * 2
+
+DEFAULT_MODEL = "~/.local/share/vosk/vosk-model-small-en-us-0.15"
+
+PRE_ROLL_MS = 300      # audio kept from before the speech onset
+START_MS = 90          # voiced audio needed to open an utterance
+END_MS = 450           # silence needed to close it
+
+
+# -------------------------
+# Sources
+# -------------------------
+
+class RingBuffer:
+    """Bounded frame buffer between the capture thread and the pipeline."""
+
+    def __init__(self, max_frames=200):
+        self._frames = deque(maxlen=max_frames)
+        self._ready = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, frame):
+        with self._ready:
+            if len(self._frames) == self._frames.maxlen:
+                self.dropped += 1  # oldest frame is overwritten
+            self._frames.append((frame, time.perf_counter()))
+            self._ready.notify()
+
+    def get(self, timeout=None):
+        """Return (frame, capture time), or None once closed and drained."""
+        with self._ready:
+            while not self._frames:
+                if self.closed:
+                    return None
+                if not self._ready.wait(timeout):
+                    return None
+            return self._frames.popleft()
+
+    def close(self):
+        with self._ready:
+            self.closed = True
+            self._ready.notify_all()
+
+
+class MicrophoneSource:
+    def __init__(self, rate=RATE, frame_ms=FRAME_MS, device=None):
+        import pyaudio  # optional dependency
+
+        self.rate = rate
+        self.frames = RingBuffer()
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=rate,
+            input=True,
+            input_device_index=device,
+            frames_per_buffer=rate * frame_ms // 1000,
+            stream_callback=self._callback,
+        )
+
+    def _callback(self, data, frame_count, time_info, status):
+        import pyaudio
+        self.frames.put(data)
+        return None, pyaudio.paContinue
+
+    def close(self):
+        self._stream.stop_stream()
+        self._stream.close()
+        self._audio.terminate()
+        self.frames.close()
+
+
+class WavSource:
+    """
+    Stream a 16 kHz mono 16-bit WAV file as if it were the microphone.
+    With realtime=True frames are paced at the speaking rate.
+    """
+
+    def __init__(self, path, realtime=False):
+        self.rate = RATE
+        self.frames = RingBuffer(max_frames=1 << 20)
+        self._wav = wave.open(str(path), "rb")
+        if (self._wav.getframerate(), self._wav.getnchannels(), self._wav.getsampwidth()) != (RATE, 1, 2):
+            raise ValueError(f"{path}: expected {RATE} Hz mono 16-bit PCM")
+        self._realtime = realtime
+        self._thread = threading.Thread(target=self._feed, name="al-wav", daemon=True)
+        self._thread.start()
+
+    def _feed(self):
+        step = FRAME_MS / 1000
+        next_at = time.perf_counter()
+        while True:
+            frame = self._wav.readframes(FRAME_BYTES // 2)
+            if len(frame) < FRAME_BYTES:
+                break
+            if self._realtime:
+                next_at += step
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            self.frames.put(frame)
+        self.frames.close()
+
+    def close(self):
+        self.frames.close()
+
+
+# -------------------------
+# Voice activity detection
+# -------------------------
+
+class EnergyVAD:
+    """RMS detector with an adaptive noise floor."""
+
+    def __init__(self, min_rms=300.0, ratio=3.0):
+        self.min_rms = min_rms
+        self.ratio = ratio
+        self.noise = min_rms / ratio
+
+    def is_speech(self, frame):
+        samples = array("h", frame)
+        rms = math.sqrt(sum(s * s for s in samples) / (len(samples) or 1))
+        voiced = rms > max(self.min_rms, self.noise * self.ratio)
+        if not voiced:
+            self.noise = 0.95 * self.noise + 0.05 * rms
+        return voiced
+
+
+class WebRTCVAD:
+    def __init__(self, aggressiveness=2):
+        import webrtcvad  # optional dependency
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame):
+        return self._vad.is_speech(frame, RATE)
+
+
+def load_vad():
+    try:
+        return WebRTCVAD()
+    except ImportError:
+        return EnergyVAD()
+
+
+# -------------------------
+# Recognizers
+# -------------------------
+
+class VoskRecognizer:
+    """Incremental offline recognizer (vosk + a downloaded model)."""
+
+    def __init__(self, model_path):
+        from vosk import KaldiRecognizer, Model, SetLogLevel  # optional dependency
+
+        SetLogLevel(-1)
+        self._model = Model(model_path)
+        self._rec = KaldiRecognizer(self._model, RATE)
+
+    def accept(self, frame):
+        """Feed one frame; return the current partial hypothesis."""
+        if self._rec.AcceptWaveform(frame):
+            return json.loads(self._rec.Result()).get("text", "")
+        return json.loads(self._rec.PartialResult()).get("partial", "")
+
+    def finish(self):
+        text = json.loads(self._rec.FinalResult()).get("text", "")
+        self._rec.Reset()
+        return text
+
+
+# -------------------------
+# Pipeline
+# -------------------------
+
+class SpeechPipeline:
+    """
+    Cut the frame stream into utterances and decode them incrementally.
+    on_partial(text) fires as the hypothesis grows; on_final(text) fires
+    once per utterance at the endpoint.
+    """
+
+    def __init__(self, source, recognizer, on_final, on_partial=None, vad=None):
+        self.source = source
+        self.recognizer = recognizer
+        self.on_final = on_final
+        self.on_partial = on_partial
+        self.vad = vad or load_vad()
+
+        self.running = False
+
+        # (end of speech -> dispatch seconds) per utterance
+        self.latencies = []
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+
+    def run(self):
+        start_frames = START_MS // FRAME_MS
+        end_frames = END_MS // FRAME_MS
+        pre_roll = deque(maxlen=PRE_ROLL_MS // FRAME_MS)
+
+        in_speech = False
+        voiced_run = silent_run = 0
+        last_voiced_at = None
+        speech_started_at = None
+        partial = ""
+
+        meter = al_levels.get_meter()
+
+        self.running = True
+        cpu_start = time.process_time()
+        while self.running:
+            item = self.source.frames.get(timeout=0.5)
+            if item is None:
+                if self.source.frames.closed:
+                    break
+                continue
+            frame, captured_at = item
+            self.audio_seconds += FRAME_MS / 1000
+
+            voiced = self.vad.is_speech(frame)
+            if meter.watched:
+                meter.set("mic", al_levels.level(frame) if voiced else 0.0)
+
+            if not in_speech:
+                pre_roll.append(frame)
+                voiced_run = voiced_run + 1 if voiced else 0
+                if voiced_run < start_frames:
+                    continue
+                in_speech = True
+                speech_started_at = captured_at
+                silent_run = 0
+                frames = list(pre_roll)
+                pre_roll.clear()
+            else:
+                frames = [frame]
+
+            if voiced:
+                silent_run = 0
+                last_voiced_at = captured_at
+            else:
+                silent_run += 1
+
+            for f in frames:
+                text = self.recognizer.accept(f)
+                if text and text != partial:
+                    partial = text
+                    if self.on_partial:
+                        self.on_partial(text)
+
+            if silent_run >= end_frames:
+                final = self.recognizer.finish() or partial
+                in_speech = False
+                voiced_run = 0
+                partial = ""
+                if final:
+                    self.latencies.append(time.perf_counter() - last_voiced_at)
+                    al_trace.record("capture", speech_started_at, last_voiced_at)
+                    al_trace.record("stt", last_voiced_at)
+                    self.on_final(final)
+
+        if in_speech:
+            final = self.recognizer.finish() or partial
+            if final:
+                self.on_final(final)
+
+        meter.set("mic", 0.0)
+        self.cpu_seconds += time.process_time() - cpu_start
+
+    def stop(self):
+        self.running = False
+
+
+class SpeechInput:
+    """
+    A SpeechPipeline on its own thread that can be released and reopened:
+    stop() closes the audio stream (the recognizer model stays loaded),
+    start() opens a fresh source with open_source().
+    """
+
+    def __init__(self, open_source, recognizer, on_final, on_partial=None, on_end=None):
+        self.open_source = open_source
+        self.recognizer = recognizer
+        self.on_final = on_final
+        self.on_partial = on_partial
+        self.on_end = on_end  # the source ran out (end of a WAV file)
+        self.pipeline = None
+        self._source = None
+        self._thread = None
+        self._stopping = False
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._source = self.open_source()
+        self.pipeline = SpeechPipeline(
+            self._source, self.recognizer, self.on_final, self.on_partial
+        )
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="al-stt", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        self.pipeline.run()
+        if not self._stopping and self.on_end:
+            self.on_end()
+
+    def stop(self):
+        self._stopping = True
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
@@ -0,0 +1,38 @@
+# al_text.py
+#
+# Text helpers shared by the LLM client and the speech worker: splitting
+# streamed or complete text into sentences that can be spoken one by one.
+
+import re
+
+# end of a sentence: terminal punctuation followed by whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+MIN_SENTENCE = 12  # avoid speaking fragments like "Dr." or "1."
+
+
+class SentenceSplitter:
+    """Accumulate streamed tokens and hand out complete sentences."""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, token):
+        self._buffer += token
+        sentences = []
+        start = 0
+        for m in _SENTENCE_END.finditer(self._buffer):
+            if m.start() - start < MIN_SENTENCE:
+                continue
+            sentences.append(self._buffer[start:m.start()].strip())
+            start = m.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self):
+        rest, self._buffer = self._buffer.strip(), ""
+        return rest
+
+
+def split_sentences(text):
+    splitter = SentenceSplitter()
+    return [s for s in splitter.feed(text + " ") + [splitter.flush()] if s]
@@ -0,0 +1,182 @@
+# al_tokens.py
+#
+# Single-pass utterance parser. The raw text is cleaned and split once,
+# typo-corrected, and the repeat count is taken from the command's count
+# position; every handler reads the result instead of re-scanning
+# strings.
+
+import re
+
+_DROP = re.compile(r"[^\w\s.:/]")
+
+COMMON_CORRECTIONS = {
+    "adn": "and",
+    "searf": "search",
+    "serch": "search",
+    "apotify": "spotify",
+    "sertings": "settings",
+}
+
+# A repeat count is only taken from the count position of a command that
+# repeats, so numbers inside queries ("search for twenty one pilots")
+# stay text:
+#
+#   <count verb> N          "skip 3", "previous two", "search again 4"
+#   ... N times / once      "next three times", "search again twice"
+#
+# Anything after the count makes it part of the text again. Filler words
+# ("please") at either end are dropped before intents are matched:
+# "next please" is "next", "please pause" is "pause".
+COUNT_VERBS = ("next", "skip", "previous", "back", "pause", "stop", "again")
+COUNT_PREFIXES = (("search", "again"),)
+MULTIPLIER_WORDS = {"once": 1, "twice": 2, "thrice": 3}
+TIMES = ("times", "time")
+FILLERS = ("please",)
+
+UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+
+MAX_COUNT = 10
+
+
+class Utterance:
+    __slots__ = ("raw", "words", "tokens", "count", "_text")
+
+    def __init__(self, raw, words, tokens, count):
+        self.raw = raw
+        self.words = words        # normalized words, count still in (for the planner)
+        self.tokens = tokens      # normalized words, count removed
+        self.count = count        # repeat count, 1..MAX_COUNT
+        self._text = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = " ".join(self.tokens)
+        return self._text
+
+    def after(self, prefix):
+        """Text following a prefix the utterance is known to start with."""
+        return self.text[len(prefix):].strip()
+
+    def find(self, *words):
+        """Token index where `words` occur consecutively, or -1."""
+        tokens = self.tokens
+        first, n = words[0], len(words)
+        for i, token in enumerate(tokens):
+            if token == first and tokens[i:i + n] == list(words):
+                return i
+        return -1
+
+    def __repr__(self):
+        return f"Utterance({self.text!r}, count={self.count})"
+
+
+def _number_at(words, i):
+    """(value, tokens used) for a number starting at words[i], else (None, 0)."""
+    w = words[i]
+    if w.isdigit():
+        try:
+            return int(w), 1
+        except ValueError:  # e.g. superscript digits
+            return None, 0
+
+    if w in TENS:
+        if i + 1 < len(words) and 0 < UNITS.get(words[i + 1], 0) < 10:
+            return TENS[w] + UNITS[words[i + 1]], 2
+        return TENS[w], 1
+
+    if w in UNITS:
+        if i + 1 < len(words) and words[i + 1] == "hundred":
+            value = UNITS[w] * 100
+            j = i + 2
+            if j < len(words) and words[j] == "and":
+                j += 1
+            if j < len(words) and (words[j] in TENS or words[j] in UNITS):
+                rest, rest_used = _number_at(words, j)
+                return value + rest, j - i + rest_used
+            return value, 2
+        return UNITS[w], 1
+
+    return None, 0
+
+
+def _number_ending_at(words, end, start):
+    """(value, first index) of a number spanning words[i:end] for some i >= start."""
+    for i in range(end - 1, start - 1, -1):
+        value, used = _number_at(words, i)
+        if used and i + used == end:
+            return value, i
+    return None, end
+
+
+def _count_verb_end(words):
+    """Index right after the count verb the utterance starts with, else 0."""
+    for prefix in COUNT_PREFIXES:
+        if tuple(words[:len(prefix)]) == prefix:
+            return len(prefix)
+    if words and words[0] in COUNT_VERBS:
+        return 1
+    return 0
+
+
+def _strip_fillers(words):
+    """words without the fillers at either end (all of them if that is all)."""
+    start, end = 0, len(words)
+    while start < end and words[start] in FILLERS:
+        start += 1
+    while end > start and words[end - 1] in FILLERS:
+        end -= 1
+    return words[start:end] if start < end else words
+
+
+def _find_count(words):
+    """(count, start, end) of the count words in `words`, or None."""
+    end = len(words)
+    if not end:
+        return None
+
+    verb = _count_verb_end(words)
+    if not verb:
+        return None     # only the commands that repeat take a count
+
+    # trailing multiplier: "... twice", "... three times"
+    if words[end - 1] in MULTIPLIER_WORDS:
+        return MULTIPLIER_WORDS[words[end - 1]], end - 1, end
+    if end >= 2 and words[end - 1] in TIMES:
+        value, start = _number_ending_at(words, end - 1, max(verb, end - 5))
+        if value is not None:
+            return value, start, end
+
+    # "<count verb> N" with nothing after N
+    if verb < end:
+        value, used = _number_at(words, verb)
+        if used and verb + used == end:
+            return value, verb, end
+    return None
+
+
+def parse(raw):
+    return from_words(raw, [
+        COMMON_CORRECTIONS.get(w, w)
+        for w in _DROP.sub("", raw.lower()).split()
+    ])
+
+
+def from_words(raw, words):
+    """Utterance of words that are already normalized, e.g. one step of a parsed one."""
+    words = _strip_fillers(words)
+    found = _find_count(words)
+    if found is None:
+        return Utterance(raw, words, words, 1)
+    count, start, end = found
+    return Utterance(raw, words, words[:start] + words[end:], max(1, min(count, MAX_COUNT)))
@@ -0,0 +1,211 @@
+# al_trace.py
+#
+# Spans for the command pipeline: wake, capture, stt, normalize, dispatch,
+# action, llm, tts.synth and tts.play. A span is a (stage, start, end,
+# thread, attrs) tuple with time.perf_counter() timings, appended to a
+# bounded deque (append is atomic, so producers never take a lock).
+# Disabled tracing costs one global check per span.
+#
+#   export()        writes trace.json (Chrome trace, chrome://tracing or
+#                   Perfetto) and metrics.prom (Prometheus text format)
+#   stats()         count, p50, p95 and p99 per stage
+#
+# Tracing is switched by the "trace" config key or AL_TRACE=1.
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+RING_SIZE = 8192
+TRACE_DIR = Path.home() / ".cache/al"
+QUANTILES = (0.5, 0.95, 0.99)
+
+ENABLED = os.environ.get("AL_TRACE") == "1"
+
+_ring = deque(maxlen=RING_SIZE)
+_following = False
+
+
+def now():
+    return time.perf_counter()
+
+
+def set_enabled(enabled):
+    global ENABLED
+    ENABLED = bool(enabled) or os.environ.get("AL_TRACE") == "1"
+
+
+def follow_config(service=None):
+    """Enable tracing from the "trace" config key, now and on every reload."""
+    global _following
+    if _following:
+        return
+    _following = True
+    import al_config
+
+    service = service or al_config.get_service()
+    set_enabled(service.snapshot.get("trace"))
+    service.subscribe(lambda old, new: set_enabled(new.get("trace")))
+
+
+# -------------------------
+# Recording
+# -------------------------
+
+def record(stage, start, end=None, **attrs):
+    """Add a span measured elsewhere (start/end from now())."""
+    if ENABLED:
+        _ring.append((stage, start, now() if end is None else end,
+                      threading.get_ident(), attrs or None))
+
+
+class _Span:
+    __slots__ = ("stage", "attrs", "start")
+
+    def __init__(self, stage, attrs):
+        self.stage = stage
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _ring.append((self.stage, self.start, time.perf_counter(),
+                      threading.get_ident(), self.attrs or None))
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(stage, **attrs):
+    """with span("stt"): ...  -- a no-op while tracing is off."""
+    if not ENABLED:
+        return _NO_SPAN
+    return _Span(stage, attrs)
+
+
+def spans():
+    return list(_ring)
+
+
+def clear():
+    _ring.clear()
+
+
+# -------------------------
+# Reports
+# -------------------------
+
+def _quantile(ordered, q):
+    # nearest rank
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def stats(records=None):
+    """{stage: {"count", "sum", 0.5, 0.95, 0.99}} with durations in seconds."""
+    durations = {}
+    for stage, start, end, _, _ in (spans() if records is None else records):
+        durations.setdefault(stage, []).append(end - start)
+    out = {}
+    for stage, values in durations.items():
+        values.sort()
+        row = {"count": len(values), "sum": sum(values)}
+        for q in QUANTILES:
+            row[q] = _quantile(values, q)
+        out[stage] = row
+    return out
+
+
+def format_stats(table):
+    lines = [f"{'stage':<12} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+    for stage in sorted(table):
+        row = table[stage]
+        lines.append(f"{stage:<12} {row['count']:>6} "
+                     + " ".join(f"{row[q] * 1e3:9.2f}" for q in QUANTILES))
+    return "\n".join(lines)
+
+
+def chrome_trace(records=None):
+    pid = os.getpid()
+    events = []
+    for stage, start, end, thread, attrs in (spans() if records is None else records):
+        event = {
+            "name": stage, "cat": "al", "ph": "X", "pid": pid, "tid": thread,
+            "ts": round(start * 1e6, 1), "dur": round((end - start) * 1e6, 1),
+        }
+        if attrs:
+            event["args"] = {k: str(v) for k, v in attrs.items()}
+        events.append(event)
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def prometheus(table=None):
+    table = stats() if table is None else table
+    lines = [
+        "# HELP al_stage_seconds Time spent per AL pipeline stage.",
+        "# TYPE al_stage_seconds summary",
+    ]
+    for stage in sorted(table):
+        row = table[stage]
+        for q in QUANTILES:
+            lines.append(f'al_stage_seconds{{stage="{stage}",quantile="{q}"}} {row[q]:.6f}')
+        lines.append(f'al_stage_seconds_sum{{stage="{stage}"}} {row["sum"]:.6f}')
+        lines.append(f'al_stage_seconds_count{{stage="{stage}"}} {row["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def read_prometheus(path):
+    """Stats table back from a metrics.prom written by export()."""
+    table = {}
+    with open(path) as f:
+        for line in f:
+            if not line.startswith("al_stage_seconds"):
+                continue
+            metric, value = line.rsplit(" ", 1)
+            name, _, labels = metric.partition("{")
+            labels = dict(
+                part.split("=", 1) for part in labels.rstrip("}").split(",")
+            )
+            row = table.setdefault(labels["stage"].strip('"'), {})
+            if name.endswith("_sum"):
+                row["sum"] = float(value)
+            elif name.endswith("_count"):
+                row["count"] = int(value)
+            else:
+                row[float(labels["quantile"].strip('"'))] = float(value)
+    return table
+
+
+def _write(path, text):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def export(directory=TRACE_DIR):
+    """Write trace.json and metrics.prom; returns their paths."""
+    records = spans()
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    trace_path = directory / "trace.json"
+    metrics_path = directory / "metrics.prom"
+    _write(trace_path, json.dumps(chrome_trace(records)))
+    _write(metrics_path, prometheus(stats(records)))
+    return trace_path, metrics_path
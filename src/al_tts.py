@@ -0,0 +1,499 @@
+# al_tts.py
+#
+# Persistent speech worker. One background thread owns the voice (loaded
+# once), renders text to 16-bit mono PCM and keeps an LRU cache of the
+# rendered audio, so stock phrases ("Goodbye.", "Searching again") play
+# without being synthesized again. speak() only enqueues and returns.
+#
+# Longer text is split into sentences. The first is rendered by the
+# resident voice while the rest are rendered in parallel on a
+# SynthesisPool (worker processes with a voice each for Piper, threads
+# for espeak, which runs as a subprocess anyway). Chunks are written in
+# order to one PCMStream, a player process that stays open between
+# sentences, so they play without gaps.
+
+import io
+import multiprocessing
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+import al_config
+import al_levels
+import al_trace
+from al_platform import SYSTEM
+from al_text import split_sentences
+
+CACHE_BYTES = 32 * 1024 * 1024
+# one core stays with the resident voice (first sentence) and playback;
+# with no core to spare, sentences are rendered one after another
+SYNTH_WORKERS = max(0, min(3, (os.cpu_count() or 1) - 1))
+
+
+def load_voice_settings(config=None):
+    config = config or al_config.get_config()
+    return {"voice_model": config.voice_model, "speed": config.speed, "pitch": config.pitch}
+
+
+def can_shift_pitch():
+    try:
+        import numpy  # optional dependency
+    except ImportError:
+        return False
+    return True
+
+
+def shift_pitch(pcm, pitch):
+    """
+    Raise or lower 16-bit PCM by `pitch` by resampling; the clip gets
+    1/pitch as long, so render it pitch times slower first. Needs numpy
+    (see can_shift_pitch).
+    """
+    if pitch == 1.0:
+        return pcm
+    import numpy as np  # optional dependency
+
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    n = max(1, int(len(samples) / pitch))
+    positions = np.linspace(0, len(samples) - 1, n)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.int16).tobytes()
+
+
+# -------------------------
+# Engines
+# -------------------------
+
+class PiperEngine:
+    """Piper voice kept resident in this process."""
+
+    name = "piper"
+    parallel = "process"  # CPU-bound: one voice per pool process
+
+    def __init__(self, model):
+        from piper import PiperVoice  # optional dependency
+
+        self.model = model
+        self.voice = PiperVoice.load(os.path.expanduser(model))
+        self.sample_rate = self.voice.config.sample_rate
+
+    @property
+    def factory(self):
+        """How a pool process loads its own copy of this voice."""
+        return PiperEngine, (self.model,)
+
+    def synthesize(self, text, speed, pitch):
+        # Piper has no pitch control: render pitch times slower, then
+        # resample, which restores the duration and shifts the pitch
+        # (without numpy the pitch setting is ignored)
+        pitch = max(pitch, 0.25) if can_shift_pitch() else 1.0
+        length_scale = pitch / max(speed, 0.1)
+        if hasattr(self.voice, "synthesize_stream_raw"):
+            pcm = b"".join(
+                self.voice.synthesize_stream_raw(text, length_scale=length_scale)
+            )
+        else:
+            from piper import SynthesisConfig
+
+            config = SynthesisConfig(length_scale=length_scale)
+            pcm = b"".join(
+                chunk.audio_int16_bytes
+                for chunk in self.voice.synthesize(text, syn_config=config)
+            )
+        return shift_pitch(pcm, pitch), self.sample_rate
+
+
+class EspeakEngine:
+    name = "espeak"
+    parallel = "thread"  # each call is its own espeak process
+
+    def synthesize(self, text, speed, pitch):
+        out = subprocess.run(
+            [
+                "espeak", "--stdout",
+                "-s", str(int(175 * speed)),
+                "-p", str(max(0, min(99, int(50 * pitch)))),
+                text,
+            ],
+            capture_output=True,
+            check=True,
+        ).stdout
+        with wave.open(io.BytesIO(out)) as w:
+            return w.readframes(w.getnframes()), w.getframerate()
+
+
+class SayEngine:
+    """macOS `say` renders and plays in one step, so nothing is cached."""
+
+    name = "say"
+
+    def synthesize(self, text, speed, pitch):
+        return None
+
+    def speak(self, text, speed, pitch):
+        subprocess.run(["say", "-r", str(int(175 * speed)), text], check=False)
+
+
+def load_engine(voice_model=None):
+    if SYSTEM == "darwin":
+        return SayEngine()
+    if voice_model and os.path.exists(os.path.expanduser(voice_model)):
+        try:
+            return PiperEngine(voice_model)
+        except Exception as e:
+            print(f"[AL] Piper voice unavailable ({e}), using espeak")
+    if shutil.which("espeak"):
+        return EspeakEngine()
+    return None
+
+
+def _pool_init(factory, args):
+    global _pool_engine
+    _pool_engine = factory(*args)
+
+
+def _pool_synthesize(text, speed, pitch):
+    return _pool_engine.synthesize(text, speed, pitch)
+
+
+class SynthesisPool:
+    """Renders sentences in parallel for engines that allow it."""
+
+    def __init__(self, engine, workers=SYNTH_WORKERS):
+        self.engine = engine
+        if engine.parallel == "process":
+            factory, args = engine.factory
+            # spawn: the parent has threads (audio, executor) that fork would copy mid-state
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_pool_init,
+                initargs=(factory, args),
+            )
+            self._fn = _pool_synthesize
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers,
+                                                thread_name_prefix="al-tts-synth")
+            self._fn = engine.synthesize
+
+    def submit(self, text, speed, pitch):
+        return self._executor.submit(self._fn, text, speed, pitch)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PCMStream:
+    """
+    Plays raw PCM through one aplay/paplay process that stays open while
+    chunks keep coming, so consecutive sentences play without a gap.
+    A call writes one chunk and returns once the pipe has taken it;
+    close() lets the audio drain, stop() cuts it off.
+    """
+
+    def __init__(self):
+        self._proc = None
+        self._rate = None
+
+    def __call__(self, pcm, rate):
+        if self._proc is None or rate != self._rate:
+            self.close()
+            self._open(rate)
+            if self._proc is None:
+                return
+        try:
+            self._proc.stdin.write(pcm)
+            self._proc.stdin.flush()
+        except (BrokenPipeError, ValueError, AttributeError):
+            self._proc = None  # stopped mid-clip
+
+    def _open(self, rate):
+        if shutil.which("aplay"):
+            cmd = ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "1", "-r", str(rate), "-"]
+        elif shutil.which("paplay"):
+            cmd = ["paplay", "--raw", "--format=s16le", "--channels=1", f"--rate={rate}"]
+        else:
+            return
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        self._rate = rate
+
+    def close(self):
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            proc.wait()
+
+    def stop(self):
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+play_pcm = PCMStream()
+
+
+# -------------------------
+# Cache
+# -------------------------
+
+class PCMCache:
+    """LRU of rendered audio keyed by (text, voice, speed, pitch)."""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def put(self, key, pcm, rate):
+        if len(pcm) > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.size -= len(old[0])
+        self._items[key] = (pcm, rate)
+        self.size += len(pcm)
+        while self.size > self.max_bytes:
+            _, (evicted, _) = self._items.popitem(last=False)
+            self.size -= len(evicted)
+
+    def __len__(self):
+        return len(self._items)
+
+
+# -------------------------
+# Worker
+# -------------------------
+
+class TTSWorker:
+    def __init__(self, engine=None, settings=None, player=play_pcm, cache=None,
+                 workers=SYNTH_WORKERS):
+        self.settings = settings  # None: follow the live config
+        self.workers = workers
+        self._engine_model = None
+        self.engine = engine
+        self.player = player
+        self.cache = cache if cache is not None else PCMCache()
+
+        self.pool = None      # SynthesisPool, started by the first long text
+        self._cut = 0         # bumped by interrupt(); a running _say checks it
+        self.saying = None    # text being spoken, until its audio has played out
+        # the stream returns once the pipe has the audio: level envelopes
+        # are scheduled from where its queued audio ends
+        self._audio_end = 0.0
+        self._envelopes = []  # stop Events of envelopes not yet played out
+
+        # (cached, seconds from speak() to playback start)
+        self.latencies = deque(maxlen=1000)
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="al-tts", daemon=True)
+        self._thread.start()
+
+    def speak(self, text):
+        if text:
+            self._queue.put((text, time.perf_counter()))
+
+    def wait(self):
+        """Block until everything queued so far has been spoken."""
+        self._queue.join()
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self.pool is not None:
+            self.pool.close()
+
+    def interrupt(self):
+        """Drop queued speech and cut off what is playing (barge-in)."""
+        self._cut += 1
+        self._stop_envelopes()
+        dropped = []
+        while True:
+            try:
+                dropped.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            self._queue.task_done()
+        if None in dropped:
+            self._queue.put(None)
+        stop = getattr(self.player, "stop", None)
+        if stop is not None:
+            stop()
+
+    def _loop(self):
+        if self.engine is None:
+            self._engine_model = self._settings()["voice_model"]
+            self.engine = load_engine(self._engine_model)
+
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self.saying = item[0]
+                self._say(*item)
+                if self._queue.empty():
+                    self._drain()
+                    self.saying = None
+            except Exception as e:
+                self.saying = None
+                print(f"[AL] speech failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _drain(self):
+        # nothing more to say: let the stream play out and close
+        close = getattr(self.player, "close", None)
+        if close is not None:
+            close()
+            self._audio_end = 0.0
+
+    def _stop_envelopes(self):
+        envelopes, self._envelopes = self._envelopes, []
+        for _, stop in envelopes:
+            stop.set()
+        self._audio_end = 0.0
+
+    def _settings(self):
+        return self.settings or load_voice_settings()
+
+    def _say(self, text, queued_at):
+        settings = self._settings()
+        if self.settings is None and settings["voice_model"] != self._engine_model:
+            # the voice was changed in the settings app
+            self._engine_model = settings["voice_model"]
+            self.engine = load_engine(self._engine_model)
+        if self.engine is None:
+            return
+
+        speed = settings["speed"]
+        pitch = settings["pitch"]
+        voice = settings["voice_model"]
+        cut = self._cut
+
+        sentences = split_sentences(text) or [text]
+        if len(sentences) > 1 and self.workers and getattr(self.engine, "parallel", None):
+            if self.pool is None or self.pool.engine is not self.engine:
+                if self.pool is not None:
+                    self.pool.close()
+                self.pool = SynthesisPool(self.engine, self.workers)
+            # sentences after the first are rendered by the pool while the
+            # resident voice renders the first one
+            later = [self._render_async(s, voice, speed, pitch) for s in sentences[1:]]
+        else:
+            later = None
+
+        first = True
+        for i, sentence in enumerate(sentences):
+            if self._cut != cut:
+                break
+            key = (sentence, voice, speed, pitch)
+            hit = self.cache.get(key)
+            if hit is not None:
+                pcm, rate = hit
+            else:
+                rendered = later[i - 1].result() if later is not None and i > 0 else None
+                if rendered is None:
+                    with al_trace.span("tts.synth", chars=len(sentence)):
+                        rendered = self.engine.synthesize(sentence, speed, pitch)
+                if rendered is None:
+                    # the engine plays by itself (macOS say): the whole text at once
+                    self.latencies.append((False, time.perf_counter() - queued_at))
+                    self.engine.speak(text, speed, pitch)
+                    return
+                self.cache.put(key, *rendered)
+                pcm, rate = rendered
+            if first:
+                self.latencies.append((hit is not None, time.perf_counter() - queued_at))
+                first = False
+            self._play(pcm, rate, hit is not None)
+
+        if later is not None:
+            for future in later:
+                future.cancel()
+
+    def _render_async(self, sentence, voice, speed, pitch):
+        if self.cache.get((sentence, voice, speed, pitch)) is not None:
+            done = Future()
+            done.set_result(None)  # played from the cache (or rendered then)
+            return done
+        started = al_trace.now()
+        future = self.pool.submit(sentence, speed, pitch)
+        future.add_done_callback(
+            lambda f: al_trace.record("tts.synth", started, chars=len(sentence), pooled=True)
+        )
+        return future
+
+    def _play(self, pcm, rate, cached):
+        now = time.monotonic()
+        start = max(now, self._audio_end)
+        self._audio_end = start + len(pcm) / (2 * rate)
+        meter = al_levels.get_meter()
+        if meter.watched:
+            stop = meter.follow("tts", al_levels.envelope(pcm, rate), delay=start - now)
+            self._envelopes = [(end, e) for end, e in self._envelopes if end > now]
+            self._envelopes.append((self._audio_end, stop))
+        with al_trace.span("tts.play", cached=cached):
+            self.player(pcm, rate)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+_released = None  # thread stopping the last released worker
+
+
+def get_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            # the released worker still plays its queue through play_pcm
+            if _released is not None:
+                _released.join()
+            _worker = TTSWorker()
+        return _worker
+
+
+def speak(text):
+    get_worker().speak(text)
+
+
+def wait():
+    if _released is not None:
+        _released.join()
+    if _worker is not None:
+        _worker.wait()
+
+
+def interrupt():
+    if _worker is not None:
+        _worker.interrupt()
+
+
+def saying():
+    """Text AL is speaking right now, or None."""
+    return _worker.saying if _worker is not None else None
+
+
+def release():
+    """Drop the voice and audio cache; queued speech is still played."""
+    global _worker, _released
+    with _worker_lock:
+        worker, _worker = _worker, None
+        if worker is not None:
+            _released = threading.Thread(target=worker.stop, name="al-tts-release", daemon=True)
+            _released.start()
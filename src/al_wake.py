@@ -0,0 +1,304 @@
+# al_wake.py
+#
+# In-process wake subsystem, replacing the `xev | grep` pipeline:
+#
+#   HotkeyHold     - Super+Space held for 3 s (pynput, event driven; the
+#                    only timer runs while the keys are actually held)
+#   KeywordSpotter - optional wake word on a low-rate audio stream. An
+#                    energy gate runs per frame; a tiny feature model and
+#                    DTW against enrolled templates run only on voiced
+#                    segments, so idle cost is a few microseconds per frame.
+
+import json
+import math
+import sys
+import threading
+import wave
+from array import array
+from pathlib import Path
+
+HOLD_SECONDS = 3.0
+
+SPOT_RATE = 8000
+SPOT_FRAME = 160             # 20 ms at 8 kHz
+SPOT_BANDS = (300, 700, 1200, 2200)
+SPOT_GATE_RMS = 400.0
+SPOT_MIN_FRAMES = 15         # 0.3 s
+SPOT_MAX_FRAMES = 100        # 2.0 s
+SPOT_END_FRAMES = 10         # 0.2 s of silence closes a segment
+SPOT_MARGIN = 1.1
+
+TEMPLATES_PATH = Path.home() / ".config/al/wake_templates.json"
+
+
+# -------------------------
+# Hotkey
+# -------------------------
+
+class HotkeyHold:
+    """Call on_wake once Super+Space has been held for `hold` seconds."""
+
+    def __init__(self, on_wake, hold=HOLD_SECONDS):
+        from pynput import keyboard  # optional dependency
+
+        self.on_wake = on_wake
+        self.hold = hold
+        self._keyboard = keyboard
+        self._super = {keyboard.Key.cmd, keyboard.Key.cmd_l, keyboard.Key.cmd_r}
+        self._held = set()
+        self._timer = None
+        self._listener = keyboard.Listener(on_press=self._press, on_release=self._release)
+
+    def _combo_down(self):
+        return self._keyboard.Key.space in self._held and self._held & self._super
+
+    def _press(self, key):
+        if key in self._held:
+            return  # auto-repeat
+        self._held.add(key)
+        if self._combo_down() and self._timer is None:
+            self._timer = threading.Timer(self.hold, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _release(self, key):
+        self._held.discard(key)
+        if self._timer is not None and not self._combo_down():
+            self._timer.cancel()
+            self._timer = None
+
+    def _fire(self):
+        self._timer = None
+        if self._combo_down():
+            self.on_wake("hotkey")
+
+    def start(self):
+        self._listener.start()
+
+    def stop(self):
+        self._listener.stop()
+        if self._timer is not None:
+            self._timer.cancel()
+
+
+# -------------------------
+# Keyword spotter
+# -------------------------
+
+def _decimate(samples, rate):
+    step = max(1, rate // SPOT_RATE)
+    if step == 1:
+        return samples
+    return array("h", samples[::step])
+
+
+def frame_features(samples):
+    """log energy, zero-crossing rate and a few Goertzel band energies."""
+    n = len(samples)
+    energy = sum(s * s for s in samples) / n
+    zcr = sum(1 for a, b in zip(samples, samples[1:]) if (a < 0) != (b < 0)) / n
+
+    features = [math.log(energy + 1.0), zcr * 10]
+    for freq in SPOT_BANDS:
+        coeff = 2 * math.cos(2 * math.pi * freq / SPOT_RATE)
+        s1 = s2 = 0.0
+        for x in samples:
+            s1, s2 = x + coeff * s1 - s2, s1
+        power = s1 * s1 + s2 * s2 - coeff * s1 * s2
+        features.append(math.log(power / n + 1.0))
+    return features
+
+
+def _normalized(seq):
+    """
+    Remove the recording gain: it shifts every log-power feature by the
+    same constant, so subtract the segment's mean log energy from them.
+    """
+    gain = sum(f[0] for f in seq) / len(seq)
+    return [[f[0] - gain, f[1]] + [x - gain for x in f[2:]] for f in seq]
+
+
+def dtw_distance(a, b):
+    inf = float("inf")
+    prev = [0.0] + [inf] * len(b)
+    for fa in a:
+        cur = [inf] * (len(b) + 1)
+        for j, fb in enumerate(b, 1):
+            cost = math.sqrt(sum((x - y) ** 2 for x, y in zip(fa, fb)))
+            cur[j] = cost + min(prev[j], prev[j - 1], cur[j - 1])
+        prev = cur
+    return prev[-1] / (len(a) + len(b))
+
+
+class KeywordSpotter:
+    """
+    Template-matching wake word detector. Feed frames with process();
+    on_wake fires when a voiced segment matches an enrolled template.
+    """
+
+    def __init__(self, templates, on_wake=None, threshold=None):
+        self.templates = [_normalized(t) for t in templates]
+        self.on_wake = on_wake
+        self.threshold = threshold or self._auto_threshold()
+
+        self._segment = []
+        self._silent = 0
+        self._pending = array("h")
+
+    def _auto_threshold(self):
+        if len(self.templates) < 2:
+            return 1.0
+        pairs = [
+            dtw_distance(a, b)
+            for i, a in enumerate(self.templates)
+            for b in self.templates[i + 1:]
+        ]
+        return sum(pairs) / len(pairs) * SPOT_MARGIN
+
+    # -------------------------
+    # Enrollment
+    # -------------------------
+
+    @staticmethod
+    def features_of(samples, rate=SPOT_RATE):
+        """Feature sequence of the voiced part of a recording."""
+        samples = _decimate(samples, rate)
+        frames = [
+            samples[i:i + SPOT_FRAME]
+            for i in range(0, len(samples) - SPOT_FRAME + 1, SPOT_FRAME)
+        ]
+        voiced = [f for f in frames if _rms(f) > SPOT_GATE_RMS]
+        return [frame_features(f) for f in voiced]
+
+    @classmethod
+    def load(cls, path=TEMPLATES_PATH, **kwargs):
+        data = json.loads(Path(path).read_text())
+        return cls(data["templates"], threshold=data.get("threshold"), **kwargs)
+
+    def save(self, path=TEMPLATES_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps({
+            "templates": self.templates,
+            "threshold": self.threshold,
+        }))
+
+    # -------------------------
+    # Detection
+    # -------------------------
+
+    def process(self, frame, rate=SPOT_RATE):
+        """Feed raw 16-bit PCM; returns True when the wake word was heard."""
+        self._pending.extend(_decimate(array("h", frame), rate))
+        heard = False
+        while len(self._pending) >= SPOT_FRAME:
+            chunk = self._pending[:SPOT_FRAME]
+            del self._pending[:SPOT_FRAME]
+            heard |= self._process_chunk(chunk)
+        return heard
+
+    def _process_chunk(self, chunk):
+        if _rms(chunk) > SPOT_GATE_RMS:
+            self._silent = 0
+            if len(self._segment) < SPOT_MAX_FRAMES:
+                self._segment.append(frame_features(chunk))
+            return False
+
+        if not self._segment:
+            return False
+        self._silent += 1
+        if self._silent < SPOT_END_FRAMES:
+            return False
+
+        segment, self._segment, self._silent = self._segment, [], 0
+        if len(segment) < SPOT_MIN_FRAMES or not self.templates:
+            return False
+        if self.score(segment) > self.threshold:
+            return False
+        if self.on_wake:
+            self.on_wake("keyword")
+        return True
+
+    def score(self, segment):
+        segment = _normalized(segment)
+        return min(dtw_distance(segment, t) for t in self.templates)
+
+
+def _rms(samples):
+    return math.sqrt(sum(s * s for s in samples) / (len(samples) or 1))
+
+
+# -------------------------
+# Service
+# -------------------------
+
+class WakeService:
+    """Runs the hotkey hook and, if templates are enrolled, the spotter."""
+
+    def __init__(self, on_wake, hotkey=True, keyword=True):
+        self.on_wake = on_wake
+        self.hotkey = None
+        self.spotter = None
+        self._source = None
+        self._thread = None
+
+        if hotkey:
+            try:
+                self.hotkey = HotkeyHold(on_wake)
+            except Exception as e:
+                print(f"[AL] hotkey unavailable: {e}")
+
+        if keyword and TEMPLATES_PATH.exists():
+            self.spotter = KeywordSpotter.load(on_wake=on_wake)
+
+    def start(self):
+        if self.hotkey:
+            self.hotkey.start()
+        if self.spotter:
+            import al_stt
+            # low rate, 100 ms buffers: ~10 wakeups per second while idle
+            self._source = al_stt.MicrophoneSource(rate=SPOT_RATE, frame_ms=100)
+            self._thread = threading.Thread(target=self._listen, name="al-wake", daemon=True)
+            self._thread.start()
+
+    def _listen(self):
+        while True:
+            item = self._source.frames.get()
+            if item is None:
+                return
+            self.spotter.process(item[0], SPOT_RATE)
+
+    def stop(self):
+        if self.hotkey:
+            self.hotkey.stop()
+        if self._source:
+            self._source.close()
+
+
+def read_wav(path):
+    with wave.open(str(path), "rb") as w:
+        if w.getnchannels() != 1 or w.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected mono 16-bit PCM")
+        return array("h", w.readframes(w.getnframes())), w.getframerate()
+
+
+def enroll(paths, out=TEMPLATES_PATH):
+    """Build wake word templates from a few recordings of the word."""
+    templates = []
+    for path in paths:
+        samples, rate = read_wav(path)
+        features = KeywordSpotter.features_of(samples, rate)
+        if len(features) < SPOT_MIN_FRAMES:
+            raise ValueError(f"{path}: not enough speech")
+        templates.append(features)
+    spotter = KeywordSpotter(templates)
+    spotter.save(out)
+    return spotter
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4 or sys.argv[1] != "enroll":
+        print("usage: al_wake.py enroll rec1.wav rec2.wav [rec3.wav ...]")
+        sys.exit(2)
+    spotter = enroll(sys.argv[2:])
+    print(f"[AL] saved {len(spotter.templates)} templates to {TEMPLATES_PATH} "
+          f"(threshold {spotter.threshold:.3f})")
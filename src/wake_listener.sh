@@ -1,4 +1,7 @@
 #!/usr/bin/env bash
-xev -root | while read line; do
-  echo "$line" | grep -q "keycode 65" && sleep 3 && python3 ~/.local/share/al/al.py
-done
+# Hold Super+Space (or say the enrolled wake word) -> AL wakes up.
+# Key tracking and wake word spotting run inside the AL daemon.
+AL_SRC="${AL_SRC:-$HOME/.local/share/al/src}"
+
+python3 -S "$AL_SRC/al_client.py" ping >/dev/null 2>&1 && exit 0
+exec python3 "$AL_SRC/al_daemon.py" --wake
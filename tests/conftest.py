@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# the modules live flat in src/, as installed
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+@pytest.fixture(autouse=True)
+def config_service(tmp_path, monkeypatch):
+    """
+    The process-wide config service, on the shipped defaults only: no
+    test reads the developer's config files or watches their home.
+    """
+    import al_config
+
+    service = al_config.ConfigService(legacy=tmp_path / "legacy.json",
+                                      user=tmp_path / "config" / "config.json")
+    monkeypatch.setattr(al_config, "_service", service)
+    yield service
+    service.close()
@@ -0,0 +1,65 @@
+import al_inotify
+from al_appindex import AppIndex
+
+
+def desktop_file(directory, relpath, name, exec_line):
+    path = directory / relpath
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"[Desktop Entry]\nType=Application\nName={name}\nExec={exec_line}\n")
+    return path
+
+
+def removed(index, path):
+    path.unlink()
+    index._on_change(str(path), al_inotify.IN_DELETE)
+
+
+def test_nested_entries_get_vendor_ids(tmp_path):
+    desktop_file(tmp_path, "vendor/editor.desktop", "Editor", "editor %F")
+    index = AppIndex([str(tmp_path)]).build()
+    assert index.resolve("editor").id == "vendor-editor.desktop"
+
+
+def test_user_entry_shadows_the_system_one(tmp_path):
+    user, system = tmp_path / "user", tmp_path / "system"
+    desktop_file(system, "vendor/editor.desktop", "Editor", "/usr/bin/editor")
+    desktop_file(user, "vendor/editor.desktop", "Editor", "/opt/editor/editor")
+    index = AppIndex([str(user), str(system)]).build()
+    assert index.resolve("editor").exec_line == "/opt/editor/editor"
+
+
+def test_removing_the_user_entry_restores_the_shadowed_one(tmp_path):
+    user, system = tmp_path / "user", tmp_path / "system"
+    shadowed = desktop_file(system, "vendor/editor.desktop", "Editor", "/usr/bin/editor")
+    override = desktop_file(user, "vendor/editor.desktop", "Editor", "/opt/editor/editor")
+    index = AppIndex([str(user), str(system)]).build()
+
+    removed(index, override)
+    entry = index.resolve("editor")
+    assert entry.exec_line == "/usr/bin/editor" and entry.path == str(shadowed)
+
+
+def test_removing_a_shadowed_entry_keeps_the_visible_one(tmp_path):
+    user, system = tmp_path / "user", tmp_path / "system"
+    shadowed = desktop_file(system, "vendor/editor.desktop", "Editor", "/usr/bin/editor")
+    desktop_file(user, "vendor/editor.desktop", "Editor", "/opt/editor/editor")
+    index = AppIndex([str(user), str(system)]).build()
+
+    removed(index, shadowed)
+    assert index.resolve("editor").exec_line == "/opt/editor/editor"
+
+
+def test_removed_app_is_no_longer_resolved(tmp_path):
+    path = desktop_file(tmp_path, "vendor/editor.desktop", "Editor", "editor %F")
+    index = AppIndex([str(tmp_path)]).build()
+
+    removed(index, path)
+    assert index.resolve("editor") is None
+    assert not index.entries
+
+
+def test_installed_app_is_resolved(tmp_path):
+    index = AppIndex([str(tmp_path)]).build()
+    path = desktop_file(tmp_path, "vendor/editor.desktop", "Editor", "editor %F")
+    index._on_change(str(path), al_inotify.IN_CLOSE_WRITE)
+    assert index.resolve("editor").id == "vendor-editor.desktop"
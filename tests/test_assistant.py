@@ -0,0 +1,77 @@
+import al_wake
+from al import ALAssistant, wake_service
+from al_backend import RecordingBackend
+
+
+class FakeSpeech:
+    def __init__(self):
+        self.running = True
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+
+class FakeLoop:
+    def call_later(self, delay, fn):
+        return None
+
+    def call_soon_threadsafe(self, fn, *args):
+        fn(*args)
+
+
+class FakeHotkey:
+    def __init__(self, on_wake):
+        self.on_wake = on_wake
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+def assistant_with_speech(release):
+    assistant = ALAssistant(backend=RecordingBackend())
+    assistant.attach(FakeLoop(), FakeSpeech())
+    assistant.release_speech = release
+    return assistant
+
+
+def test_idle_keeps_the_microphone_without_a_wake_source():
+    assistant = assistant_with_speech(release=False)
+    assistant.go_idle()
+    assert assistant.speech.running
+
+
+def test_idle_releases_the_microphone_and_wake_reopens_it():
+    assistant = assistant_with_speech(release=True)
+    assistant.go_idle()
+    assert not assistant.speech.running
+    assistant.wake()
+    assert assistant.speech.running and not assistant.idle
+
+
+def test_hotkey_wakes_the_assistant_through_the_wake_service(monkeypatch, tmp_path):
+    monkeypatch.setattr(al_wake, "HotkeyHold", FakeHotkey)
+    monkeypatch.setattr(al_wake, "TEMPLATES_PATH", tmp_path / "none.json")
+    assistant = assistant_with_speech(release=False)
+    wake = wake_service(assistant, assistant.speech)
+    assert assistant.release_speech
+
+    assistant.go_idle()
+    assert not assistant.speech.running
+    wake.hotkey.on_wake("hotkey")   # as HotkeyHold._fire calls it
+    assert assistant.speech.running
+
+
+def test_aliases_come_from_the_given_config(tmp_path):
+    from al_config import ConfigService
+
+    (tmp_path / "defaults.json").write_text('{"aliases": {"editor": "Kate"}}')
+    config = ConfigService(defaults=tmp_path / "defaults.json", legacy=tmp_path / "legacy.json",
+                           user=tmp_path / "user.json")
+    assistant = ALAssistant(backend=RecordingBackend(), config=config)
+    assert assistant.resolve_app("editor") == "Kate"
@@ -0,0 +1,241 @@
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import al_browser
+from al_browser import BrowserChannels, CDPError, NotSent
+
+
+class FakeConnection:
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.batches = []
+
+    def open_tabs(self, urls):
+        self.batches.append(list(urls))
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+@pytest.fixture
+def channels(monkeypatch):
+    monkeypatch.setattr(al_browser, "load_browser_settings", lambda: dict(al_browser.DEFAULTS))
+    channels = BrowserChannels({"brave": ()})
+    channels.made = []
+
+    def connect(outcomes):
+        outcomes = list(outcomes)
+
+        def connection(key, settings):
+            if not outcomes:
+                return None
+            conn = FakeConnection(outcomes.pop(0))
+            channels.made.append(conn)
+            return conn
+        monkeypatch.setattr(channels, "connection", connection)
+        monkeypatch.setattr(channels, "drop", lambda key, conn: None)
+    channels.connect = connect
+    return channels
+
+
+def test_reconnects_when_nothing_was_sent(channels):
+    channels.connect([NotSent("closed by the browser"), ["T1", "T2"]])
+    assert channels.open_urls("Brave", ["a", "b"]) == 2
+    assert len(channels.made) == 2
+
+
+def test_no_reply_after_sending_is_not_retried(channels):
+    channels.connect([socket.timeout("timed out"), ["T1", "T2"]])
+    # the tabs may be open: neither resent nor left to the spawn fallback
+    assert channels.open_urls("Brave", ["a", "b"]) == 2
+    assert len(channels.made) == 1
+
+
+def test_partial_refusal_counts_the_opened_tabs(channels):
+    channels.connect([["T1", CDPError("Failed to open a new tab"), "T3"]])
+    assert channels.open_urls("Brave", ["a", "b", "c"]) == 2
+
+
+def test_unreachable_browser_opens_nothing(channels):
+    channels.connect([])
+    assert channels.open_urls("Brave", ["a"]) == 0
+    assert channels.open_urls("Firefox", ["a"]) == 0
+
+
+def test_open_url_in_app_spawns_only_the_rest(monkeypatch):
+    import al_apps
+
+    spawned = []
+    monkeypatch.setattr(al_browser, "open_urls", lambda app, urls: len(urls) - 1)
+    monkeypatch.setattr(al_apps, "SYSTEM", "darwin")
+    monkeypatch.setattr(al_apps.subprocess, "run", lambda argv, check: spawned.append(argv))
+    al_apps.open_url_in_app("Brave", "https://example.com", 3)
+    assert spawned == [["open", "-a", "Brave", "https://example.com"]]
+
+
+def cdp_stub():
+    """
+    Local stand-in for a browser's remote-debugging endpoint: /json/version
+    and a browser WebSocket answering the Target commands.
+    """
+    stats = {"connections": 0, "created": 0, "activated": 0}
+    lock = threading.Lock()
+    targets = {}
+
+    def read_frame(rfile):
+        first, second = rfile.read(2)
+        n = second & 0x7F
+        if n == 126:
+            (n,) = struct.unpack("!H", rfile.read(2))
+        elif n == 127:
+            (n,) = struct.unpack("!Q", rfile.read(8))
+        mask = rfile.read(4)
+        payload = bytes(b ^ mask[i & 3] for i, b in enumerate(rfile.read(n)))
+        return first & 0x0F, payload
+
+    def frame(text):
+        data = text.encode()
+        n = len(data)
+        head = (struct.pack("!BB", 0x81, n) if n < 126 else
+                struct.pack("!BBH", 0x81, 126, n) if n < 1 << 16 else
+                struct.pack("!BBQ", 0x81, 127, n))
+        return head + data
+
+    def reply(message):
+        method, params = message["method"], message.get("params", {})
+        if method == "Target.createTarget" and params["url"].startswith("refuse:"):
+            return [{"id": message["id"],
+                     "error": {"code": -32000, "message": "Failed to open a new tab"}}]
+        if method == "Target.createTarget":
+            with lock:
+                stats["created"] += 1
+                target = f"T{stats['created']}"
+                targets[target] = params["url"]
+            return [{"method": "Target.targetCreated",
+                     "params": {"targetInfo": {"targetId": target}}},
+                    {"id": message["id"], "result": {"targetId": target}}]
+        if method == "Target.activateTarget":
+            with lock:
+                stats["activated"] += 1
+        return [{"id": message["id"], "result": {}}]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *a):
+            pass
+
+        def do_GET(self):
+            if self.path == "/json/version":
+                port = self.server.server_address[1]
+                data = json.dumps({"Browser": "Stub/1.0", "webSocketDebuggerUrl":
+                                   f"ws://127.0.0.1:{port}/devtools/browser/stub"}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+            key = self.headers.get("Sec-WebSocket-Key")
+            if key is None:
+                self.send_error(404)
+                return
+            accept = base64.b64encode(hashlib.sha1(
+                (key + "258EAFA5-E914-47DA-95CA-C5AB0DC85B11").encode()).digest()).decode()
+            self.send_response(101)
+            self.send_header("Upgrade", "websocket")
+            self.send_header("Connection", "Upgrade")
+            self.send_header("Sec-WebSocket-Accept", accept)
+            self.end_headers()
+            self.wfile.flush()
+            with lock:
+                stats["connections"] += 1
+            self.close_connection = True
+            while True:
+                try:
+                    opcode, payload = read_frame(self.rfile)
+                except (OSError, ValueError):
+                    return
+                message = json.loads(payload) if opcode != 0x8 else None
+                if message is None or message["method"] == "Stub.hangUp":
+                    return      # the browser quit
+                self.wfile.write(b"".join(frame(json.dumps(m)) for m in reply(message)))
+                self.wfile.flush()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, address: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats, targets
+
+
+@pytest.fixture(scope="module")
+def cdp():
+    server, stats, targets = cdp_stub()
+    yield server.server_address[1], stats, targets
+    server.shutdown()
+
+
+@pytest.fixture
+def stub(cdp, tmp_path, monkeypatch):
+    port, stats, targets = cdp
+    monkeypatch.setattr(al_browser, "load_browser_settings", lambda: dict(al_browser.DEFAULTS))
+    profile = tmp_path / "profile"
+    profile.mkdir()
+    channels = BrowserChannels({"brave": (str(profile),)})
+    before = dict(stats)
+    delta = lambda key: stats[key] - before.get(key, 0)
+    yield channels, delta, targets, profile, port
+    channels.close()
+
+
+def publish(profile, port):
+    (profile / "DevToolsActivePort").write_text(f"{port}\n/devtools/browser/stub\n")
+
+
+def test_no_debugging_endpoint_opens_nothing(stub):
+    channels, delta, _, _, _ = stub
+    assert channels.open_urls("Brave", ["https://example.com"]) == 0
+    assert delta("connections") == 0
+
+
+def test_tabs_go_out_as_one_batch(stub):
+    channels, delta, targets, profile, port = stub
+    publish(profile, port)
+    assert channels.open_urls("Brave", ["https://example.com"]) == 1
+    conn = channels.connections["brave"]
+    writes = []
+    send = conn.ws.send
+    conn.ws.send = lambda texts: (writes.append(len(texts)), send(texts))
+    assert channels.open_urls("Brave", ["https://example.com"] * 10) == 10
+    assert writes == [10, 1]     # the batch, then activating the last tab
+    assert delta("created") == 11 and delta("activated") == 2
+
+    assert list(targets.values())[-10:] == ["https://example.com"] * 10
+
+
+def test_refused_tab_keeps_the_connection(stub, capsys):
+    channels, delta, _, profile, port = stub
+    publish(profile, port)
+    assert channels.open_urls("Brave", ["refuse:x", "https://example.com"]) == 1
+    assert "refused to open 1 of 2 tabs" in capsys.readouterr().out
+    assert delta("connections") == 1 and "brave" in channels.connections
+
+
+def test_reconnects_once_after_the_browser_went_away(stub):
+    channels, delta, _, profile, port = stub
+    publish(profile, port)
+    channels.open_urls("Brave", ["https://example.com"])
+    channels.connections["brave"].ws.send([json.dumps({"id": 0, "method": "Stub.hangUp"})])
+    time.sleep(0.05)
+    assert channels.open_urls("Brave", ["https://example.com"]) == 1
+    assert delta("connections") == 2
+    assert delta("created") == 2    # the second tab was sent once, on the new connection
@@ -0,0 +1,74 @@
+import json
+import threading
+
+import pytest
+
+from al_config import ConfigService
+
+
+def service(tmp_path):
+    return ConfigService(defaults=tmp_path / "defaults.json", legacy=tmp_path / "legacy.json",
+                         user=tmp_path / "user.json")
+
+
+def test_listener_can_change_the_config(tmp_path):
+    config = service(tmp_path)
+    seen = []
+
+    def listener(old, new):
+        seen.append(new.version)
+        if len(seen) == 1:
+            config.override("voice", {"speed": 1.5})    # re-enters the service
+            config.save_user({"voice": {"speed": 1.5}})
+
+    config.subscribe(listener)
+    worker = threading.Thread(target=config.override, args=("voice", {"speed": 1.2}))
+    worker.start()
+    worker.join(timeout=5)
+    assert not worker.is_alive(), "listener deadlocked the config service"
+    assert len(seen) == 2
+
+
+def test_save_user_removes_keys_set_to_none(tmp_path):
+    config = service(tmp_path)
+    config.save_user({"voice": {"speed": 1.2, "pitch": 0.9}, "aliases": {"web": "Brave"}})
+    config.save_user({"voice": {"pitch": None}, "aliases": None})
+    data = json.loads((tmp_path / "user.json").read_text())
+    assert data == {"voice": {"speed": 1.2}}
+
+
+@pytest.fixture
+def watched(tmp_path):
+    import al_inotify
+
+    if not al_inotify.available():
+        pytest.skip("needs inotify")
+    config = service(tmp_path)
+    applied = threading.Event()
+    config.subscribe(lambda old, new: applied.set())
+    assert config.watch()
+    yield config, applied
+    config.close()
+
+
+def test_file_edits_apply_while_watching(tmp_path, watched):
+    config, applied = watched
+    (tmp_path / "legacy.json").write_text(json.dumps({"aliases": {"editor": "Gedit"}}))
+    assert applied.wait(2)
+    assert config.snapshot.aliases["editor"] == "Gedit"
+
+    applied.clear()
+    config.save_user({"aliases": {"editor": "Kate"}})
+    assert applied.wait(2)
+    assert config.snapshot.aliases["editor"] == "Kate"
+
+
+def test_deleted_file_drops_its_layer(tmp_path, watched):
+    config, applied = watched
+    config.save_user({"aliases": {"editor": "Kate"}})
+    assert applied.wait(2)
+
+    applied.clear()
+    (tmp_path / "user.json").unlink()
+    assert applied.wait(2)
+    assert "editor" not in config.snapshot.aliases
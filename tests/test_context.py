@@ -0,0 +1,41 @@
+import sqlite3
+
+import al_context
+from al_context import ALContext
+
+
+def test_apps_are_pruned_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(al_context, "MAX_APPS", 3)
+    monkeypatch.setattr(al_context, "PRUNE_EVERY", 1)
+    path = tmp_path / "context.db"
+    context = ALContext(path)
+    for i in range(5):
+        context.opened(f"App{i}")
+        context.apps[f"App{i}"].last_used = 1000.0 + i
+        context.add_turn(f"open app{i}", "open")
+    context.close()
+
+    db = sqlite3.connect(str(path))
+    assert db.execute("SELECT COUNT(*) FROM apps").fetchone()[0] == 3
+    db.close()
+    assert set(ALContext(path).apps) == {"App2", "App3", "App4"}
+
+
+def test_locked_database_does_not_fail_the_turn(tmp_path, capsys):
+    path = tmp_path / "context.db"
+    context = ALContext(path)
+    context._db.execute("PRAGMA busy_timeout = 0")
+    other = sqlite3.connect(str(path), isolation_level=None)
+    other.execute("BEGIN EXCLUSIVE")
+    try:
+        context.opened("Brave")
+        turn = context.add_turn("open brave", "open")
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+    assert turn.text == "open brave"
+    assert "could not save context" in capsys.readouterr().out
+
+    context.add_turn("open brave", "open")   # the app row is written on the next turn
+    context.close()
+    assert "Brave" in ALContext(path).apps
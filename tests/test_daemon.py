@@ -0,0 +1,48 @@
+import socket
+import threading
+from types import SimpleNamespace
+
+import al_daemon
+from al import ALAssistant
+from al_backend import RecordingBackend
+
+
+def test_app_index_is_built_off_the_loop(tmp_path, monkeypatch):
+    built = []
+    done = threading.Event()
+
+    def get_index():
+        built.append(threading.current_thread().name)
+        done.set()
+
+    monkeypatch.setattr(al_daemon, "SYSTEM", "linux")
+    monkeypatch.setattr(al_daemon, "al_appindex", SimpleNamespace(get_index=get_index))
+    daemon = al_daemon.ALDaemon(ALAssistant(backend=RecordingBackend()), path=str(tmp_path / "sock"))
+    try:
+        assert done.wait(2)
+        assert built == ["al-appindex"]
+    finally:
+        daemon.pool.shutdown(wait=False)
+        daemon.loop.close()
+
+
+def test_lines_after_a_close_are_dropped():
+    requests = []
+
+    def session_request(conn, verb, arg):
+        requests.append(verb)
+        conn.close()
+
+    daemon = SimpleNamespace(
+        session_request=session_request,
+        dispatch=lambda verb, arg: requests.append(verb) or ("pong", None),
+        loop=SimpleNamespace(remove_reader=lambda sock: None),
+    )
+    ours, theirs = socket.socketpair()
+    try:
+        conn = al_daemon._Connection(daemon, ours)
+        theirs.sendall(b"end\nping\nping\n")
+        conn.readable()
+        assert requests == ["end"] and conn.sock is None
+    finally:
+        theirs.close()
@@ -0,0 +1,63 @@
+import threading
+
+from al_executor import ActionExecutor
+
+
+def test_failing_on_done_still_resolves_the_action():
+    def on_done(action):
+        raise ValueError("report failed")
+
+    executor = ActionExecutor(on_done=on_done, max_workers=2)
+    try:
+        first = executor.submit("first", lambda: 1, key="lane")
+        second = executor.submit("second", lambda: 2, key="lane")
+        assert first.future.result(timeout=2) == 1
+        assert second.future.result(timeout=2) == 2
+        executor.wait(timeout=2)
+        assert not executor.pending
+    finally:
+        executor.shutdown()
+
+
+def test_actions_sharing_a_key_run_in_submission_order():
+    order = []
+    gate = threading.Event()
+
+    def first():
+        gate.wait(5)
+        order.append(0)
+
+    executor = ActionExecutor(max_workers=4)
+    try:
+        executor.submit("step 0", first, key="media")
+        for i in range(1, 8):
+            executor.submit(f"step {i}", order.append, i, key="media")
+        # another lane is not held up by the blocked one
+        other = executor.submit("open", lambda: "opened", key="app")
+        assert other.future.result(timeout=2) == "opened"
+        assert order == []
+        gate.set()
+        executor.wait(timeout=5)
+        assert order == list(range(8))
+    finally:
+        executor.shutdown()
+
+
+def test_after_waits_for_another_lane():
+    seen = []
+    gate = threading.Event()
+
+    def blocked_open():
+        gate.wait(5)
+        seen.append("open")
+
+    executor = ActionExecutor(max_workers=4)
+    try:
+        first = executor.submit("open", blocked_open, key="app")
+        search = executor.submit("search", seen.append, "search", key="browser", after=[first])
+        assert not search.future.done()
+        gate.set()
+        executor.wait(timeout=5)
+        assert seen == ["open", "search"]
+    finally:
+        executor.shutdown()
@@ -0,0 +1,106 @@
+import random
+
+from al import INTENT_TABLE, INTENTS
+from al_bench import command_corpus
+from al_intents import IntentRegistry
+
+
+def legacy_dispatch(text):
+    """
+    Branch selection of the original if-chain in ALAssistant.handle,
+    with every follow-up context present.
+    """
+    if text in ("exit", "quit", "bye"):
+        return "exit"
+    if text == "clear":
+        return "clear"
+    if "location services" in text:
+        return "location_services"
+    if text in ("turn off", "disable"):
+        return "turn_off"
+    if text in ("open settings", "settings"):
+        return "open_settings"
+    if text in ("check for updates", "software update", "system update"):
+        return "check_updates"
+    if text in ("open software update", "open update settings"):
+        return "open_update_settings"
+    if text.startswith("search for"):
+        return "search"
+    if text in ("search again", "again"):
+        return "search_again"
+    if text.startswith("close"):
+        return "close"
+    if text.startswith(("open", "go to")):
+        return "open"
+    if text.startswith("play"):
+        return "play"
+    if text in ("pause", "stop"):
+        return "pause"
+    if text in ("next", "skip"):
+        return "next"
+    if text in ("previous", "back"):
+        return "previous"
+    return None
+
+
+def extra_intents(n):
+    """Synthetic commands standing in for a grown command set."""
+    extra = []
+    for k in range(n):
+        kind = ("exact", "prefixes", "contains")[k % 3]
+        phrase = {
+            "exact": f"run routine {k}",
+            "prefixes": f"start job {k} ",
+            "contains": f"macro {k} now",
+        }[kind]
+        extra.append((f"custom_{k}", kind, phrase))
+    return extra
+
+
+def grown_dispatchers(extra):
+    """An if-chain and a registry holding the stock intents, then `extra`."""
+    registry = IntentRegistry()
+    for name, handler, phrases in INTENT_TABLE:
+        registry.add(name, handler, **phrases)
+    for name, kind, phrase in extra:
+        registry.add(name, None, **{kind: (phrase,)})
+
+    matches = {
+        "exact": lambda text, p: text == p,
+        "prefixes": lambda text, p: text.startswith(p),
+        "contains": lambda text, p: p in text,
+    }
+
+    def chain(text):
+        name = legacy_dispatch(text)
+        if name is not None:
+            return name
+        for name, kind, phrase in extra:
+            if matches[kind](text, phrase):
+                return name
+        return None
+
+    return chain, registry
+
+
+def registry_dispatch(text, registry):
+    intent = registry.match(text)
+    return intent.name if intent else None
+
+
+def test_registry_matches_the_original_if_chain():
+    for text in set(command_corpus(5000)):
+        assert registry_dispatch(text, INTENTS) == legacy_dispatch(text), text
+
+
+def test_grown_registry_matches_a_grown_if_chain():
+    extra = extra_intents(300)
+    chain, registry = grown_dispatchers(extra)
+    rnd = random.Random(1)
+    corpus = command_corpus(2000)
+    for i in range(0, len(corpus), 4):
+        _, kind, phrase = rnd.choice(extra)
+        corpus[i] = {"exact": phrase, "prefixes": phrase + "please",
+                     "contains": "please " + phrase}[kind]
+    for text in set(corpus):
+        assert registry_dispatch(text, registry) == chain(text), text
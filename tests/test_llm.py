@@ -0,0 +1,94 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+import al_llm
+
+ANSWER = ["Paris is the capital ", "of France. ", "It lies on ", "the Seine river. ",
+          "About two million people ", "live there."]
+
+
+@pytest.fixture
+def ollama():
+    """Ollama-compatible /api/chat streaming ANSWER; stats counts connections."""
+    stats = {"connections": 0, "requests": []}
+    gate = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            stats["connections"] += 1
+
+        def log_message(self, *args):
+            pass
+
+        def _chunk(self, data):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            stats["requests"].append(request)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for i, token in enumerate(ANSWER):
+                    if i == 2 and request["messages"][-1]["content"] == "hold":
+                        gate.wait(5)    # the rest only comes once the test allows it
+                    line = {"message": {"role": "assistant", "content": token}, "done": False}
+                    self._chunk(json.dumps(line).encode() + b"\n")
+                self._chunk(json.dumps({"done": True}).encode() + b"\n")
+                self._chunk(b"")
+            except OSError:
+                self.close_connection = True
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, address: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings = dict(al_llm.load_llm_settings(), host=f"http://127.0.0.1:{server.server_address[1]}")
+    client = al_llm.OllamaClient(settings)
+    yield client, stats, gate
+    gate.set()
+    client.close()
+    server.shutdown()
+
+
+def test_sentences_stream_over_one_pooled_connection(ollama):
+    client, stats, _ = ollama
+    sentences = []
+    text = client.respond("what is the capital of france", sentences.append)
+    assert text == "".join(ANSWER)
+    assert sentences == ["Paris is the capital of France.", "It lies on the Seine river.",
+                         "About two million people live there."]
+
+    client.respond("and its river?")
+    assert stats["connections"] == 1      # keep-alive: the second request reused it
+    assert stats["requests"][-1]["stream"] is True
+    # the follow-up carries the first exchange
+    assert [m["content"] for m in stats["requests"][-1]["messages"][1:3]] == [
+        "what is the capital of france", text]
+
+
+def test_cancel_stops_the_stream_and_keeps_history_clean(ollama):
+    client, _, _ = ollama
+    generation = al_llm.Generation()
+    sentences = []
+
+    def on_sentence(sentence):
+        sentences.append(sentence)
+        generation.cancel()       # barge-in after the first sentence
+
+    # the server holds the rest of the answer back until the test ends
+    text = client.respond("hold", on_sentence, generation)
+    assert sentences == ["Paris is the capital of France."]
+    assert generation.cancelled and text == "".join(ANSWER[:2])
+    assert not client.history
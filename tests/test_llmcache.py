@@ -0,0 +1,128 @@
+import pytest
+
+import al_llm
+import al_llmcache
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("who wrote the hobbit", True),
+    ("what is the capital of france", True),
+    ("how old is he", False),
+    ("and in germany?", False),
+    ("what about spain", False),
+    ("when was it built", False),
+    ("why", False),
+])
+def test_standalone(question, expected):
+    assert al_llmcache.standalone(question) is expected
+
+
+def test_cache_serves_standalone_questions_mid_conversation(tmp_path, monkeypatch):
+    cache = al_llmcache.ResponseCache(path=tmp_path / "cache.json")
+    monkeypatch.setattr(al_llm, "_cache", cache)
+    monkeypatch.setattr(al_llm, "get_cache", lambda: cache)
+    cache.put("who wrote the hobbit", "Tolkien wrote it.")
+
+    history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "Hello."}]
+    assert al_llm.respond("who wrote the hobbit", history=history) == "Tolkien wrote it."
+    assert history[-1] == {"role": "assistant", "content": "Tolkien wrote it."}
+
+
+def test_release_saves_the_cache(tmp_path, monkeypatch):
+    cache = al_llmcache.ResponseCache(path=tmp_path / "cache.json")
+    monkeypatch.setattr(al_llm, "_cache", cache)
+    cache.put("who wrote the hobbit", "Tolkien wrote it.")
+    al_llm.release()
+    assert (tmp_path / "cache.json").exists()
+
+
+# paraphrases of one question; near neighbours differ in a name or number
+PARAPHRASES = {
+    "what is the capital of france": [
+        "what's the capital of france", "Hey AL, what is the capital of France?",
+        "what is the capital city of france", "capital of france please"],
+    "what is the capital of spain": [
+        "what's the capital of spain", "what is the capital city of spain"],
+    "who wrote dune": ["who is the author of dune", "who wrote dune?", "um who wrote dune"],
+    "who wrote emma": ["who is the author of emma", "who wrote emma!"],
+    "convert 5 miles to kilometers": [
+        "5 miles in kilometers", "could you tell me convert 5 miles to kilometers"],
+    "convert 12 miles to kilometers": ["12 miles in kilometers"],
+}
+
+
+def ask_all(cache):
+    """Every paraphrase gets its own question's answer or a miss; returns hits."""
+    hits = 0
+    for question, phrasings in PARAPHRASES.items():
+        for phrasing in phrasings:
+            answer, _ = cache.get(phrasing)
+            if answer is not None:
+                hits += 1
+                assert answer == f"answer about {question}", phrasing
+    return hits
+
+
+def test_paraphrases_never_get_a_wrong_answer(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = al_llmcache.ResponseCache(path=path)
+    for question in PARAPHRASES:
+        cache.put(question, f"answer about {question}")
+    assert ask_all(cache) > 0
+    cache.save()
+    # a restarted daemon picks up where the old one stopped
+    assert ask_all(al_llmcache.ResponseCache(path=path).load()) > 0
+
+
+def test_replayed_log_never_gets_a_wrong_answer(tmp_path):
+    from al_bench import question_log
+
+    cache = al_llmcache.ResponseCache(path=tmp_path / "cache.json")
+    for question, topic in question_log(2000):
+        answer, _ = cache.get(question)
+        if answer is None:
+            cache.put(question, f"answer about {topic}")
+        else:
+            assert answer == f"answer about {topic}", question
+
+
+def test_failed_save_keeps_the_entries_pending(tmp_path, monkeypatch):
+    path = tmp_path / "cache.json"
+    cache = al_llmcache.ResponseCache(path=path)
+    cache.put("who wrote the hobbit", "Tolkien wrote it.")
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(al_llmcache.os, "replace", fail)
+        with pytest.raises(OSError):
+            cache.save()
+    assert list(tmp_path.iterdir()) == []     # no temp file left behind
+    cache.save()
+    assert al_llmcache.ResponseCache(path=path).load().get("who wrote the hobbit")[0]
+
+
+def test_concurrent_saves_each_write_a_whole_file(tmp_path):
+    import threading
+
+    path = tmp_path / "cache.json"
+    cache = al_llmcache.ResponseCache(path=path)
+    errors = []
+
+    def session(k):
+        try:
+            for i in range(20):
+                cache.put(f"who wrote book number {k} {i}", f"author {k} {i}")
+                cache.save()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=session, args=(k,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert len(al_llmcache.ResponseCache(path=path).load()) == 80
+    assert [p.name for p in tmp_path.iterdir()] == ["cache.json"]
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pytest
+
+import al_media
+
+pytestmark = pytest.mark.skipif(al_media.SYSTEM == "darwin", reason="MPRIS is Linux only")
+
+
+class FakeBackend:
+    def __init__(self, players=True):
+        self.players = players
+        self.calls = []
+
+    def call(self, method, count=1, player=None):
+        self.calls.append((method, count))
+        return self.players
+
+
+def test_pause_sends_its_count(monkeypatch):
+    backend = FakeBackend()
+    monkeypatch.setattr(al_media, "_mpris", lambda: backend)
+    al_media.pause(2)
+    assert backend.calls == [("Pause", 2)]
+
+
+def test_no_player_is_reported(monkeypatch):
+    monkeypatch.setattr(al_media, "_mpris", lambda: FakeBackend(players=False))
+    with pytest.raises(RuntimeError):
+        al_media.next_track()
+
+
+def test_failed_bus_is_retried_after_a_backoff(monkeypatch):
+    al_mpris = pytest.importorskip("al_mpris", exc_type=ImportError)
+
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        raise OSError("no session bus")
+
+    now = [1000.0]
+    monkeypatch.setattr(al_mpris, "MPRISBackend", connect)
+    monkeypatch.setattr(al_media, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    monkeypatch.setattr(al_media, "_backend", None)
+    monkeypatch.setattr(al_media, "_retry_at", 0.0)
+
+    assert al_media._mpris() is None
+    assert al_media._mpris() is None
+    assert len(attempts) == 1
+    now[0] += al_media.MPRIS_RETRY
+    backend = FakeBackend()
+    monkeypatch.setattr(al_mpris, "MPRISBackend", lambda: backend)
+    assert al_media._mpris() is backend
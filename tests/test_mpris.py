@@ -0,0 +1,78 @@
+import shutil
+import subprocess
+import threading
+
+import pytest
+
+pytest.importorskip("jeepney")
+pytestmark = pytest.mark.skipif(shutil.which("dbus-daemon") is None, reason="needs dbus-daemon")
+
+from jeepney import HeaderFields, MessageFlag, MessageType, message_bus, new_method_return
+from jeepney.io.blocking import Proxy, open_dbus_connection
+
+from al_mpris import MPRIS_PREFIX, MPRISBackend
+
+
+class StandInPlayer(threading.Thread):
+    """Minimal MPRIS player that answers and counts Player calls."""
+
+    def __init__(self, address, name):
+        super().__init__(daemon=True)
+        self.conn = open_dbus_connection(address)
+        Proxy(message_bus, self.conn).RequestName(MPRIS_PREFIX + name)
+        self.calls = {}
+
+    def run(self):
+        while True:
+            try:
+                msg = self.conn.receive()
+            except Exception:
+                return
+            if msg.header.message_type is not MessageType.method_call:
+                continue
+            member = msg.header.fields[HeaderFields.member]
+            self.calls[member] = self.calls.get(member, 0) + 1
+            if not msg.header.flags & MessageFlag.no_reply_expected:
+                self.conn.send(new_method_return(msg))
+
+    def stop(self):
+        self.conn.close()
+
+
+@pytest.fixture
+def bus():
+    """Address of a private session bus."""
+    proc = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    yield proc.stdout.readline().strip()
+    proc.terminate()
+    proc.wait()
+
+
+def test_players_are_found_and_calls_batched(bus):
+    player = StandInPlayer(bus, "testplayer")
+    player.start()
+    backend = MPRISBackend(bus)
+    try:
+        assert backend.has_player("testplayer")
+        assert backend.call("Next", count=5)
+        assert player.calls.get("Next") == 5
+        assert not backend.call("Next", player="nosuchplayer")
+    finally:
+        backend.close()
+        player.stop()
+
+
+def test_players_coming_and_going_are_tracked(bus):
+    backend = MPRISBackend(bus)
+    try:
+        late = StandInPlayer(bus, "lateplayer.instance7")
+        late.start()
+        assert backend.wait_for_player("lateplayer", timeout=2)
+        late.stop()
+        with backend._changed:
+            assert backend._changed.wait_for(lambda: not backend.has_player("lateplayer"), 2)
+    finally:
+        backend.close()
@@ -0,0 +1,51 @@
+import al_plan
+from al import INTENTS
+from al_tokens import parse
+
+KNOWN = {"spotify": "Spotify", "brave": "Brave", "source": "Sourcetrail"}
+
+
+def resolve_app(name, known=False):
+    if not name:
+        return None
+    return KNOWN.get(name) or (None if known else name.title())
+
+
+def build(text):
+    return al_plan.build(parse(text), INTENTS, resolve_app)
+
+
+def test_independent_commands_are_split():
+    plan = build("open spotify and close brave")
+    assert [s.intent for s in plan.steps] == ["open", "close"]
+    assert plan.depth() == 1 and not plan.answer
+
+
+def test_question_is_never_split():
+    plan = build("what's the difference between open source and close source")
+    assert len(plan) == 1 and plan.answer
+
+
+def test_part_that_is_not_a_command_keeps_the_text_whole():
+    plan = build("tell me a joke and close brave")
+    assert len(plan) == 1 and plan.answer
+
+
+def test_close_of_an_unknown_app_is_not_planned():
+    plan = build("open spotify and close notepadqq")
+    assert len(plan) == 1 and plan.answer
+
+
+def test_unsplittable_command_is_one_step():
+    plan = build("search for salt and pepper")
+    assert len(plan) == 1 and plan.steps[0].intent == "search" and not plan.answer
+
+
+def test_each_step_keeps_its_own_count():
+    plan = build("pause then next twice")
+    assert [(s.intent, s.utt.count) for s in plan.steps] == [("pause", 1), ("next", 2)]
+
+
+def test_steps_split_on_the_corrected_words():
+    plan = build("pause adn next")
+    assert [s.intent for s in plan.steps] == ["pause", "next"]
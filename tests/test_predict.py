@@ -0,0 +1,28 @@
+import al_predict
+from al_predict import Prewarmer
+
+
+def prewarmer(launch):
+    warmed = []
+    p = Prewarmer(lambda app, launch, max_bytes: warmed.append((app, launch)))
+    p.settings = dict(p.settings, launch=launch, max_load=float("inf"))
+    return p, warmed
+
+
+def test_shipped_config_launches_nothing():
+    assert al_predict.load_prewarm_settings()["launch"] == ()
+
+
+def test_unknown_memory_reads_ahead_instead_of_launching(monkeypatch):
+    monkeypatch.setattr(al_predict, "_available_mb", lambda: None)
+    p, warmed = prewarmer(("Spotify",))
+    p._maybe_warm("Spotify")
+    assert warmed == [("Spotify", False)]
+    assert p.skipped["memory"] == 1
+
+
+def test_launches_within_the_memory_budget(monkeypatch):
+    p, warmed = prewarmer(("Spotify",))
+    monkeypatch.setattr(al_predict, "_available_mb", lambda: p.settings["min_free_mb"] + 1)
+    p._maybe_warm("Spotify")
+    assert warmed == [("Spotify", True)]
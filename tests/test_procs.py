@@ -0,0 +1,97 @@
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+psutil = pytest.importorskip("psutil")
+
+from al_appindex import DesktopEntry
+from al_procs import ProcessTable, app_dir, app_keys
+
+
+def entry(exec_line, name="App"):
+    return DesktopEntry("app.desktop", "/tmp/app.desktop", name, None, (), exec_line, None)
+
+
+def test_launcher_names_map_to_process_names():
+    keys = app_keys(entry("google-chrome-stable %U"))
+    assert "chrome" in keys
+    assert "brave" in app_keys(entry("/usr/bin/brave-browser-stable %U"))
+
+
+def test_window_class_is_not_a_process_name():
+    e = DesktopEntry("x.desktop", "/tmp/x.desktop", "X", None, (), "xapp", "Some-Window")
+    assert "some-window" not in app_keys(e)
+
+
+def test_spoken_name_is_not_a_process_name():
+    assert app_keys(entry("/usr/bin/gnome-text-editor", "Notes")) == {"gnome-text-editor"}
+
+
+def test_launchers_are_not_process_names():
+    assert app_keys(entry("python3 %h/src/al_settings.py")) == {"al_settings.py"}
+    assert not {"python3", "env", "flatpak"} & (
+        app_keys(entry("python3 /home/u/src/al_settings.py"))
+        | app_keys(entry("env GDK_SCALE=2 /usr/bin/steam %U"))
+        | app_keys(entry("/usr/bin/flatpak run --branch=stable com.spotify.Client"))
+    )
+    assert "steam" in app_keys(entry("env GDK_SCALE=2 /usr/bin/steam %U"))
+    assert "com.spotify.client" in app_keys(entry("flatpak run com.spotify.Client"))
+
+
+def test_close_python_app_leaves_other_python_alone(tmp_path):
+    script = tmp_path / "someapp.py"
+    script.write_text("import time\ntime.sleep(30)\n")
+    other = tmp_path / "other.py"
+    other.write_text("import time\ntime.sleep(30)\n")
+    python = shutil.which("python3") or sys.executable
+
+    app = subprocess.Popen([python, str(script)])
+    bystander = subprocess.Popen([python, str(other)])
+    try:
+        e = entry(f"python3 {script}", "Some App")
+        assert ProcessTable().terminate(app_keys(e), app_dir(e), timeout=2) == 1
+        assert app.wait(timeout=5) is not None
+        assert bystander.poll() is None
+    finally:
+        for proc in (app, bystander):
+            if proc.poll() is None:
+                proc.kill()
+
+
+def test_shared_bin_directory_is_not_an_app_dir():
+    assert app_dir(entry(shutil.which("sleep"))) is None
+
+
+def test_close_by_install_directory(tmp_path):
+    # /opt/<app>/launcher starts /opt/<app>/worker: no name in common
+    bundle = tmp_path / "opt" / "someapp"
+    bundle.mkdir(parents=True)
+    worker = bundle / "worker"
+    shutil.copy(shutil.which("sleep"), worker)
+    launcher = bundle / "someapp-launcher"
+    launcher.write_text(f"#!/bin/sh\nexec {worker} \"$@\"\n")
+    launcher.chmod(0o755)
+
+    e = entry(str(launcher), "Some App")
+    assert app_dir(e) == str(bundle)
+    proc = subprocess.Popen([str(worker), "30"])
+    try:
+        table = ProcessTable()
+        assert not ProcessTable().find(app_keys(e))
+        assert table.terminate(app_keys(e), app_dir(e), timeout=2) == 1
+        assert proc.wait(timeout=5) is not None
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+
+
+def test_close_reports_nothing_closed(monkeypatch):
+    import al_apps
+
+    monkeypatch.setattr(al_apps, "SYSTEM", "linux")
+    monkeypatch.setattr(al_apps, "_desktop_entry", lambda name: entry("/usr/bin/al-no-such-app"))
+    monkeypatch.setattr(al_apps.subprocess, "run", None)   # no command-line scan either
+    with pytest.raises(RuntimeError):
+        al_apps.close_app("No Such App")
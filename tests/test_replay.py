@@ -0,0 +1,16 @@
+import contextlib
+import io
+import json
+
+from al_bench import GOLDEN_PATH, replay_corpus, replay_decisions, replay_setup
+
+
+def test_replayed_decisions_match_the_golden_file(tmp_path):
+    # update with: python3 src/al_bench.py replay -n 2000 --update-golden
+    golden = json.loads(GOLDEN_PATH.read_text())
+    config, apps = replay_setup(tmp_path)
+    corpus = replay_corpus(golden["n"], seed=golden["seed"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        decisions = replay_decisions(corpus, config, apps)
+    changed = [(old, new) for old, new in zip(golden["decisions"], decisions) if old != new]
+    assert not changed, f"{len(changed)} decisions changed, first: {changed[0]}"
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+
+import al_startup
+
+DEFERRED = ("al_tts", "al_llm", "al_context", "al_predict", "sqlite3")
+
+
+def test_heavy_modules_are_not_imported_with_al():
+    code = f"import sys, al; print(' '.join(m for m in {DEFERRED!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=al_startup.HERE,
+                         capture_output=True, text=True, check=True).stdout
+    assert out.split() == []
+
+
+# backends the first prompt must not wait for
+NOT_AT_PROMPT = ("al_llm", "al_stt", "al_appindex", "al_apps", "al_media", "al_browser",
+                 "al_probe")
+
+
+def test_first_prompt_loads_no_backend(tmp_path):
+    code = (
+        "import sys, al, al_startup\n"
+        "al_startup.mark_ready = lambda: print('loaded:', *(m for m in "
+        f"{NOT_AT_PROMPT!r} if m in sys.modules))\n"
+        "al.main(['--startup-probe'])\n"
+    )
+    # a home of its own: the context store and config live there
+    env = dict(os.environ, HOME=str(tmp_path))
+    out = subprocess.run([sys.executable, "-c", code], cwd=al_startup.HERE, env=env,
+                         stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                         check=True).stdout
+    loaded = [line for line in out.splitlines() if line.startswith("loaded:")]
+    assert loaded == ["loaded:"]
+
+
+def test_startup_beyond_the_interpreter_within_budget(tmp_path):
+    # best of a few runs, less a bare interpreter's start: load on a CI
+    # machine adds to both and cancels out
+    env = dict(os.environ, HOME=str(tmp_path))
+    ready = min(al_startup.probe(env=env)[1] for _ in range(3))
+    baseline = min(al_startup.baseline_ms(env) for _ in range(3))
+    assert ready - baseline < al_startup.BUDGET_MS
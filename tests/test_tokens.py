@@ -0,0 +1,81 @@
+import pytest
+
+from al_tokens import parse
+
+# (raw, expected text, expected count)
+EXPECTED = [
+    # numbers inside queries and app names are text
+    ("search for twenty one pilots", "search for twenty one pilots", 1),
+    ("search for 3 doors down", "search for 3 doors down", 1),
+    ("search for once upon a time", "search for once upon a time", 1),
+    ("search for the 3 times table", "search for the 3 times table", 1),
+    ("search for maroon 5 times", "search for maroon 5 times", 1),
+    ("search for next 3 episodes", "search for next 3 episodes", 1),
+    ("open 7zip", "open 7zip", 1),
+    ("skip the next 3", "skip the next 3", 1),
+    ("3 skip", "3 skip", 1),
+    # a number right after a count verb
+    ("skip 3", "skip", 3),
+    ("next 2", "next", 2),
+    ("previous two", "previous", 2),
+    ("back four", "back", 4),
+    ("pause 3", "pause", 3),
+    ("search again 4", "search again", 4),
+    ("again 5", "again", 5),
+    ("next 3 please", "next", 3),
+    # compound numbers in the count position, clamped to MAX_COUNT
+    ("skip twenty", "skip", 10),
+    ("next twenty three", "next", 10),
+    ("skip one hundred", "skip", 10),
+    ("next 12", "next", 10),
+    # multipliers
+    ("next three times", "next", 3),
+    ("skip 3 times please", "skip", 3),
+    ("search again twice", "search again", 2),
+    ("back twice", "back", 2),
+    ("skip once", "skip", 1),
+    # no count
+    ("next", "next", 1),
+    ("pause", "pause", 1),
+    ("skip 0", "skip", 1),
+    # fillers at either end
+    ("next please", "next", 1),
+    ("please pause", "pause", 1),
+    ("please", "please", 1),
+    ("search for please please me", "search for please please me", 1),
+    # cleanup and typo correction
+    ("Serch for Cats!", "search for cats", 1),
+    ("OPEN   APOTIFY", "open spotify", 1),
+    ("go to https://example.com/a", "go to https://example.com/a", 1),
+]
+
+
+@pytest.mark.parametrize("raw, text, count", EXPECTED)
+def test_parse(raw, text, count):
+    utt = parse(raw)
+    assert (utt.text, utt.count) == (text, count)
+
+
+def test_find_and_after():
+    utt = parse("open brave and search for salt")
+    assert utt.find("search", "for") == 3
+    assert utt.find("pepper") == -1
+    assert parse("search for salt").after("search for") == "salt"
+
+
+@pytest.mark.parametrize("raw, calls", [
+    ("skip 3 times please", [("next_track", (3,))]),
+    ("next please", [("next_track", (1,))]),
+    ("pause please", [("pause", (1,))]),
+    ("please previous twice", [("previous_track", (2,))]),
+])
+def test_polite_commands_reach_their_intent(raw, calls):
+    from al import ALAssistant
+    from al_backend import RecordingBackend
+
+    backend = RecordingBackend()
+    assistant = ALAssistant(backend=backend)
+    assistant.handle(raw)
+    assistant.actions.wait()
+    assistant.actions.shutdown()
+    assert [c for c in backend.take() if c[0] not in ("say", "prewarm_app")] == calls
@@ -0,0 +1,53 @@
+import time
+
+import al_levels
+import al_text
+import al_tts
+
+
+def test_envelope_follows_queued_audio():
+    # the streaming player returns at once: envelopes are laid end to end
+    meter = al_levels.get_meter()
+    listener = lambda source, value: None
+    meter.subscribe(listener)
+    worker = al_tts.TTSWorker(engine=object(), player=lambda pcm, rate: None, cache=al_tts.PCMCache())
+    try:
+        second = b"\0\0" * 16000
+        worker._play(second, 16000, False)
+        worker._play(second, 16000, False)
+        assert len(worker._envelopes) == 2
+        first_end, first = worker._envelopes[0]
+        second_end, later = worker._envelopes[1]
+        assert abs(second_end - first_end - 1.0) < 0.05
+        assert not first.is_set() and not later.is_set()
+
+        worker.interrupt()
+        assert first.is_set() and later.is_set()
+        assert worker._audio_end == 0.0
+    finally:
+        meter.unsubscribe(listener)
+
+
+def test_new_worker_waits_for_the_released_one(monkeypatch):
+    events = []
+
+    class Worker:
+        def __init__(self):
+            events.append("new")
+
+        def stop(self):
+            time.sleep(0.1)     # still playing its queue
+            events.append("stopped")
+
+    monkeypatch.setattr(al_tts, "TTSWorker", Worker)
+    monkeypatch.setattr(al_tts, "_worker", None)
+    monkeypatch.setattr(al_tts, "_released", None)
+    al_tts.get_worker()
+    al_tts.release()
+    al_tts.get_worker()
+    assert events == ["new", "stopped", "new"]
+
+
+def test_split_sentences():
+    assert al_text.split_sentences("Dr. Who is here. It is late now! Ok") == [
+        "Dr. Who is here.", "It is late now!", "Ok"]